@@ -0,0 +1,239 @@
+import sys
+import json
+import time
+import platform
+import argparse
+from pathlib import Path
+
+# Runs from the repository root, the bot's modules live in bot/
+sys.path.insert(0, str(Path(__file__).parent.parent / 'bot'))
+
+import numpy as np
+import pandas as pd
+from yahoo.loader import matchups_to_frame
+from yahoo.rankings import empty_state, apply_week, rank_snapshot
+from yahoo.simulation import simulate_playoff_counts, simulate_outcomes
+from yahoo.whatif import WhatIfMatrix, whatif_seasons
+from yahoo.functionality import build_simulation_inputs, format_standings
+from synthetic import SCORE_DISTRIBUTIONS, generate_league, to_yfpy_matchups, standings_frame
+
+"""
+TIMES THE ANALYTICS HOT PATHS AGAINST A SYNTHETIC LEAGUE AND WRITES
+THE RESULTS AS JSON. GIVEN A BASELINE, EXITS WITH STATUS 1 IF ANY CASE
+GOT SLOWER THAN THE THRESHOLD ALLOWS.
+
+NO YAHOO CALLS ARE MADE. BASELINES ARE ONLY COMPARABLE WHEN THEY COME
+FROM THE SAME MACHINE AND THE SAME LEAGUE PARAMETERS.
+
+    python benchmarks/analytics.py --output before.json
+    python benchmarks/analytics.py --baseline before.json --threshold 0.2
+    python benchmarks/analytics.py --teams 14 --distribution gamma --only odds
+"""
+
+# Median slowdown allowed before a case counts as a regression
+DEFAULT_THRESHOLD = 0.25
+
+
+##################################################
+##################### CASES ######################
+##################################################
+
+def _current_season(league: pd.DataFrame) -> pd.DataFrame:
+    return league[league['year'] == league['year'].max()]
+
+
+def case_load_matchups(league, args):
+    # Flattening Yahoo's objects, the part of load_matchups that is ours
+    matchups = to_yfpy_matchups(_current_season(league))
+    return lambda: matchups_to_frame(matchups)
+
+
+def case_power_rankings(league, args):
+    season = _current_season(league)
+    played = season[season['status'] == 'postevent']
+    team_keys = np.sort(season['team_key'].unique())
+    weeks = [played[played['week'] == week] for week in sorted(played['week'].unique())]
+
+    def run():
+        # Every completed week applied in turn, as update_power_rankings does
+        state = empty_state(team_keys)
+        for week in weeks:
+            state = apply_week(state, week)
+            snapshot = rank_snapshot(state, int(week['week'].iloc[0]))
+        return snapshot
+
+    return run
+
+
+def _simulation_inputs(season):
+    # Synthetic seasons end with a full bracket, one round per playoff week
+    regular = season[~season['is_playoffs']]
+    n_playoff_weeks = season.loc[season['is_playoffs'], 'week'].nunique()
+    return build_simulation_inputs(regular, int(regular['week'].max()) + 1, 2 ** n_playoff_weeks)
+
+
+def case_odds(league, args):
+    inputs = _simulation_inputs(_current_season(league))
+    inputs = {key: value for key, value in inputs.items() if key not in ('team_keys', 'weeks')}
+
+    # A fixed number of seasons, so the work does not depend on convergence
+    return lambda: simulate_playoff_counts(**inputs, n_simulations=args.simulations, seed=0)
+
+
+def case_bracket(league, args):
+    inputs = _simulation_inputs(_current_season(league))
+    inputs = {key: value for key, value in inputs.items() if key not in ('team_keys', 'weeks')}
+
+    # Same seasons as the odds case plus seeds and the playoff bracket
+    return lambda: simulate_outcomes(**inputs, n_simulations=args.simulations, seed=0)
+
+
+def case_simulation_inputs(league, args):
+    season = _current_season(league)
+    return lambda: _simulation_inputs(season)
+
+
+def case_whatif_season(league, args):
+    season = _current_season(league)
+    played = season[season['status'] == 'postevent']
+    team_keys = np.sort(season['team_key'].unique())
+    weeks = played['week'].unique()
+
+    def run():
+        matrix = WhatIfMatrix(team_keys)
+        matrix.update(played, weeks)
+        return matrix
+
+    return run
+
+
+def case_whatif_history(league, args):
+    games = league[(league['status'] == 'postevent') & ~league['is_playoffs']]
+    return lambda: whatif_seasons(games)
+
+
+def case_standings(league, args):
+    standings = standings_frame(_current_season(league))
+    return lambda: format_standings(standings)
+
+
+# Name -> setup(league, args) returning the callable that is timed
+CASES = {
+    'load_matchups': case_load_matchups,
+    'power_rankings': case_power_rankings,
+    'simulation_inputs': case_simulation_inputs,
+    'odds': case_odds,
+    'bracket': case_bracket,
+    'whatif_season': case_whatif_season,
+    'whatif_history': case_whatif_history,
+    'standings': case_standings,
+}
+
+
+##################################################
+##################### RUNNER #####################
+##################################################
+
+def time_case(func, repeat: int, warmup: int = 1) -> dict:
+    """
+    Calls func repeatedly and summarizes its wall time in seconds
+    """
+    for _ in range(warmup):
+        func()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    times.sort()
+
+    return {
+        'median': times[len(times) // 2],
+        'min': times[0],
+        'max': times[-1],
+        'mean': sum(times) / len(times),
+        'repeat': repeat,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Cases whose median got slower than the baseline by more than threshold
+
+    Returns
+    -------
+    list
+        (case, baseline median, current median, ratio) of each regression
+    """
+    regressions = []
+    for name, result in results['cases'].items():
+        previous = baseline['cases'].get(name)
+        if previous is None:
+            continue
+        ratio = result['median'] / previous['median']
+        if ratio > 1 + threshold:
+            regressions.append((name, previous['median'], result['median'], ratio))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Time the analytics hot paths on a synthetic league')
+    parser.add_argument('--teams', type=int, default=12)
+    parser.add_argument('--weeks', type=int, default=17, help='weeks per season, playoffs included')
+    parser.add_argument('--seasons', type=int, default=12)
+    parser.add_argument('--current-week', type=int, default=9, help='first unplayed week of the last season')
+    parser.add_argument('--distribution', choices=sorted(SCORE_DISTRIBUTIONS), default='normal')
+    parser.add_argument('--simulations', type=int, default=20000, help='seasons simulated by the odds case')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--only', nargs='+', choices=sorted(CASES), help='cases to run, default all')
+    parser.add_argument('--output', type=Path, help='write the results to this JSON file')
+    parser.add_argument('--baseline', type=Path, help='results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed median slowdown, 0.25 means 25%%')
+    args = parser.parse_args()
+
+    params = {
+        key: getattr(args, key)
+        for key in ('teams', 'weeks', 'seasons', 'current_week', 'distribution', 'simulations', 'seed')
+    }
+    league = generate_league(
+        args.teams, args.weeks, args.seasons,
+        current_week=args.current_week, distribution=args.distribution, seed=args.seed,
+    )
+
+    results = {
+        'params': params,
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+        },
+        'cases': {},
+    }
+    for name in args.only or CASES:
+        results['cases'][name] = time_case(CASES[name](league, args), args.repeat)
+        print(f"{name:<20}{results['cases'][name]['median'] * 1000:>10.2f} ms", file=sys.stderr)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline['params'] != params:
+            sys.exit(f"Baseline was run with {baseline['params']}, not comparable")
+
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({ratio:.2f}x)",
+                  file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
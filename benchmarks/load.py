@@ -0,0 +1,280 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+# Runs from the repository root, the bot's modules live in bot/
+BOT_DIR = Path(__file__).parent.parent / 'bot'
+sys.path.insert(0, str(BOT_DIR))
+
+import numpy as np
+
+"""
+OFFLINE LOAD TESTS OF THE COMMAND PATH. YAHOO IS REPLACED BY RECORDED
+RESPONSES (bot/yahoo/transport.py) SERVED WITH INJECTED LATENCY AND
+ERRORS, AND A SCRIPTED BURST OF COMMANDS IS DRIVEN CONCURRENTLY
+THROUGH main.py's HANDLERS.
+
+    python benchmarks/load.py record --cassette cassettes/      # live, needs auth
+    python benchmarks/load.py synthesize --cassette cassettes/  # no Yahoo account needed
+    python benchmarks/load.py import-fixtures --cassette cassettes/ tests/*.json
+    python benchmarks/load.py run --cassette cassettes/ --profile benchmarks/profiles/sunday.json \\
+        --requests 500 --concurrency 50 --output load.json
+"""
+
+# A Sunday afternoon in the league channel, command line -> share of traffic
+SUNDAY_BURST = {
+    'scoreboard': 0.35,
+    'standings': 0.15,
+    'powrank': 0.15,
+    'odds': 0.10,
+    'whatif': 0.10,
+    'scoreboard refresh': 0.10,
+    'odds refresh': 0.05,
+}
+
+
+def _isolate(cassette_dir: Path, profile: Path = None, seed: int = None, replay: bool = True) -> None:
+    """
+    Points the bot at the cassettes and at throwaway cache and store files.
+    Must run before any bot module is imported, settings are read at import
+    """
+    scratch = Path(tempfile.mkdtemp(prefix='marcy-load-'))
+    os.environ['CACHE_DIR'] = str(scratch / 'cache')
+    os.environ['STORE_PATH'] = str(scratch / 'league.db')
+    if replay:
+        os.environ['YAHOO_REPLAY_DIR'] = str(cassette_dir)
+        if profile is not None:
+            os.environ['YAHOO_REPLAY_PROFILE'] = str(profile)
+        if seed is not None:
+            os.environ['YAHOO_REPLAY_SEED'] = str(seed)
+    else:
+        os.environ['YAHOO_RECORD_DIR'] = str(cassette_dir)
+
+
+##################################################
+################### CASSETTES ####################
+##################################################
+
+def record(args) -> None:
+    _isolate(args.cassette, replay=False)
+    from yahoo.client import get_query
+
+    query = get_query()
+    end_week = int(query.get_league_metadata().end_week)
+    query.get_league_settings()
+    query.get_league_teams()
+    query.get_league_standings()
+    query.get_league_transactions()
+    for week in range(1, end_week + 1):
+        query.get_league_matchups_by_week(week)
+        query.get_league_scoreboard_by_week(week)
+
+    print(f"Recorded {len(list(args.cassette.glob('*.json')))} responses into {args.cassette}")
+
+
+def synthesize(args) -> None:
+    from synthetic import generate_season, write_cassettes
+
+    season = generate_season(
+        args.teams, args.weeks, current_week=args.current_week,
+        distribution=args.distribution, rng=np.random.default_rng(args.seed),
+    )
+    written = write_cassettes(season, args.cassette, args.current_week)
+    print(f"Wrote {written} synthetic responses into {args.cassette}")
+
+
+def import_fixtures(args) -> None:
+    from yahoo.transport import import_fixture
+
+    for fixture in args.fixtures:
+        for path in import_fixture(fixture, args.cassette):
+            print(f"{fixture} -> {path}")
+
+
+##################################################
+################### LOAD DRIVER ##################
+##################################################
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class LoadContext:
+    """
+    Stand-in for commands.Context that keeps what the handler sends
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.channel = None
+
+    def typing(self):
+        return _Typing()
+
+    async def send(self, content=None, embed=None):
+        self.sent.append(embed if embed is not None else content)
+
+
+def _is_error(sent: list) -> bool:
+    # Handlers answer failures with an apology instead of raising
+    return not sent or any(isinstance(message, str) and message.startswith('Sorry') for message in sent)
+
+
+def summarize(latencies: list) -> dict:
+    latencies = np.asarray(latencies) * 1000
+    if not len(latencies):
+        return {'count': 0}
+    return {
+        'count': int(len(latencies)),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'max_ms': float(latencies.max()),
+    }
+
+
+async def drive(script: list, concurrency: int, rate: float = None) -> tuple:
+    """
+    Sends every scripted command line through its main.py handler
+
+    Parameters
+    ----------
+    script: list
+        command lines, e.g. ['scoreboard', 'odds refresh']
+    concurrency: int
+        commands in flight at once (closed loop)
+    rate: float | None
+        commands started per second with exponential gaps (open loop);
+        concurrency then only caps how many are in flight
+
+    Returns
+    -------
+    tuple
+        (one (command line, seconds, failed) per command, total seconds)
+    """
+    import main
+
+    results = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(line: str):
+        name, *options = line.split()
+        handler = main.bot.get_command(name).callback
+        ctx = LoadContext()
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await handler(ctx, *options)
+                failed = _is_error(ctx.sent)
+            except Exception:
+                failed = True
+            results.append((line, time.perf_counter() - start, failed))
+
+    start = time.perf_counter()
+    tasks = []
+    for line in script:
+        tasks.append(asyncio.create_task(one(line)))
+        if rate:
+            await asyncio.sleep(random.expovariate(rate))
+    await asyncio.gather(*tasks)
+
+    return results, time.perf_counter() - start
+
+
+def run(args) -> None:
+    _isolate(args.cassette, args.profile, args.seed)
+    from utils import executor
+    from utils.singleflight import command_flight
+    from yahoo.client import get_query
+
+    # yfpy turns on debug logging for everything, which would dominate the timings
+    logging.disable(logging.INFO)
+
+    mix = json.loads(args.mix.read_text()) if args.mix else SUNDAY_BURST
+    random.seed(args.seed)
+    script = random.choices(list(mix), weights=list(mix.values()), k=args.requests)
+
+    executor.start()
+    try:
+        results, elapsed = asyncio.run(drive(script, args.concurrency, args.rate))
+    finally:
+        executor.shutdown()
+
+    report = {
+        'params': {
+            'requests': args.requests, 'concurrency': args.concurrency, 'rate': args.rate,
+            'profile': str(args.profile) if args.profile else None, 'seed': args.seed,
+        },
+        'elapsed_seconds': elapsed,
+        'throughput_per_second': len(results) / elapsed,
+        'errors': sum(failed for _, _, failed in results),
+        'overall': summarize([seconds for _, seconds, _ in results]),
+        'commands': {
+            line: {
+                **summarize([seconds for other, seconds, _ in results if other == line]),
+                'errors': sum(failed for other, _, failed in results if other == line),
+            }
+            for line in mix
+        },
+        'yahoo': get_query()._query.stats(),
+        'cache': get_query().stats(),
+        'coalescing': command_flight.stats(),
+    }
+
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Offline load tests of the command path')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    parser_record = subparsers.add_parser('record', help='record the live league, needs Yahoo auth')
+    parser_record.add_argument('--cassette', type=Path, required=True)
+    parser_record.set_defaults(func=record)
+
+    parser_synthesize = subparsers.add_parser('synthesize', help='write a synthetic league as recordings')
+    parser_synthesize.add_argument('--cassette', type=Path, required=True)
+    parser_synthesize.add_argument('--teams', type=int, default=12)
+    parser_synthesize.add_argument('--weeks', type=int, default=17)
+    parser_synthesize.add_argument('--current-week', type=int, default=9)
+    parser_synthesize.add_argument('--distribution', default='normal')
+    parser_synthesize.add_argument('--seed', type=int, default=0)
+    parser_synthesize.set_defaults(func=synthesize)
+
+    parser_import = subparsers.add_parser('import-fixtures', help='add tests/*.json fixtures to recordings')
+    parser_import.add_argument('--cassette', type=Path, required=True)
+    parser_import.add_argument('fixtures', type=Path, nargs='+')
+    parser_import.set_defaults(func=import_fixtures)
+
+    parser_run = subparsers.add_parser('run', help='drive a burst of commands against recordings')
+    parser_run.add_argument('--cassette', type=Path, required=True)
+    parser_run.add_argument('--profile', type=Path, help='latency profile JSON, e.g. benchmarks/profiles/sunday.json')
+    parser_run.add_argument('--mix', type=Path, help='JSON of command line -> share, default SUNDAY_BURST')
+    parser_run.add_argument('--requests', type=int, default=300)
+    parser_run.add_argument('--concurrency', type=int, default=50)
+    parser_run.add_argument('--rate', type=float, help='commands per second, default all at once')
+    parser_run.add_argument('--seed', type=int, default=0)
+    parser_run.add_argument('--output', type=Path)
+    parser_run.set_defaults(func=run)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+"""
+MEASURES THE COST OF IMPORTING bot/main.py, I.E. EVERYTHING THAT
+HAPPENS BEFORE bot.run IS REACHED.
+
+YAHOO OAUTH HANDSHAKES ARE COUNTED RATHER THAN PERFORMED; PASS
+--auth-latency TO CHARGE EACH ONE A REALISTIC NETWORK ROUND TRIP.
+
+    python benchmarks/startup.py                    # this checkout
+    python benchmarks/startup.py --bot-dir OLD/bot  # another checkout
+"""
+
+# Runs inside a fresh interpreter so nothing is already imported
+PROBE = '''
+import sys, time, json
+import yfpy.query
+
+handshakes = 0
+def _authenticate(self):
+    global handshakes
+    handshakes += 1
+    time.sleep({auth_latency})
+
+yfpy.query.YahooFantasySportsQuery._authenticate = _authenticate
+
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+
+print(json.dumps({{"import_seconds": elapsed, "auth_handshakes": handshakes}}))
+'''
+
+
+def measure(bot_dir: Path, auth_latency: float) -> dict:
+    """
+    Imports main.py from bot_dir in a subprocess and returns its timings
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(auth_latency=auth_latency)],
+        cwd=bot_dir,
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Time the import of bot/main.py')
+    parser.add_argument('--bot-dir', type=Path, default=Path(__file__).parent.parent / 'bot')
+    parser.add_argument('--auth-latency', type=float, default=0.0,
+                        help='seconds charged per OAuth handshake')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure(args.bot_dir, args.auth_latency) for _ in range(args.repeat)]
+    times = sorted(run['import_seconds'] for run in runs)
+
+    print(json.dumps({
+        'bot_dir': str(args.bot_dir.resolve()),
+        'auth_handshakes': runs[0]['auth_handshakes'],
+        'import_seconds_median': times[len(times) // 2],
+        'import_seconds_min': times[0],
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+import json
+import numpy as np
+import pandas as pd
+from yfpy.models import Matchup, Team, TeamPoints, TeamProjectedPoints
+from yahoo.transport import cassette_path
+
+"""
+GENERATES SYNTHETIC LEAGUES FOR THE BENCHMARKS: ANY NUMBER OF TEAMS,
+WEEKS AND SEASONS, WITH SCORES DRAWN FROM A CHOSEN DISTRIBUTION. THE
+FRAMES HAVE THE SAME COLUMNS AS THE BOT'S OWN (SEE yahoo/loader.py)
+"""
+
+# Points of the average team and the spread of team strength around it
+LEAGUE_MEAN = 110.0
+STRENGTH_SPREAD = 12.0
+
+
+def _normal(rng, mean, std, size):
+    return rng.normal(mean, std, size)
+
+
+def _gamma(rng, mean, std, size):
+    # Right-skewed, same mean and std: a few blowout weeks, no negative scores
+    return rng.gamma((mean / std) ** 2, std ** 2 / mean, size)
+
+
+def _uniform(rng, mean, std, size):
+    half_width = std * np.sqrt(3)
+    return rng.uniform(mean - half_width, mean + half_width, size)
+
+
+# Weekly score of a team given its mean and standard deviation
+SCORE_DISTRIBUTIONS = {
+    'normal': _normal,
+    'gamma': _gamma,
+    'uniform': _uniform,
+}
+
+
+def generate_season(n_teams: int = 12, n_weeks: int = 17, current_week: int = None,
+                    distribution: str = 'normal', n_playoff_weeks: int = 3,
+                    year: int = 2023, rng=None) -> pd.DataFrame:
+    """
+    Generates one season of matchups
+
+    Parameters
+    ----------
+    n_teams: int
+        teams in the league, must be even
+    n_weeks: int
+        weeks in the season, playoffs included
+    current_week: int | None
+        first week not played yet, its matchups and later ones have no
+        points; defaults to a finished season
+    distribution: str
+        key of SCORE_DISTRIBUTIONS
+    n_playoff_weeks: int
+        last weeks flagged as playoffs
+    year: int
+        season, used in the team keys
+    rng: np.random.Generator | None
+
+    Returns
+    -------
+    pd.DataFrame
+        one row per team per matchup with the columns of MATCHUP_COLUMNS
+        plus 'year'
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    current_week = n_weeks + 1 if current_week is None else current_week
+    draw = SCORE_DISTRIBUTIONS[distribution]
+
+    team_keys = np.array([f'{year}.l.1.t.{team}' for team in range(1, n_teams + 1)], dtype=object)
+    mean = rng.normal(LEAGUE_MEAN, STRENGTH_SPREAD, n_teams)
+    std = rng.uniform(15.0, 30.0, n_teams)
+
+    weeks = np.arange(1, n_weeks + 1)
+    # Random pairings each week: teams 2k and 2k+1 of a permutation meet
+    order = np.argsort(rng.random((n_weeks, n_teams)), axis=1)
+    points = np.round(draw(rng, mean[order], std[order], order.shape), 2)
+    played = (weeks < current_week)[:, None]
+    points = np.where(played, points, 0.0)
+
+    opponent_points = points.reshape(n_weeks, -1, 2)[:, :, ::-1].reshape(n_weeks, n_teams)
+    win = played & (points > opponent_points)
+    winner = np.where(win, team_keys[order], None).reshape(n_weeks, -1, 2)
+    winner = np.where(winner[:, :, 0] != None, winner[:, :, 0], winner[:, :, 1])  # noqa: E711
+
+    return pd.DataFrame({
+        'matchup_id': (weeks[:, None] * 100 + np.arange(n_teams)[None, :] // 2).ravel(),
+        'week': np.repeat(weeks, n_teams),
+        'winner_team_key': np.repeat(winner, 2, axis=1).ravel(),
+        'team_key': team_keys[order].ravel(),
+        'team_total_points': points.ravel(),
+        'team_projected_points': np.round(mean[order], 2).ravel(),
+        'win': win.astype(np.int64).ravel(),
+        'is_playoffs': np.repeat(weeks > n_weeks - n_playoff_weeks, n_teams),
+        'status': np.repeat(np.where(weeks < current_week, 'postevent', 'preevent'), n_teams).astype(object),
+        'year': year,
+    })
+
+
+def generate_league(n_teams: int = 12, n_weeks: int = 17, n_seasons: int = 1,
+                    current_week: int = None, distribution: str = 'normal',
+                    seed: int = 0) -> pd.DataFrame:
+    """
+    Generates several seasons of one league, the last one running up to
+    current_week and the earlier ones finished
+
+    Returns
+    -------
+    pd.DataFrame
+        matchup records of every season, see generate_season
+    """
+    rng = np.random.default_rng(seed)
+    last_year = 2023
+
+    return pd.concat([
+        generate_season(
+            n_teams, n_weeks,
+            current_week=current_week if year == last_year else None,
+            distribution=distribution, year=year, rng=rng,
+        )
+        for year in range(last_year - n_seasons + 1, last_year + 1)
+    ], ignore_index=True)
+
+
+def to_yfpy_matchups(season: pd.DataFrame) -> list:
+    """
+    Rebuilds the yfpy objects Yahoo would return for a season
+
+    Returns
+    -------
+    list
+        (week, list of yfpy Matchup) pairs, as load_matchups reads them
+    """
+    matchups_by_week = []
+    for week, games in season.groupby('week', sort=True):
+        matchups = []
+        for _, teams in games.groupby('matchup_id', sort=True):
+            first = teams.iloc[0]
+            matchups.append(Matchup({
+                'week': int(week),
+                'status': first['status'],
+                'is_playoffs': int(first['is_playoffs']),
+                'winner_team_key': first['winner_team_key'],
+                'teams': [
+                    Team({
+                        'team_key': team['team_key'],
+                        'team_points': TeamPoints({'total': team['team_total_points']}),
+                        'team_projected_points': TeamProjectedPoints({'total': team['team_projected_points']}),
+                    })
+                    for _, team in teams.iterrows()
+                ],
+            }))
+        matchups_by_week.append((int(week), matchups))
+
+    return matchups_by_week
+
+
+def standings_frame(season: pd.DataFrame, n_playoff_teams: int = 8) -> pd.DataFrame:
+    """
+    Standings of a season's played regular season weeks, with the columns
+    of read_standings
+    """
+    regular = season[(season['status'] == 'postevent') & ~season['is_playoffs']]
+    opponents = regular.merge(
+        regular[['matchup_id', 'team_key', 'team_total_points']],
+        on='matchup_id', suffixes=('', '_opponent'),
+    )
+    opponents = opponents[opponents['team_key'] != opponents['team_key_opponent']]
+
+    standings = opponents.groupby('team_key').agg(
+        wins=('win', 'sum'),
+        games=('win', 'size'),
+        points_for=('team_total_points', 'sum'),
+        points_against=('team_total_points_opponent', 'sum'),
+    ).reset_index()
+    standings['losses'] = standings['games'] - standings['wins']
+    standings['ties'] = 0
+    standings = standings.sort_values(['wins', 'points_for'], ascending=False, ignore_index=True)
+    standings['rank'] = np.arange(1, len(standings) + 1)
+    standings['playoff_seed'] = standings['rank'].where(standings['rank'] <= n_playoff_teams)
+    standings['clinched_playoffs'] = 0
+    standings['nickname'] = 'Manager ' + standings['team_key'].str.rsplit('.', n=1).str[-1]
+    standings['points_for'] = standings['points_for'].round(2)
+
+    return standings[[
+        'team_key', 'nickname', 'rank', 'wins', 'losses', 'ties',
+        'points_for', 'points_against', 'clinched_playoffs', 'playoff_seed',
+    ]]
+
+
+def _team_json(team_key: str, **fields) -> dict:
+    team_id = int(team_key.rsplit('.', 1)[-1])
+    return {'team': {
+        'team_key': team_key,
+        'team_id': team_id,
+        'name': f'Team {team_id}',
+        'managers': {'manager': {'manager_id': team_id, 'nickname': f'Manager {team_id}', 'guid': f'GUID{team_id}'}},
+        **fields,
+    }}
+
+
+def write_cassettes(season: pd.DataFrame, cassette_dir, current_week: int, league_key: str = '423.l.1') -> int:
+    """
+    Writes a synthetic season as Yahoo recordings for yahoo/transport.py,
+    so load tests can run without ever recording the real league
+
+    Parameters
+    ----------
+    season: pd.DataFrame
+        one season from generate_season
+    cassette_dir: str | Path
+        directory to write to
+    current_week: int
+        week the league metadata reports as current
+
+    Returns
+    -------
+    int
+        number of cassettes written
+    """
+    def write(method, args, data):
+        path = cassette_path(cassette_dir, method, args)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data))
+
+    n_weeks = int(season['week'].max())
+    write('get_league_metadata', (), {
+        'league_key': league_key, 'name': 'Synthetic League', 'season': int(season['year'].iloc[0]),
+        'current_week': current_week, 'start_week': 1, 'end_week': n_weeks,
+    })
+    n_playoff_weeks = int(season.loc[season['is_playoffs'], 'week'].nunique())
+    write('get_league_settings', (), {
+        'uses_playoff': int(n_playoff_weeks > 0),
+        'playoff_start_week': n_weeks - n_playoff_weeks + 1,
+        'num_playoff_teams': 2 ** n_playoff_weeks if n_playoff_weeks else 0,
+    })
+
+    for week, games in season.groupby('week', sort=True):
+        matchups = []
+        for _, teams in games.groupby('matchup_id', sort=True):
+            first = teams.iloc[0]
+            matchups.append({
+                'week': int(week),
+                'status': first['status'],
+                'is_playoffs': int(first['is_playoffs']),
+                'winner_team_key': first['winner_team_key'] or '',
+                'teams': [
+                    _team_json(
+                        team['team_key'],
+                        team_points={'coverage_type': 'week', 'week': int(week), 'total': float(team['team_total_points'])},
+                        team_projected_points={'coverage_type': 'week', 'week': int(week),
+                                               'total': float(team['team_projected_points'])},
+                    )
+                    for _, team in teams.iterrows()
+                ],
+            })
+        write('get_league_matchups_by_week', (int(week),), matchups)
+        write('get_league_scoreboard_by_week', (int(week),), {
+            'week': int(week), 'matchups': [{'matchup': matchup} for matchup in matchups],
+        })
+
+    standings = standings_frame(season)
+    write('get_league_standings', (), {'teams': [
+        _team_json(
+            row['team_key'],
+            clinched_playoffs=0,
+            team_points={'coverage_type': 'season', 'total': float(row['points_for'])},
+            team_standings={
+                'rank': int(row['rank']),
+                'playoff_seed': int(row['rank']),
+                'points_for': float(row['points_for']),
+                'points_against': round(float(row['points_against']), 2),
+                'outcome_totals': {'wins': int(row['wins']), 'losses': int(row['losses']), 'ties': 0},
+            },
+        )
+        for _, row in standings.iterrows()
+    ]})
+    write('get_league_teams', (), [
+        _team_json(team_key)['team'] for team_key in np.sort(season['team_key'].unique())
+    ])
+    write('get_league_transactions', (), [])
+
+    return n_weeks * 2 + 5
@@ -1,8 +1,85 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
 YAHOO_CLIENT_ID = os.getenv('CONSUMER_KEY')
-YAHOO_CLIENT_SECRET = os.getenv('CONSUMER_SECRET')
\ No newline at end of file
+YAHOO_CLIENT_SECRET = os.getenv('CONSUMER_SECRET')
+YAHOO_LEAGUE_ID = os.getenv('YAHOO_LEAGUE_ID', '49754')
+YAHOO_GAME_ID = os.getenv('YAHOO_GAME_ID', '423')
+
+# Playoff odds simulation
+ODDS_SIMULATIONS = int(os.getenv('ODDS_SIMULATIONS', 20000))      # Upper bound on simulated seasons
+ODDS_WORKERS = int(os.getenv('ODDS_WORKERS', 1))
+ODDS_MARGIN = float(os.getenv('ODDS_MARGIN', 1.0))                # Target margin of error, in %
+ODDS_TIME_BUDGET = float(os.getenv('ODDS_TIME_BUDGET', 3.0))      # Seconds before stopping early
+ODDS_BATCH_SIZE = int(os.getenv('ODDS_BATCH_SIZE', 5000))         # Seasons between convergence checks
+ODDS_VARIANCE_REDUCTION = os.getenv('ODDS_VARIANCE_REDUCTION', 'false').lower() == 'true'  # Antithetic + stratified draws
+
+# Clinch and elimination solver (!clinch)
+CLINCH_POINTS_MARGIN = float(os.getenv('CLINCH_POINTS_MARGIN', 100))  # Points per week left a points-for lead must exceed to settle a tie
+CLINCH_NODE_BUDGET = int(os.getenv('CLINCH_NODE_BUDGET', 500000))     # Search nodes for the smallest clinching scenarios, all teams
+
+# Command execution
+IO_WORKERS = int(os.getenv('IO_WORKERS', 8))                      # Threads for Yahoo and web requests
+CPU_WORKERS = int(os.getenv('CPU_WORKERS', 2))                    # Processes for simulations
+MAX_HEAVY_JOBS = int(os.getenv('MAX_HEAVY_JOBS', 2))              # Concurrent CPU-heavy commands
+COMMAND_TIMEOUT = float(os.getenv('COMMAND_TIMEOUT', 30.0))       # Seconds before a command gives up
+ODDS_TIMEOUT = float(os.getenv('ODDS_TIMEOUT', 60.0))
+
+# Yahoo response cache
+CACHE_DIR = os.getenv('CACHE_DIR', str(Path(__file__).parent.parent / 'cache'))
+CACHE_TTL_LIVE = float(os.getenv('CACHE_TTL_LIVE', 60))           # Current week matchups and scoreboard
+CACHE_TTL_STANDINGS = float(os.getenv('CACHE_TTL_STANDINGS', 300))
+CACHE_TTL_METADATA = float(os.getenv('CACHE_TTL_METADATA', 600))
+CACHE_TTL_TEAMS = float(os.getenv('CACHE_TTL_TEAMS', 3600))
+
+# Yahoo request scheduling
+YAHOO_MAX_CONCURRENCY = int(os.getenv('YAHOO_MAX_CONCURRENCY', 6))   # Requests in flight at once
+YAHOO_RATE_PER_SECOND = float(os.getenv('YAHOO_RATE_PER_SECOND', 1.0))  # Sustained rate, ~3,600/hour
+YAHOO_BURST = int(os.getenv('YAHOO_BURST', 20))                    # Requests allowed back to back
+YAHOO_MAX_RETRIES = int(os.getenv('YAHOO_MAX_RETRIES', 4))         # Retries after a throttling response
+
+# Local league store
+STORE_PATH = os.getenv('STORE_PATH', str(Path(__file__).parent.parent / 'data' / 'league.db'))
+STORE_MAX_AGE = float(os.getenv('STORE_MAX_AGE', 120))             # Seconds before commands trigger a sync
+
+# League history backfill (client/yahoo.py), SQLite or Postgres
+HISTORY_DATABASE_URL = os.getenv('DATABASE_URL', f"sqlite:///{Path(__file__).parent.parent / 'data' / 'history.db'}")
+
+# Background refresh of command snapshots
+SCHEDULER_TICK = float(os.getenv('SCHEDULER_TICK', 60))            # Seconds between checks for due snapshots
+
+# Request coalescing
+SINGLEFLIGHT_REUSE = float(os.getenv('SINGLEFLIGHT_REUSE', 5))     # Seconds a finished result is shared with new callers
+
+# Live scoreboard polling ("!scoreboard live")
+LIVE_POLL_MIN = float(os.getenv('LIVE_POLL_MIN', 60))             # Seconds between polls right after a score change
+LIVE_POLL_MAX = float(os.getenv('LIVE_POLL_MAX', 300))            # Back-off cap while games are being played
+LIVE_POLL_IDLE = float(os.getenv('LIVE_POLL_IDLE', 1800))         # Back-off cap outside game windows
+
+# Transaction feed
+TRANSACTIONS_CHANNEL_ID = int(os.getenv('TRANSACTIONS_CHANNEL_ID', 0))   # Channel new transactions are posted in, 0 disables the feed
+TRANSACTIONS_POLL = float(os.getenv('TRANSACTIONS_POLL', 300))           # Seconds between checks for new transactions
+
+# StatMuse lookups (!muse)
+MUSE_URL = os.getenv('MUSE_URL', 'https://www.statmuse.com/nfl/ask/')   # Point at a local server to test
+MUSE_TIMEOUT = float(os.getenv('MUSE_TIMEOUT', 8.0))               # Seconds before a lookup gives up
+MUSE_CACHE_SIZE = int(os.getenv('MUSE_CACHE_SIZE', 256))           # Answers kept in memory
+MUSE_CACHE_TTL = float(os.getenv('MUSE_CACHE_TTL', 3600))          # Seconds an answer is reused
+
+# Offline Yahoo record/replay (yahoo/transport.py, benchmarks/load.py)
+YAHOO_RECORD_DIR = os.getenv('YAHOO_RECORD_DIR')                  # Save every Yahoo response here
+YAHOO_REPLAY_DIR = os.getenv('YAHOO_REPLAY_DIR')                  # Serve Yahoo from these recordings instead of the network
+YAHOO_REPLAY_PROFILE = os.getenv('YAHOO_REPLAY_PROFILE')          # JSON of latency, jitter and error rate by endpoint
+YAHOO_REPLAY_SEED = os.getenv('YAHOO_REPLAY_SEED')
+
+# Instrumentation (/stats, Prometheus file, !profile)
+METRICS_PATH = os.getenv('METRICS_PATH', str(Path(__file__).parent.parent / 'data' / 'metrics.prom'))
+METRICS_INTERVAL = float(os.getenv('METRICS_INTERVAL', 15))        # Seconds between writes of the metrics file
+LOOP_LAG_INTERVAL = float(os.getenv('LOOP_LAG_INTERVAL', 1.0))     # Seconds between event-loop lag probes
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'false').lower() in ('1', 'true', 'yes')   # Allow !profile
+PROFILER_INTERVAL = float(os.getenv('PROFILER_INTERVAL', 0.005))   # Seconds between stack samples
+PROFILE_DIR = os.getenv('PROFILE_DIR', str(Path(__file__).parent.parent / 'data' / 'profiles'))
@@ -0,0 +1,142 @@
+#########################################################
+### THIS FILE KEEPS ONE SCOREBOARD MESSAGE PER CHANNEL ###
+### UP TO DATE WHILE GAMES ARE BEING PLAYED            ###
+#########################################################
+import discord
+import logging
+from discord.ext import commands, tasks
+from yahoo.functionality import read_scoreboard, hash_scoreboard, format_scoreboard
+from yahoo.scheduled_functions import week_phase
+from utils.executor import run_io
+from config.settings import LIVE_POLL_MIN, LIVE_POLL_MAX, LIVE_POLL_IDLE
+
+logger = logging.getLogger(__file__)
+logger.setLevel(logging.INFO)
+
+
+def score_changes(previous: dict, matchups: list) -> dict:
+    """
+    Points gained by each team since the previous poll
+
+    Parameters
+    ----------
+    previous: dict
+        points by team key from the previous poll
+    matchups: list
+        output of read_scoreboard
+
+    Returns
+    -------
+    dict
+        points gained by nickname, only teams whose score moved
+    """
+    changes = {}
+    for matchup in matchups:
+        for team in matchup['teams']:
+            delta = team['points'] - previous.get(team['team_key'], team['points'])
+            if delta:
+                changes[team['nickname']] = round(delta, 2)
+    return changes
+
+
+def next_interval(interval: float, changed: bool, live: bool) -> float:
+    """
+    Seconds until the next poll: back to the minimum after a change,
+    otherwise doubling up to the cap of the current part of the week
+    """
+    if changed and live:
+        return LIVE_POLL_MIN
+    cap = LIVE_POLL_MAX if live else LIVE_POLL_IDLE
+    return min(interval * 2, cap)
+
+
+class LiveScoreboard(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # One scoreboard message per subscribed channel, all fed by one poller
+        self.messages = {}
+        self.digest = None
+        self.points = {}
+        self.interval = LIVE_POLL_MIN
+
+    def cog_unload(self):
+        self.poll.cancel()
+
+    async def subscribe(self, channel) -> None:
+        """
+        Posts a scoreboard message in a channel and keeps it updated
+        """
+        matchups = await run_io(read_scoreboard)
+        message = await channel.send(embed=self._embed(matchups))
+        self.messages[channel.id] = message
+
+        if not self.poll.is_running():
+            self._reset(matchups)
+            self.poll.start()
+        logger.info(f"Live scoreboard started in {channel}, {len(self.messages)} channel(s)")
+
+    def unsubscribe(self, channel) -> bool:
+        """
+        Stops updating a channel's scoreboard, and the poller with the last one
+        """
+        message = self.messages.pop(channel.id, None)
+        if not self.messages:
+            self.poll.cancel()
+        return message is not None
+
+    def _reset(self, matchups: list) -> None:
+        self.digest = hash_scoreboard(matchups)
+        self.points = {team['team_key']: team['points'] for m in matchups for team in m['teams']}
+        self.interval = LIVE_POLL_MIN
+        self.poll.change_interval(seconds=self.interval)
+
+    def _embed(self, matchups: list, changes: dict = None) -> discord.Embed:
+        embed = format_scoreboard(matchups, changes)
+        embed.set_footer(text=f"Live · updated {discord.utils.utcnow():%H:%M} UTC")
+        return embed
+
+    @tasks.loop(seconds=LIVE_POLL_MIN)
+    async def poll(self):
+        try:
+            matchups = await run_io(read_scoreboard, None, True)
+        except Exception as e:
+            # Back off and keep the current messages
+            logger.error(f"Live scoreboard poll failed: {e}")
+            matchups = None
+
+        digest = hash_scoreboard(matchups) if matchups is not None else self.digest
+        changed = digest != self.digest
+        live = week_phase() == 'live' or any(m['status'] == 'midevent' for m in matchups or [])
+
+        if changed:
+            embed = self._embed(matchups, score_changes(self.points, matchups))
+            await self._edit_all(embed)
+            self.digest = digest
+            self.points = {team['team_key']: team['points'] for m in matchups for team in m['teams']}
+
+        self.interval = next_interval(self.interval, changed, live)
+        self.poll.change_interval(seconds=self.interval)
+
+        # Every game is final, nothing left to track this week
+        if matchups and all(m['status'] == 'postevent' for m in matchups):
+            logger.info("All matchups final, stopping live scoreboard")
+            self.messages.clear()
+            self.poll.stop()
+
+    @poll.before_loop
+    async def before_poll(self):
+        await self.bot.wait_until_ready()
+
+    async def _edit_all(self, embed: discord.Embed) -> None:
+        # Edits only, the channels never see a new message
+        for channel_id, message in list(self.messages.items()):
+            try:
+                await message.edit(embed=embed)
+            except discord.NotFound:
+                # Message was deleted, stop following that channel
+                self.messages.pop(channel_id, None)
+            except discord.HTTPException as e:
+                logger.error(f"Editing live scoreboard in {channel_id} failed: {e}")
+
+async def setup(bot):
+    await bot.add_cog(LiveScoreboard(bot))
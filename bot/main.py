@@ -1,11 +1,20 @@
 from typing import Final
 import os
+import time
+import asyncio
 from dotenv import load_dotenv
 from discord import Intents, Client, Message
 from discord.ext import commands
-from responses import search_muse
+from responses import search_muse, normalize_query, close_session
 from meta import Meta
-from yahoo.functionality import get_standings, get_scoreboard, get_power_rankings, get_playoff_odds
+from scheduler import serve_snapshot
+from yahoo.functionality import get_whatif_matrix
+from utils import executor
+from utils.executor import run_io
+from utils.singleflight import command_flight
+from utils.metrics import observe
+from utils.profiler import SamplingProfiler
+from config.settings import COMMAND_TIMEOUT, PROFILER_ENABLED, PROFILER_INTERVAL, PROFILE_DIR
 
 # Step 0: Load token somewhere safe
 load_dotenv()
@@ -16,49 +25,122 @@ intents: Intents = Intents.default()
 intents.message_content = True # NOQA
 bot = commands.Bot(command_prefix="!", intents=intents)
 
+async def close() -> None:
+    # Close the shared StatMuse session along with the bot
+    await close_session()
+    await commands.Bot.close(bot)
+
+bot.close = close
+
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 ################### ! COMMANDS ######################
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 
+@bot.before_invoke
+async def start_timer(ctx):
+    ctx.started_at = time.perf_counter()
+
+@bot.after_invoke
+async def record_latency(ctx):
+    # Runs after every ! command, including ones that failed
+    observe('marcy_command_seconds', time.perf_counter() - ctx.started_at, command=ctx.command.qualified_name)
+
+async def respond(ctx, func, *args, timeout=COMMAND_TIMEOUT):
+    """
+    Runs a blocking command function off the event loop and sends its embed
+    """
+    async with ctx.typing():
+        try:
+            # Identical commands typed at the same time share one run
+            embed = await command_flight.do((func.__name__, *args), run_io, func, *args, timeout=timeout)
+        except asyncio.TimeoutError:
+            await ctx.send('Sorry, Yahoo is taking too long. Try again in a minute.')
+            return
+        except Exception as e:
+            print(f'Error running {func.__name__}: {e}')
+            embed = None
+
+    if embed:
+        await ctx.send(embed=embed)
+    else:
+        await ctx.send('Sorry, there seems to be an issue.')
+
 @bot.command(name='muse')
 async def muse(ctx, *, user_text: str):
-    result = search_muse(user_text)
+    async with ctx.typing():
+        try:
+            # Async on a shared session, the event loop is never blocked
+            result = await command_flight.do(('search_muse', normalize_query(user_text)), search_muse, user_text)
+        except asyncio.TimeoutError:
+            print('StatMuse timed out')
+            result = None
+        except Exception as e:
+            print(f'Error running search_muse: {e}')
+            result = None
     if result:
         await ctx.send(result)
     else:
         await ctx.send('Sorry, I could not retrieve this statistic.')
 
+# Words that make a command skip its snapshot, e.g. "!odds refresh"
+FORCE_OPTIONS = {'refresh', 'force', 'now'}
+
+def wants_refresh(option) -> bool:
+    return option is not None and option.lower() in FORCE_OPTIONS
+
 @bot.command(name="standings")
-async def standings(ctx):
-    standings = get_standings()
-    if standings:
-        await ctx.send(embed=standings)
-    else:
-        await ctx.send('Sorry, there seems to be an issue.') 
+async def standings(ctx, option: str = None):
+    await serve_snapshot(ctx, 'standings', force=wants_refresh(option))
 
 @bot.command(name='scoreboard')
-async def scoreboard(ctx):
-    scoreboard = get_scoreboard()
-    if scoreboard:
-        await ctx.send(embed=scoreboard)
+async def scoreboard(ctx, option: str = None):
+    # "!scoreboard live" keeps one message updated, "!scoreboard stop" ends it
+    live = bot.get_cog('LiveScoreboard')
+    if option and option.lower() == 'live' and live:
+        await live.subscribe(ctx.channel)
+    elif option and option.lower() == 'stop' and live:
+        if not live.unsubscribe(ctx.channel):
+            await ctx.send('There is no live scoreboard in this channel.')
     else:
-        await ctx.send('Sorry, there seems to be an issue.')
+        await serve_snapshot(ctx, 'scoreboard', force=wants_refresh(option))
 
 @bot.command(name='powrank')
-async def powrank(ctx):
-    powrank = get_power_rankings()
-    if powrank:
-        await ctx.send(embed=powrank)
-    else:
-        await ctx.send('Sorry, there seems to be an issue.')
+async def powrank(ctx, option: str = None):
+    await serve_snapshot(ctx, 'powrank', force=wants_refresh(option))
+
+@bot.command(name='whatif')
+async def whatif(ctx):
+    await respond(ctx, get_whatif_matrix)
 
 @bot.command(name='odds')
-async def odds(ctx):
-    odds = get_playoff_odds()
-    if odds:
-        await ctx.send(embed=odds)
-    else:
-        await ctx.send('Sorry, there seems to be an issue.')
+async def odds(ctx, option: str = None):
+    # Simulations run in the background, the command serves the latest result
+    await serve_snapshot(ctx, 'odds', force=wants_refresh(option))
+
+@bot.command(name='clinch')
+async def clinch(ctx, option: str = None):
+    # Exact clinched / eliminated status and what each team in the hunt needs
+    await serve_snapshot(ctx, 'clinch', force=wants_refresh(option))
+
+@bot.command(name='profile')
+async def profile(ctx, name: str, *options):
+    """
+    Runs one command under the sampling profiler, e.g. "!profile odds refresh"
+    """
+    command = bot.get_command(name)
+    if not PROFILER_ENABLED or command is None or command.name == 'profile':
+        await ctx.send('Profiling is not available for that command.')
+        return
+
+    with SamplingProfiler(PROFILER_INTERVAL) as profiler:
+        await command.callback(ctx, *options)
+    path = await run_io(profiler.save, PROFILE_DIR, command.name)
+
+    lines = [f"{share:>6.1%}  {function}" for function, share in profiler.top(10)]
+    await ctx.send(
+        f"Profiled `{name}` for {profiler.elapsed:.2f}s ({profiler.samples} samples), stacks in `{path.name}`\n"
+        f"```{chr(10).join(lines) or 'No busy samples'}```"
+    )
 
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 ################### SCHEDULED #######################
@@ -79,6 +161,8 @@ async def on_message(ctx):
 ################ TRANSACTIONS LOOP ##################
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 
+# New transactions are posted by the Transactions cog (transactions.py)
+
 # Startup
 @bot.event
 async def on_ready() -> None:
@@ -105,6 +189,10 @@ async def on_message(message: Message) -> None:
 # Load cogs
 async def load_extensions():
     await bot.load_extension('meta')
+    await bot.load_extension('scheduler')
+    await bot.load_extension('live')
+    await bot.load_extension('transactions')
+    await bot.load_extension('monitor')
 
 @bot.event
 async def on_ready():
@@ -118,7 +206,12 @@ async def on_ready():
 
 # Step 5: Main entry point
 def main() -> None:
-    bot.run(token=TOKEN)
+    # Fork the simulation workers before the gateway threads start
+    executor.start()
+    try:
+        bot.run(token=TOKEN)
+    finally:
+        executor.shutdown()
 
 if __name__ == '__main__':
     main()
@@ -6,6 +6,9 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
+from yahoo.functionality import get_head_to_head
+from utils.executor import run_io
+from utils.metrics import snapshot, timer
 
 logger = logging.getLogger(__file__)
 logger.setLevel(logging.INFO)
@@ -28,11 +31,14 @@ class Meta(commands.Cog):
             name="/standings", value="Gives the current league standings", inline=False
         )
         embed.add_field(
-            name="/stats player_name", value="Gives the player statistics of the given player", inline=False
+            name="/stats", value="Gives the bot's diagnostics: command latency, Yahoo calls and cache hit rates", inline=False
         )
         embed.add_field(
             name="/muse query", value="Returns statistics based on user query", inline=False
         )
+        embed.add_field(
+            name="/h2h manager opponent", value="Gives the all-time head-to-head record of two managers", inline=False
+        )
         await interaction.response.send_message(embed=embed)
         logger.info("Help message sent")
 
@@ -42,5 +48,82 @@ class Meta(commands.Cog):
         await interaction.response.send_message(f'Pong! Latency: {self.bot.latency * 1000:.2f}ms')
         logger.info("Ping message sent")
 
+    @app_commands.command(name="h2h", description="All-time head-to-head record of two managers")
+    @app_commands.describe(manager="Manager nickname", opponent="Opponent nickname")
+    async def h2h(self, interaction: discord.Interaction, manager: str, opponent: str):
+        logger.info("H2H command triggered")
+        try:
+            with timer('marcy_command_seconds', command='h2h'):
+                embed = await run_io(get_head_to_head, manager, opponent)
+        except Exception as e:
+            logger.error(f"Error running get_head_to_head: {e}")
+            await interaction.response.send_message('Sorry, there seems to be an issue.')
+            return
+        await interaction.response.send_message(embed=embed)
+        logger.info("H2H message sent")
+
+    @app_commands.command(name="stats", description="Diagnostics: latency, Yahoo calls and cache hit rates")
+    async def stats(self, interaction: discord.Interaction):
+        logger.info("Stats command triggered")
+        await interaction.response.send_message(embed=stats_embed(self.bot.latency))
+        logger.info("Stats message sent")
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds < 10 else f"{seconds:.1f}s"
+
+
+def stats_embed(gateway_latency: float) -> discord.Embed:
+    """
+    Builds the /stats embed from the current metrics
+    """
+    metrics = snapshot()
+    histograms, counters, gauges = metrics['histograms'], metrics['counters'], metrics['gauges']
+    embed = discord.Embed(title="Marcy Diagnostics", color=0x00ff00)
+
+    # Per-command latency, busiest commands first
+    commands_ = sorted(
+        ((dict(labels)['command'], h) for (name, labels), h in histograms.items() if name == 'marcy_command_seconds'),
+        key=lambda item: -item[1]['count'],
+    )
+    lines = [f"{'Command':<12}{'N':>5}{'p50':>8}{'p95':>8}{'p99':>8}"]
+    lines += [f"{command:<12}{h['count']:>5}{_ms(h['p50']):>8}{_ms(h['p95']):>8}{_ms(h['p99']):>8}"
+              for command, h in commands_[:10]]
+    embed.add_field(name="Commands", value=f"```{chr(10).join(lines)}```", inline=False)
+
+    # Yahoo requests that actually went out, cache hits never get there
+    requests = {
+        dict(labels)['endpoint']: h for (name, labels), h in histograms.items()
+        if name == 'marcy_yahoo_request_seconds'
+    }
+    lines = [f"{'Endpoint':<14}{'N':>5}{'avg':>8}{'p95':>8}"]
+    lines += [f"{endpoint:<14}{h['count']:>5}{_ms(h['sum'] / h['count']):>8}{_ms(h['p95']):>8}"
+              for endpoint, h in sorted(requests.items())]
+    embed.add_field(name="Yahoo API", value=f"```{chr(10).join(lines)}```", inline=False)
+
+    embed.add_field(name="Cache hit rate", value=f"{gauges.get(('marcy_cache_hit_rate', ()), 0):.0%}", inline=True)
+    embed.add_field(name="Coalesced", value=f"{gauges.get(('marcy_coalesce_rate', ()), 0):.0%}", inline=True)
+    embed.add_field(name="Muse cache", value=f"{gauges.get(('marcy_muse_cache_hit_rate', ()), 0):.0%}", inline=True)
+
+    simulations = counters.get(('marcy_simulations_total', ()), 0)
+    throughput = gauges.get(('marcy_simulation_sims_per_second', ()))
+    embed.add_field(
+        name="Simulations",
+        value=f"{simulations:,.0f} run" + (f", last at {throughput:,.0f}/s" if throughput else ""),
+        inline=True,
+    )
+    lag = histograms.get(('marcy_event_loop_lag_seconds', ()))
+    embed.add_field(
+        name="Event loop lag",
+        value=f"p99 {_ms(lag['p99'])}, max {_ms(lag['max'])}" if lag else "not measured yet",
+        inline=True,
+    )
+    embed.add_field(name="Gateway", value=_ms(gateway_latency), inline=True)
+
+    uptime = gauges.get(('marcy_uptime_seconds', ()), 0)
+    embed.set_footer(text=f"Up {uptime / 3600:.1f}h")
+    return embed
+
+
 async def setup(bot):
     await bot.add_cog(Meta(bot))
@@ -0,0 +1,45 @@
+#########################################################
+### THIS FILE MEASURES EVENT-LOOP LAG AND WRITES THE  ###
+### METRICS FILE THAT PROMETHEUS SCRAPES              ###
+#########################################################
+import time
+import asyncio
+import logging
+from discord.ext import commands, tasks
+from utils.metrics import observe, write_prometheus
+from utils.executor import run_io
+from config.settings import METRICS_PATH, METRICS_INTERVAL, LOOP_LAG_INTERVAL
+
+logger = logging.getLogger(__file__)
+logger.setLevel(logging.INFO)
+
+
+class Monitor(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.lag_probe = asyncio.get_running_loop().create_task(self.probe_lag())
+        self.write_metrics.start()
+
+    def cog_unload(self):
+        self.lag_probe.cancel()
+        self.write_metrics.cancel()
+
+    async def probe_lag(self):
+        # A sleeping task wakes up late by however long the loop was blocked
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            lag = max(0.0, time.perf_counter() - start - LOOP_LAG_INTERVAL)
+            observe('marcy_event_loop_lag_seconds', lag)
+            if lag > 0.25:
+                logger.warning(f"Event loop was blocked for {lag * 1000:.0f}ms")
+
+    @tasks.loop(seconds=METRICS_INTERVAL)
+    async def write_metrics(self):
+        try:
+            await run_io(write_prometheus, METRICS_PATH)
+        except Exception as e:
+            logger.error(f"Writing metrics to {METRICS_PATH} failed: {e}")
+
+async def setup(bot):
+    await bot.add_cog(Monitor(bot))
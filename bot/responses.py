@@ -1,35 +1,170 @@
-import requests
-from bs4 import BeautifulSoup
+import re
+import time
+import aiohttp
+from urllib.parse import quote
+from collections import Counter, OrderedDict
+from bs4 import BeautifulSoup, SoupStrainer
+from config.settings import MUSE_URL, MUSE_TIMEOUT, MUSE_CACHE_SIZE, MUSE_CACHE_TTL
 
+"""
+THIS FILE ANSWERS !muse QUESTIONS WITH STATMUSE. LOOKUPS ARE ASYNC ON
+ONE SHARED HTTP SESSION, ONLY THE ANSWER HEADING IS PARSED, AND
+ANSWERS ARE CACHED SO POPULAR QUESTIONS COME BACK INSTANTLY
+"""
 
-def search_muse(query:str) -> str:
+# The answer is the first <h1>, no need to read the page past it
+HEADING_END = b'</h1>'
+MAX_PAGE_BYTES = 1 << 20
+
+
+def normalize_query(query: str) -> str:
     """
-    This function takes a user str request and returns Statmuse query
+    Canonical form of a question, so "Who  led the NFL in TDs?" and
+    "who led the nfl in tds" share one lookup and one cache entry
+    """
+    query = re.sub(r'\s+', ' ', query).strip().lower()
+    return query.rstrip('?!. ')
+
+
+class AnswerCache:
+    """
+    Least-recently-used answers that also expire after a time-to-live
 
     Parameters
     ----------
-    str: query
-        text from user in discord server
-    
-    Returns
-    -------
-    str: result
-        text of query response
+    size: int
+        answers kept, the least recently used is dropped first
+    ttl: float
+        seconds an answer is served
+    """
+
+    def __init__(self, size: int = MUSE_CACHE_SIZE, ttl: float = MUSE_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._answers = OrderedDict()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def get(self, key: str):
+        entry = self._answers.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            self._answers.pop(key, None)
+            self.misses['muse'] += 1
+            return None
+        self._answers.move_to_end(key)
+        self.hits['muse'] += 1
+        return entry[1]
+
+    def put(self, key: str, answer: str) -> None:
+        self._answers[key] = (time.monotonic(), answer)
+        self._answers.move_to_end(key)
+        while len(self._answers) > self.size:
+            self._answers.popitem(last=False)
+
+    def stats(self) -> dict:
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            'size': len(self._answers),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+answer_cache = AnswerCache()
+
+##################################################
+################## HTTP SESSION ##################
+##################################################
+
+_session = None
+
+
+def get_session() -> aiohttp.ClientSession:
     """
+    Shared session, so lookups reuse pooled connections
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=MUSE_TIMEOUT),
+            headers={'User-Agent': 'Mozilla/5.0 (compatible; Marcy fantasy football bot)'},
+        )
+    return _session
+
 
-    URL = f'https://www.statmuse.com/nfl/ask/{query}'
-    page = requests.get(URL)
-    soup = BeautifulSoup(page.content, 'html.parser')
+async def close_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
 
-    if page.status_code != 200:
-        raise Exception(f"Failed to retrieve data from {URL}")
+
+async def read_heading(response: aiohttp.ClientResponse) -> bytes:
+    """
+    Reads a page only up to the end of its first heading
+    """
+    page = b''
+    async for chunk in response.content.iter_chunked(16384):
+        # Search from just before the new chunk, the tag may be split
+        start = max(len(page) - len(HEADING_END), 0)
+        page += chunk
+        end = page.find(HEADING_END, start)
+        if end >= 0:
+            return page[:end + len(HEADING_END)]
+        if len(page) > MAX_PAGE_BYTES:
+            break
+    return page
+
+
+def parse_answer(page: bytes) -> str:
+    """
+    Text of the answer span inside the page's first heading
+    """
+    soup = BeautifulSoup(page, 'html.parser', parse_only=SoupStrainer('h1'))
 
     h1_tag = soup.find("h1")
     if h1_tag is None:
         raise ValueError("Could not find h1")
-    
+
     span_tag = h1_tag.find("span")
     if span_tag is None:
         raise ValueError("Could not find span")
-    
+
     return span_tag.text
+
+
+async def search_muse(query: str, session: aiohttp.ClientSession = None, base_url: str = MUSE_URL) -> str:
+    """
+    This function takes a user str request and returns Statmuse query
+
+    Parameters
+    ----------
+    query: str
+        text from user in discord server
+    session: aiohttp.ClientSession | None
+        session to use, defaults to the shared one
+    base_url: str
+        StatMuse ask URL, the question is appended to it
+
+    Returns
+    -------
+    str: result
+        text of query response
+    """
+    key = normalize_query(query)
+    answer = answer_cache.get(key)
+    if answer is not None:
+        return answer
+
+    URL = f'{base_url}{quote(key)}'
+    session = get_session() if session is None else session
+
+    # Raises asyncio.TimeoutError after MUSE_TIMEOUT seconds
+    async with session.get(URL) as page:
+        if page.status != 200:
+            raise Exception(f"Failed to retrieve data from {URL}")
+        answer = parse_answer(await read_heading(page))
+
+    answer_cache.put(key, answer)
+    return answer
@@ -0,0 +1,130 @@
+#########################################################
+### THIS FILE REFRESHES COMMAND RESULTS IN BACKGROUND ###
+### SO COMMANDS ANSWER FROM A WARM SNAPSHOT RIGHT AWAY ###
+#########################################################
+import time
+import asyncio
+import logging
+from discord.ext import commands, tasks
+from yahoo.functionality import (
+    get_standings, get_scoreboard, get_power_rankings,
+    get_simulation_inputs, simulate_playoff_odds, format_playoff_odds,
+    solve_clinch_scenarios, format_clinch_scenarios
+)
+from yahoo.scheduled_functions import (
+    REFRESH_INTERVALS, publish_snapshot, get_snapshot, is_due, with_age, in_background
+)
+from utils.executor import run_io, run_cpu
+from utils.singleflight import command_flight
+from utils.metrics import inc, set_gauge
+from config.settings import COMMAND_TIMEOUT, ODDS_TIMEOUT, SCHEDULER_TICK
+
+logger = logging.getLogger(__file__)
+logger.setLevel(logging.INFO)
+
+
+async def _refresh_odds():
+    # Yahoo I/O on threads, the simulation itself on the process pool
+    inputs = await run_io(in_background, get_simulation_inputs)
+    simulation = await run_cpu(simulate_playoff_odds, inputs, timeout=ODDS_TIMEOUT)
+    # Recorded here, the worker process has its own copy of the metrics
+    inc('marcy_simulations_total', simulation['n_simulations'])
+    set_gauge('marcy_simulation_sims_per_second', simulation['sims_per_second'])
+    return await run_io(format_playoff_odds, inputs['team_keys'], simulation)
+
+
+async def _refresh_clinch():
+    # Same inputs as the odds, the search itself on the process pool
+    inputs = await run_io(in_background, get_simulation_inputs)
+    scenarios = await run_cpu(solve_clinch_scenarios, inputs, timeout=ODDS_TIMEOUT)
+    return await run_io(format_clinch_scenarios, inputs['team_keys'], scenarios)
+
+
+# Coroutine that recomputes each snapshot
+REFRESHERS = {
+    'standings': lambda: run_io(in_background, get_standings, timeout=COMMAND_TIMEOUT),
+    'scoreboard': lambda: run_io(in_background, get_scoreboard, timeout=COMMAND_TIMEOUT),
+    'powrank': lambda: run_io(in_background, get_power_rankings, timeout=COMMAND_TIMEOUT),
+    'odds': _refresh_odds,
+    'clinch': _refresh_clinch,
+}
+
+async def _refresh(name: str):
+    start = time.perf_counter()
+    value = await REFRESHERS[name]()
+    if value is None:
+        raise RuntimeError(f'{name} refresh returned nothing')
+    snapshot = publish_snapshot(name, value, time.perf_counter() - start)
+
+    logger.info(f"Refreshed {name} v{snapshot.version} in {snapshot.elapsed:.2f}s")
+    return snapshot
+
+
+async def refresh_snapshot(name: str):
+    """
+    Recomputes one snapshot and publishes it as a new version
+
+    Callers that ask while the same snapshot is being refreshed, or just
+    after, get that refresh instead of starting another one.
+
+    Parameters
+    ----------
+    name: str
+        key of REFRESHERS
+
+    Returns
+    -------
+    Snapshot
+        the newly published snapshot
+    """
+    return await command_flight.do(f'refresh_{name}', _refresh, name)
+
+
+async def serve_snapshot(ctx, name: str, force: bool = False) -> None:
+    """
+    Sends the latest snapshot of a command with its age, computing it
+    first if it does not exist yet or if a refresh is forced
+    """
+    if get_snapshot(name) is None or force:
+        async with ctx.typing():
+            try:
+                await refresh_snapshot(name)
+            except asyncio.TimeoutError:
+                logger.error(f"Refreshing {name} timed out")
+            except Exception as e:
+                logger.error(f"Error refreshing {name}: {e}")
+
+    # The new version, or the last good one if the refresh failed
+    snapshot = get_snapshot(name)
+    if snapshot is None:
+        await ctx.send('Sorry, there seems to be an issue. Try again in a minute.')
+        return
+    await ctx.send(embed=with_age(snapshot))
+
+
+class Scheduler(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.refresh.start()
+
+    def cog_unload(self):
+        self.refresh.cancel()
+
+    @tasks.loop(seconds=SCHEDULER_TICK)
+    async def refresh(self):
+        # Cadence follows the NFL week, see REFRESH_INTERVALS
+        for name in REFRESH_INTERVALS['live']:
+            if not is_due(name):
+                continue
+            try:
+                await refresh_snapshot(name)
+            except Exception as e:
+                # Keep serving the previous version, retry on the next tick
+                logger.error(f"Scheduled refresh of {name} failed: {e}")
+
+    @refresh.before_loop
+    async def before_refresh(self):
+        await self.bot.wait_until_ready()
+
+async def setup(bot):
+    await bot.add_cog(Scheduler(bot))
@@ -0,0 +1,55 @@
+#########################################################
+### THIS FILE POSTS NEW ADDS, DROPS AND TRADES TO THE ###
+### LEAGUE CHANNEL AS THEY HAPPEN                     ###
+#########################################################
+import logging
+from discord.ext import commands, tasks
+from yahoo.functionality import read_new_transactions, postable_transactions, format_transactions
+from yahoo.store import write_transaction_cursor
+from yahoo.scheduled_functions import in_background
+from utils.executor import run_io
+from config.settings import TRANSACTIONS_CHANNEL_ID, TRANSACTIONS_POLL
+
+logger = logging.getLogger(__file__)
+logger.setLevel(logging.INFO)
+
+
+class Transactions(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        if TRANSACTIONS_CHANNEL_ID:
+            self.watch.start()
+
+    def cog_unload(self):
+        self.watch.cancel()
+
+    @tasks.loop(seconds=TRANSACTIONS_POLL)
+    async def watch(self):
+        channel = self.bot.get_channel(TRANSACTIONS_CHANNEL_ID)
+        if channel is None:
+            logger.error(f"Transaction channel {TRANSACTIONS_CHANNEL_ID} not found")
+            return
+
+        try:
+            new = await run_io(in_background, read_new_transactions)
+        except Exception as e:
+            logger.error(f"Reading transactions failed: {e}")
+            return
+        if not new:
+            return
+
+        # A waiver run is one burst of transactions, posted as one embed
+        postable = postable_transactions(new)
+        if postable:
+            await channel.send(embed=format_transactions(postable))
+            logger.info(f"Posted {len(postable)} transaction(s)")
+
+        # Only moved once posted, so a failed send is retried on the next poll
+        await run_io(write_transaction_cursor, new[-1])
+
+    @watch.before_loop
+    async def before_watch(self):
+        await self.bot.wait_until_ready()
+
+async def setup(bot):
+    await bot.add_cog(Transactions(bot))
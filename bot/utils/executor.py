@@ -0,0 +1,116 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from config.settings import IO_WORKERS, CPU_WORKERS, MAX_HEAVY_JOBS, COMMAND_TIMEOUT
+
+"""
+THIS FILE KEEPS BLOCKING WORK OFF THE DISCORD EVENT LOOP.
+YAHOO AND WEB REQUESTS RUN ON A BOUNDED THREAD POOL, SIMULATIONS
+RUN ON A PROCESS POOL WITH A CAP ON CONCURRENT HEAVY JOBS
+"""
+
+# Threads for blocking HTTP calls (yfpy, requests) and light pandas work
+io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix='marcy-io')
+
+# Processes for CPU-bound simulations, created by start()
+cpu_pool = None
+
+# Caps the number of heavy jobs on the process pool, created inside the running loop
+heavy_jobs = None
+
+
+def _warm_up():
+    """
+    No-op used to fork the worker processes ahead of the first command
+    """
+    return None
+
+
+def start():
+    """
+    Starts the process pool and forks its workers
+
+    Call before bot.run so workers are created from a process that is not
+    yet running the gateway threads.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+    global cpu_pool
+    if cpu_pool is not None:
+        return
+
+    cpu_pool = ProcessPoolExecutor(max_workers=CPU_WORKERS)
+    for future in [cpu_pool.submit(_warm_up) for _ in range(CPU_WORKERS)]:
+        future.result()
+
+
+def shutdown():
+    """
+    Stops both pools without waiting for queued work
+    """
+    global cpu_pool
+    io_pool.shutdown(wait=False, cancel_futures=True)
+    if cpu_pool is not None:
+        cpu_pool.shutdown(wait=False, cancel_futures=True)
+        cpu_pool = None
+
+
+async def run_io(func, *args, timeout: float = COMMAND_TIMEOUT, **kwargs):
+    """
+    Runs a blocking function on the I/O thread pool
+
+    Parameters
+    ----------
+    func: callable
+        blocking function, e.g. a yfpy-backed command function
+    timeout: float
+        seconds to wait before raising asyncio.TimeoutError
+
+    Returns
+    -------
+    Any
+        return value of func
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+
+    # The thread keeps running after a timeout, but the command stops waiting
+    return await asyncio.wait_for(loop.run_in_executor(io_pool, call), timeout)
+
+
+async def run_cpu(func, *args, timeout: float = COMMAND_TIMEOUT, **kwargs):
+    """
+    Runs a CPU-heavy function on the process pool, at most MAX_HEAVY_JOBS at a time
+
+    Parameters
+    ----------
+    func: callable
+        picklable, module-level function
+    timeout: float
+        seconds to wait, including time queued behind other heavy jobs,
+        before raising asyncio.TimeoutError
+
+    Returns
+    -------
+    Any
+        return value of func
+    """
+    global heavy_jobs
+    start()
+    if heavy_jobs is None:
+        heavy_jobs = asyncio.Semaphore(MAX_HEAVY_JOBS)
+
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+
+    async def _run():
+        async with heavy_jobs:
+            return await loop.run_in_executor(cpu_pool, call)
+
+    return await asyncio.wait_for(_run(), timeout)
@@ -0,0 +1,223 @@
+import os
+import time
+import threading
+import contextlib
+from bisect import bisect_left
+from pathlib import Path
+
+"""
+THIS FILE HOLDS THE BOT'S IN-PROCESS METRICS: COUNTERS, GAUGES AND
+LATENCY HISTOGRAMS, KEYED BY NAME AND LABELS. THEY ARE SHOWN BY /stats
+AND WRITTEN AS A PROMETHEUS TEXT FILE BY THE Monitor COG (monitor.py)
+"""
+
+# Upper bounds in seconds, from a cache hit to a slow simulation
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Help text of every metric, also the list of names written to Prometheus
+DESCRIPTIONS = {
+    'marcy_command_seconds': 'Time to answer a command',
+    'marcy_yahoo_request_seconds': 'Time of one Yahoo API request',
+    'marcy_yahoo_requests_total': 'Yahoo API requests made',
+    'marcy_cache_hit_rate': 'Share of Yahoo reads answered by the response cache',
+    'marcy_cache_requests_total': 'Yahoo reads seen by the response cache',
+    'marcy_coalesce_rate': 'Share of identical concurrent commands that shared a run',
+    'marcy_muse_cache_hit_rate': 'Share of !muse questions answered from cache',
+    'marcy_simulations_total': 'Playoff-odds seasons simulated',
+    'marcy_simulation_sims_per_second': 'Throughput of the last playoff-odds simulation',
+    'marcy_event_loop_lag_seconds': 'Delay of the event loop in waking a sleeping task',
+    'marcy_uptime_seconds': 'Seconds since the bot started',
+}
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram, as Prometheus represents one
+
+    Parameters
+    ----------
+    buckets: tuple
+        increasing upper bounds in seconds
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimated quantile, interpolated inside the bucket it falls in
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+_started = time.time()
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted(labels.items())))
+
+
+def inc(name: str, amount: float = 1, **labels) -> None:
+    """
+    Adds to a counter, e.g. inc('marcy_yahoo_requests_total', endpoint='standings')
+    """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    """
+    Records one duration in a histogram
+    """
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+
+@contextlib.contextmanager
+def timer(name: str, **labels):
+    """
+    Observes the time spent in the enclosed block, even if it raises
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+##################################################
+################### COLLECTION ###################
+##################################################
+
+def _collect() -> None:
+    """
+    Copies counters kept by other modules into gauges, just before reading
+    """
+    # Imported here, these modules import this one
+    from yahoo import client
+    from responses import answer_cache
+    from utils.singleflight import command_flight
+
+    cached_query = client._query
+    if cached_query is not None:
+        stats = cached_query.stats()
+        set_gauge('marcy_cache_hit_rate', stats['hit_rate'])
+        for endpoint in set(stats['hits']) | set(stats['misses']):
+            set_gauge('marcy_cache_requests_total', stats['hits'].get(endpoint, 0), endpoint=endpoint, result='hit')
+            set_gauge('marcy_cache_requests_total', stats['misses'].get(endpoint, 0), endpoint=endpoint, result='miss')
+
+    set_gauge('marcy_coalesce_rate', command_flight.stats()['collapse_rate'])
+    set_gauge('marcy_muse_cache_hit_rate', answer_cache.stats()['hit_rate'])
+    set_gauge('marcy_uptime_seconds', time.time() - _started)
+
+
+def snapshot() -> dict:
+    """
+    Current values of every metric
+
+    Returns
+    -------
+    dict
+        'counters' and 'gauges' as {(name, labels): value} and
+        'histograms' as {(name, labels): {'count', 'sum', 'p50', 'p95', 'p99', 'max'}}
+    """
+    _collect()
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'gauges': dict(_gauges),
+            'histograms': {
+                key: {
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'p50': histogram.quantile(0.50),
+                    'p95': histogram.quantile(0.95),
+                    'p99': histogram.quantile(0.99),
+                    'max': histogram.max,
+                }
+                for key, histogram in _histograms.items()
+            },
+        }
+
+
+def _labels(labels: tuple, **extra) -> str:
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+
+def render_prometheus() -> str:
+    """
+    Every metric in the Prometheus text exposition format
+    """
+    _collect()
+    lines = []
+    with _lock:
+        for name, description in DESCRIPTIONS.items():
+            counters = [(labels, value) for (n, labels), value in _counters.items() if n == name]
+            gauges = [(labels, value) for (n, labels), value in _gauges.items() if n == name]
+            histograms = [(labels, h) for (n, labels), h in _histograms.items() if n == name]
+            if not (counters or gauges or histograms):
+                continue
+
+            kind = 'histogram' if histograms else 'counter' if counters or name.endswith('_total') else 'gauge'
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in counters + gauges:
+                lines.append(f'{name}{_labels(labels)} {value}')
+            for labels, histogram in histograms:
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_labels(labels, le=bound)} {cumulative}')
+                lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {histogram.count}')
+                lines.append(f'{name}_sum{_labels(labels)} {histogram.sum}')
+                lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path) -> None:
+    """
+    Writes the metrics file atomically, so a scraper never reads half of it
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(path.suffix + '.tmp')
+    temporary.write_text(render_prometheus())
+    os.replace(temporary, path)
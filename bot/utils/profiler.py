@@ -0,0 +1,108 @@
+import sys
+import time
+import threading
+from collections import Counter
+from pathlib import Path
+
+"""
+THIS FILE IS A SMALL SAMPLING PROFILER. WHILE ACTIVE, A BACKGROUND
+THREAD RECORDS THE STACK OF EVERY OTHER THREAD AT A FIXED INTERVAL, SO
+ONE COMMAND CAN BE PROFILED ACROSS THE EVENT LOOP AND THE I/O THREADS
+WITHOUT SLOWING DOWN ANYTHING ELSE
+"""
+
+# Where threads sit when they have nothing to do, left out of top()
+IDLE_FUNCTIONS = {
+    'selectors.py:select',     # event loop waiting for events
+    'thread.py:_worker',       # pool thread waiting for work
+    'threading.py:wait',       # thread waiting on a condition
+    'profiler.py:_sample',
+}
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads while used as a context manager
+
+    Parameters
+    ----------
+    interval: float
+        seconds between samples
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name='marcy-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._start
+        return False
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{Path(code.co_filename).name}:{code.co_name}:{frame.f_lineno}')
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """
+        Stacks in collapsed format ("a;b;c count"), ready for flamegraph tools
+        """
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+    def top(self, n: int = 10, include: str = None) -> list:
+        """
+        Busy functions seen on top of a stack most often
+
+        Parameters
+        ----------
+        n: int
+            number of functions
+        include: str | None
+            only count stacks passing through a file containing this text,
+            e.g. 'functionality' for the command's own work
+
+        Returns
+        -------
+        list
+            (function, share of samples) pairs, most frequent first
+        """
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            if include is not None and include not in stack:
+                continue
+            leaf = stack.rsplit(';', 1)[-1]
+            if leaf.rsplit(':', 1)[0] in IDLE_FUNCTIONS:
+                continue
+            leaves[leaf] += count
+        total = sum(leaves.values())
+        return [(leaf, count / total) for leaf, count in leaves.most_common(n)] if total else []
+
+    def save(self, directory, name: str) -> Path:
+        """
+        Writes the collapsed stacks to directory/name-<timestamp>.txt
+        """
+        path = Path(directory) / f'{name}-{time.strftime("%Y%m%d-%H%M%S")}.txt'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.collapsed())
+        return path
@@ -0,0 +1,176 @@
+import time
+import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from config.settings import SINGLEFLIGHT_REUSE
+
+"""
+THIS FILE COLLAPSES IDENTICAL WORK THAT IS ASKED FOR AT THE SAME TIME.
+THE FIRST CALLER FOR A KEY RUNS IT, EVERYONE ELSE WHO ASKS WHILE IT IS
+RUNNING (OR SHORTLY AFTER) GETS THE SAME RESULT
+"""
+
+
+class _Metrics:
+    """
+    Per-name counters shared by both flavours of single flight
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+        self.runs = Counter()
+        self.joined = Counter()
+        self.reused = Counter()
+
+    def stats(self) -> dict:
+        """
+        Counters by name plus the share of calls that did no work
+
+        Returns
+        -------
+        dict
+            'calls', 'runs', 'joined' (waited on an in-flight run),
+            'reused' (served from the reuse window), 'collapsed' (joined
+            plus reused) and 'collapse_rate' in [0, 1]
+        """
+        calls = sum(self.calls.values())
+        collapsed = sum(self.joined.values()) + sum(self.reused.values())
+
+        return {
+            'calls': dict(self.calls),
+            'runs': dict(self.runs),
+            'joined': dict(self.joined),
+            'reused': dict(self.reused),
+            'collapsed': collapsed,
+            'collapse_rate': collapsed / calls if calls else 0.0,
+        }
+
+
+def _name(key) -> str:
+    # Metrics are grouped by the first part of the key, e.g. the command
+    return str(key[0] if isinstance(key, tuple) else key)
+
+
+class SingleFlight(_Metrics):
+    """
+    Coalesces identical coroutines on the event loop
+
+    Parameters
+    ----------
+    reuse: float
+        seconds a finished result is handed to new callers without rerunning
+    """
+
+    def __init__(self, reuse: float = 0.0):
+        super().__init__()
+        self.reuse = reuse
+        self._inflight = {}
+        self._recent = {}
+
+    async def do(self, key, func, *args, reuse: float = None, **kwargs):
+        """
+        Awaits func(*args, **kwargs), unless the same key is already running
+        or finished within the reuse window
+
+        Parameters
+        ----------
+        key: hashable
+            identifies identical work, e.g. ('odds',) or ('muse', text)
+        func: callable
+            coroutine function doing the work
+        reuse: float | None
+            overrides the instance's reuse window for this call
+
+        Returns
+        -------
+        object
+            the result of the single run, shared by every caller
+        """
+        name = _name(key)
+        reuse = self.reuse if reuse is None else reuse
+        now = time.monotonic()
+        self.calls[name] += 1
+
+        recent = self._recent.get(key)
+        if recent is not None and now - recent[0] < reuse:
+            self.reused[name] += 1
+            return recent[1]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.joined[name] += 1
+            # Shielded so one impatient caller cannot cancel everyone's result
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.runs[name] += 1
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters see the error, don't warn about it going unretrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            self._remember(key, result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def _remember(self, key, result) -> None:
+        now = time.monotonic()
+        # Drop expired results so the dict only holds recent keys
+        self._recent = {k: v for k, v in self._recent.items() if now - v[0] < max(self.reuse, 60)}
+        self._recent[key] = (now, result)
+
+
+class ThreadedSingleFlight(_Metrics):
+    """
+    Coalesces identical blocking calls made from different threads
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Runs func(*args, **kwargs), or waits for the thread already running
+        the same key and returns its result
+        """
+        name = _name(key)
+        with self._lock:
+            self.calls[name] += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.runs[name] += 1
+            else:
+                self.joined[name] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+# Shared by every Discord command and snapshot refresh
+command_flight = SingleFlight(reuse=SINGLEFLIGHT_REUSE)
@@ -0,0 +1,201 @@
+import time
+import pickle
+import threading
+from pathlib import Path
+from collections import Counter
+from utils.singleflight import ThreadedSingleFlight
+from config.settings import (
+    CACHE_DIR, CACHE_TTL_LIVE, CACHE_TTL_STANDINGS, CACHE_TTL_METADATA, CACHE_TTL_TEAMS
+)
+
+"""
+THIS FILE CONTAINS A WEEK-AWARE CACHE AROUND YahooFantasySportsQuery.
+COMPLETED WEEKS NEVER CHANGE, SO THEY ARE KEPT FOREVER AND PERSISTED
+TO DISK. LIVE DATA IS KEPT FOR A SHORT TIME-TO-LIVE
+"""
+
+# Time-to-live used for entries that never expire
+FOREVER = float('inf')
+
+
+class CachedQuery:
+    """
+    Drop-in wrapper for YahooFantasySportsQuery that caches the endpoints
+    used by the bot. Any other method is passed straight through.
+
+    Parameters
+    ----------
+    query: YahooFantasySportsQuery
+        the live query object
+    cache_dir: str | Path
+        directory for persisted, finalized weeks
+    """
+
+    def __init__(self, query, cache_dir=CACHE_DIR):
+        self._query = query
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._disk_dir = Path(cache_dir) / f"{query.game_id}.l.{query.league_id}"
+
+        # Counters keyed by endpoint name
+        self.hits = Counter()
+        self.misses = Counter()
+
+        # Threads missing the same key at once share one Yahoo call
+        self._flight = ThreadedSingleFlight()
+
+    def __getattr__(self, name):
+        # Only reached for attributes not defined on the wrapper
+        return getattr(self._query, name)
+
+    ##################################################
+    ################# CACHE PLUMBING #################
+    ##################################################
+
+    def _disk_path(self, key: tuple) -> Path:
+        return self._disk_dir / ("_".join(str(part) for part in key) + ".pkl")
+
+    def _read_disk(self, key: tuple):
+        path = self._disk_path(key)
+        if not path.is_file():
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            # A corrupt file is simply fetched again
+            return None
+
+    def _write_disk(self, key: tuple, value) -> None:
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so a crash never leaves half a file behind
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f)
+            tmp_path.replace(path)
+        except OSError as e:
+            print(f'Could not persist {key}: {e}')
+
+    def _cached(self, key: tuple, ttl: float, fetch, persist: bool = False):
+        """
+        Returns the cached value for key, fetching and storing it on a miss
+
+        Parameters
+        ----------
+        key: tuple
+            cache key, the first element is the endpoint name
+        ttl: float
+            seconds the value stays fresh, FOREVER for finalized data
+        fetch: callable
+            performs the live API call
+        persist: bool
+            also keep the value on disk across restarts
+        """
+        endpoint = key[0]
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits[endpoint] += 1
+                return entry[1]
+
+        if persist:
+            value = self._read_disk(key)
+            if value is not None:
+                with self._lock:
+                    self._memory[key] = (now + ttl, value)
+                    self.hits[endpoint] += 1
+                return value
+
+        def load():
+            value = fetch()
+            with self._lock:
+                self._memory[key] = (time.monotonic() + ttl, value)
+                self.misses[endpoint] += 1
+            if persist:
+                self._write_disk(key, value)
+            return value
+
+        return self._flight.do(key, load)
+
+    def _week_ttl(self, week: int) -> tuple:
+        """
+        Weeks before the current week are final; the current week is live
+        """
+        metadata = self.get_league_metadata()
+        if getattr(metadata, 'is_finished', 0) or int(week) < int(metadata.current_week):
+            return FOREVER, True
+        return CACHE_TTL_LIVE, False
+
+    ##################################################
+    ############### CACHED ENDPOINTS #################
+    ##################################################
+
+    def get_league_metadata(self):
+        return self._cached(('metadata',), CACHE_TTL_METADATA, self._query.get_league_metadata)
+
+    def get_league_settings(self):
+        return self._cached(('settings',), CACHE_TTL_METADATA, self._query.get_league_settings)
+
+    def get_current_week(self) -> int:
+        return int(self.get_league_metadata().current_week)
+
+    def get_league_teams(self):
+        return self._cached(('teams',), CACHE_TTL_TEAMS, self._query.get_league_teams)
+
+    def get_league_standings(self):
+        return self._cached(('standings',), CACHE_TTL_STANDINGS, self._query.get_league_standings)
+
+    def get_league_matchups_by_week(self, chosen_week):
+        ttl, persist = self._week_ttl(chosen_week)
+        return self._cached(
+            ('matchups', int(chosen_week)), ttl,
+            lambda: self._query.get_league_matchups_by_week(chosen_week),
+            persist=persist,
+        )
+
+    def get_league_scoreboard_by_week(self, chosen_week):
+        ttl, persist = self._week_ttl(chosen_week)
+        return self._cached(
+            ('scoreboard', int(chosen_week)), ttl,
+            lambda: self._query.get_league_scoreboard_by_week(chosen_week),
+            persist=persist,
+        )
+
+    ##################################################
+    ################## MAINTENANCE ###################
+    ##################################################
+
+    def invalidate(self, endpoint: str = None) -> None:
+        """
+        Drops in-memory entries for one endpoint, or all of them
+        """
+        with self._lock:
+            if endpoint is None:
+                self._memory.clear()
+            else:
+                self._memory = {k: v for k, v in self._memory.items() if k[0] != endpoint}
+
+    def stats(self) -> dict:
+        """
+        Hit and miss counters per endpoint plus the overall hit rate
+
+        Returns
+        -------
+        dict
+            'hits', 'misses' and 'coalesced' (misses that waited on another
+            thread's call) per endpoint and 'hit_rate' in [0, 1]
+        """
+        with self._lock:
+            hits, misses = dict(self.hits), dict(self.misses)
+        total = sum(hits.values()) + sum(misses.values())
+
+        return {
+            'hits': hits,
+            'misses': misses,
+            'coalesced': dict(self._flight.joined),
+            'hit_rate': sum(hits.values()) / total if total else 0.0,
+        }
@@ -0,0 +1,199 @@
+import threading
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from yfpy.query import YahooFantasySportsQuery
+from yahoo.cache import CachedQuery
+from yahoo.fetcher import bucket, current_priority
+from yahoo.transport import RecordingQuery, ReplayQuery, load_profile
+from utils.metrics import inc, timer
+from config.settings import (
+    YAHOO_CLIENT_ID, YAHOO_CLIENT_SECRET, YAHOO_LEAGUE_ID, YAHOO_GAME_ID, IO_WORKERS,
+    YAHOO_RECORD_DIR, YAHOO_REPLAY_DIR, YAHOO_REPLAY_PROFILE, YAHOO_REPLAY_SEED
+)
+
+"""
+THIS FILE OWNS THE ONE YAHOO CLIENT SHARED BY THE WHOLE PROCESS.
+IT IS CREATED ON FIRST USE, NOT AT IMPORT, SO STARTING THE BOT
+PERFORMS NO OAUTH HANDSHAKE UNTIL A COMMAND NEEDS YAHOO
+"""
+
+# set directory location of private.json for authentication
+auth_dir = Path(__file__).parent.parent / "auth"
+
+
+class SharedYahooQuery(YahooFantasySportsQuery):
+    """
+    YahooFantasySportsQuery with a pooled HTTP session and a single,
+    lock-protected token refresh path that is safe to use from the I/O
+    thread pool.
+
+    A query built with a parent (e.g. for a past season) never
+    authenticates on its own; it borrows the parent's session and lock.
+    """
+
+    def __init__(self, *args, parent=None, **kwargs):
+        self._parent = parent
+        self._auth_lock = parent._auth_lock if parent is not None else threading.RLock()
+        super().__init__(*args, offline=parent is not None, **kwargs)
+        if parent is not None:
+            self.offline = False
+
+    @property
+    def oauth(self):
+        if self._parent is not None:
+            return self._parent.oauth
+        try:
+            return self.__dict__['oauth']
+        except KeyError:
+            raise AttributeError('oauth') from None
+
+    @oauth.setter
+    def oauth(self, value):
+        self.__dict__['oauth'] = value
+
+    def _mount_pool(self) -> None:
+        """
+        Keeps enough connections alive for every I/O thread
+        """
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=IO_WORKERS)
+        self.oauth.session.mount('https://', adapter)
+
+    def _authenticate(self) -> None:
+        # yfpy re-authenticates on any 401, so concurrent failures funnel here
+        if self._parent is not None:
+            return self._parent._authenticate()
+        with self._auth_lock:
+            super()._authenticate()
+            self._mount_pool()
+
+    def _refresh_if_expired(self) -> None:
+        """
+        Refreshes the access token before it expires, once for all threads
+        """
+        if self.oauth.token_is_valid():
+            return
+        with self._auth_lock:
+            # Another thread may have refreshed while we waited
+            if not self.oauth.token_is_valid():
+                self.oauth.refresh_access_token()
+                self._mount_pool()
+
+    def get_response(self, url: str):
+        if not self.offline:
+            self._refresh_if_expired()
+        # Every live request spends a token, cache hits never get here
+        bucket.acquire(current_priority())
+
+        # e.g. .../league/423.l.49754/scoreboard;week=9 -> scoreboard
+        endpoint = url.rstrip('/').rsplit('/', 1)[-1].split(';')[0]
+        inc('marcy_yahoo_requests_total', endpoint=endpoint)
+        with timer('marcy_yahoo_request_seconds', endpoint=endpoint):
+            return super().get_response(url)
+
+
+##################################################
+############## PROCESS-WIDE CLIENT ###############
+##################################################
+
+_query = None
+_season_queries = {}
+_query_lock = threading.Lock()
+
+
+def get_query() -> CachedQuery:
+    """
+    Returns the shared, cached Yahoo client, creating it on first use
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    CachedQuery
+        the process-wide client for YAHOO_LEAGUE_ID / YAHOO_GAME_ID
+    """
+    global _query
+    if _query is None:
+        with _query_lock:
+            if _query is None:
+                _query = CachedQuery(_create_query())
+    return _query
+
+
+def _create_query():
+    # Offline recordings when YAHOO_REPLAY_DIR is set, the live API otherwise
+    if YAHOO_REPLAY_DIR:
+        return ReplayQuery(
+            YAHOO_REPLAY_DIR,
+            profile=load_profile(YAHOO_REPLAY_PROFILE) if YAHOO_REPLAY_PROFILE else None,
+            seed=int(YAHOO_REPLAY_SEED) if YAHOO_REPLAY_SEED else None,
+        )
+
+    live = SharedYahooQuery(
+        auth_dir,
+        league_id=YAHOO_LEAGUE_ID,
+        game_code='nfl',
+        game_id=YAHOO_GAME_ID,
+        consumer_key=YAHOO_CLIENT_ID,
+        consumer_secret=YAHOO_CLIENT_SECRET,
+    )
+    return RecordingQuery(live, YAHOO_RECORD_DIR) if YAHOO_RECORD_DIR else live
+
+
+def get_season_query(game_id) -> CachedQuery:
+    """
+    Returns a cached client for another season of the same league
+
+    Season clients share the process-wide client's session and token, so
+    looking up history never triggers another OAuth handshake.
+
+    Parameters
+    ----------
+    game_id: str
+        Yahoo game id of the season (see config/seasons.json)
+
+    Returns
+    -------
+    CachedQuery
+        client for YAHOO_LEAGUE_ID in that season
+    """
+    game_id = str(game_id)
+    if game_id == str(YAHOO_GAME_ID):
+        return get_query()
+
+    # Resolve the parent outside the lock, get_query takes it too
+    parent = get_query()._query
+    with _query_lock:
+        if game_id not in _season_queries:
+            _season_queries[game_id] = CachedQuery(SharedYahooQuery(
+                auth_dir,
+                league_id=YAHOO_LEAGUE_ID,
+                game_code='nfl',
+                game_id=game_id,
+                parent=parent,
+            ))
+    return _season_queries[game_id]
+
+
+def set_query(query) -> None:
+    """
+    Replaces the shared client, e.g. with an offline stand-in
+    """
+    global _query
+    with _query_lock:
+        _query = query
+        _season_queries.clear()
+
+
+class _LazyQuery:
+    """
+    Module-level handle that resolves to the shared client on attribute access
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_query(), name)
+
+
+# Import this instead of building a YahooFantasySportsQuery
+query = _LazyQuery()
@@ -0,0 +1,426 @@
+import numpy as np
+
+"""
+THIS FILE CONTAINS THE EXACT CLINCH AND ELIMINATION SOLVER. IT SEARCHES
+THE REMAINING WIN/LOSS OUTCOMES OF THE REAL SCHEDULE DEPTH FIRST, CUTS
+BRANCHES WITH BEST-CASE AND WORST-CASE WIN BOUNDS AND REMEMBERS DEAD
+STATES, SO A TEAM IS ONLY CALLED CLINCHED OR ELIMINATED WHEN NO OUTCOME
+CAN CHANGE IT. TEAMS ARE RANKED BY WINS, THEN BY POINTS FOR
+"""
+
+# Search nodes spent looking for the smallest clinching scenarios of a league
+SCENARIO_NODE_BUDGET = 1000000
+
+
+##################################################
+################ GAMES AND BOUNDS ################
+##################################################
+
+def remaining_games(schedule: np.ndarray) -> list:
+    """
+    Lists every remaining matchup once
+
+    Parameters
+    ----------
+    schedule: np.ndarray
+        (weeks x teams) opponent indices from build_schedule
+
+    Returns
+    -------
+    list
+        (week index, team, opponent) with team < opponent, in week order
+    """
+    return [
+        (week, team, opponent)
+        for week, opponents in enumerate(schedule)
+        for team, opponent in enumerate(opponents)
+        if team < opponent
+    ]
+
+
+def settled_tiebreaks(points: np.ndarray, n_weeks_left: int, points_margin: float) -> np.ndarray:
+    """
+    Which points-for tie-breaks are already decided
+
+    Future scores are unknown, so a team only keeps the tie-break if its lead
+    in points for is larger than any swing the remaining weeks can produce.
+
+    Parameters
+    ----------
+    points: np.ndarray
+        points for banked by each team
+    n_weeks_left: int
+        weeks still to be played
+    points_margin: float
+        largest swing in points for between two teams in one week
+
+    Returns
+    -------
+    np.ndarray
+        (teams x teams) booleans, [a, b] is True when a wins a tie in wins
+        against b however the remaining weeks go
+    """
+    lead = points[:, None] - points[None, :]
+    return lead > points_margin * n_weeks_left
+
+
+def _search(games: list, wins: list, need: list, target: int, at_least: bool, budget: list = None):
+    """
+    Looks for one outcome of the games where the number of teams reaching
+    their need in wins is at least (or below) the target
+
+    Parameters
+    ----------
+    games: list
+        (week index, team, opponent) still open
+    wins: list
+        wins of every team before the games
+    need: list
+        wins at which a team counts, None for a team that never counts
+    target: int
+        number of teams to compare with
+    at_least: bool
+        look for at least target teams reaching their need, else fewer
+    budget: list | None
+        one-item list of search nodes left, decremented in place
+
+    Returns
+    -------
+    tuple | None
+        winner of every game (0 for team, 1 for opponent), or None if no
+        outcome qualifies
+    """
+    n_teams = len(wins)
+    counted = [need[t] is not None for t in range(n_teams)]
+    # Wins each team still needs and games it has left
+    gap = [max(0, need[t] - wins[t]) if counted[t] else 0 for t in range(n_teams)]
+    left = [0] * n_teams
+    for _, team, opponent in games:
+        left[team] += 1
+        left[opponent] += 1
+    dead = set()
+
+    def progresses(t):
+        return counted[t] and 0 < gap[t] <= left[t]
+
+    def visit(i, reached, reachable):
+        if budget is not None:
+            if budget[0] <= 0:
+                raise TimeoutError("Scenario search ran out of budget")
+            budget[0] -= 1
+
+        # Best case and worst case of every branch below this node
+        if at_least:
+            if reached >= target:
+                return ()
+            if reachable < target:
+                return None
+        else:
+            if reachable < target:
+                return ()
+            if reached >= target:
+                return None
+
+        # Only the distance to each need matters, not wins beyond it
+        key = (i, tuple(gap))
+        if key in dead:
+            return None
+
+        _, team, opponent = games[i]
+        # Try first the winner that moves the count towards the goal
+        options = ((0, team, opponent), (1, opponent, team))
+        if progresses(team) != at_least:
+            options = options[::-1]
+
+        left[team] -= 1
+        left[opponent] -= 1
+        for result, winner, loser in options:
+            gained = counted[winner] and gap[winner] > 0
+            gap[winner] -= gained
+            # The loser drops out of reach when its last spare game is gone
+            lost = counted[loser] and gap[loser] == left[loser] + 1
+            rest = visit(i + 1, reached + (gained and gap[winner] == 0), reachable - lost)
+            gap[winner] += gained
+            if rest is not None:
+                left[team] += 1
+                left[opponent] += 1
+                return (result, *rest)
+        left[team] += 1
+        left[opponent] += 1
+
+        dead.add(key)
+        return None
+
+    reached = sum(counted[t] and gap[t] == 0 for t in range(n_teams))
+    reachable = sum(counted[t] and gap[t] <= left[t] for t in range(n_teams))
+    outcome = visit(0, reached, reachable)
+    if outcome is None:
+        return None
+    # Games after an early stop can go either way, pad them
+    return outcome + (0,) * (len(games) - len(outcome))
+
+
+##################################################
+############### CLINCH AND ELIMINATION ###########
+##################################################
+
+class ClinchSolver:
+    """
+    Exact playoff clinch and elimination status from the remaining schedule
+
+    Parameters
+    ----------
+    wins: np.ndarray
+        wins banked by each team
+    points: np.ndarray
+        points for banked by each team
+    schedule: np.ndarray
+        (weeks x teams) opponent indices from build_schedule
+    n_playoff_teams: int
+        number of teams that make the playoffs
+    points_margin: float
+        largest swing in points for between two teams in one week, see
+        settled_tiebreaks
+    """
+
+    def __init__(self, wins: np.ndarray, points: np.ndarray, schedule: np.ndarray,
+                 n_playoff_teams: int, points_margin: float):
+        self.wins = [int(w) for w in wins]
+        self.n_teams = len(self.wins)
+        self.n_playoff_teams = n_playoff_teams
+        self.games = remaining_games(schedule)
+        self.settled = settled_tiebreaks(np.asarray(points, dtype=float), schedule.shape[0], points_margin)
+
+    def _apply(self, team: int, fixed: dict, own: int) -> tuple:
+        """
+        Banks the fixed results and the team's own open games (own = 0 loses
+        them all, 1 wins them all); returns the wins and the games left open
+        """
+        wins = list(self.wins)
+        games = []
+        for g, (_, a, b) in enumerate(self.games):
+            if g in fixed:
+                result = fixed[g]
+            elif team in (a, b):
+                result = int((team == b) == bool(own))
+            else:
+                games.append(g)
+                continue
+            wins[b if result else a] += 1
+        return wins, games
+
+    def _counterexample(self, team: int, fixed: dict, budget: list = None):
+        """
+        An outcome consistent with fixed in which the team misses the
+        playoffs while losing every open game of its own, or None
+        """
+        wins, open_games = self._apply(team, fixed, own=0)
+        # Teams tied in wins pass the team unless it holds the tie-break for sure
+        need = [
+            None if other == team else wins[team] + bool(self.settled[team, other])
+            for other in range(self.n_teams)
+        ]
+        outcome = _search([self.games[g] for g in open_games], wins, need,
+                          self.n_playoff_teams, at_least=True, budget=budget)
+        if outcome is None:
+            return None
+
+        full = dict(fixed)
+        for g, (_, a, b) in enumerate(self.games):
+            if g not in fixed and team in (a, b):
+                full[g] = int(team == a)
+        full.update(zip(open_games, outcome))
+        return tuple(full[g] for g in range(len(self.games)))
+
+    def is_clinched(self, team: int) -> bool:
+        """
+        Whether the team makes the playoffs whatever happens
+        """
+        return self._counterexample(team, {}) is None
+
+    def is_eliminated(self, team: int) -> bool:
+        """
+        Whether the team misses the playoffs whatever happens
+        """
+        wins, open_games = self._apply(team, {}, own=1)
+        # Teams tied in wins only pass the team if they hold the tie-break for sure
+        need = [
+            None if other == team else wins[team] + (not self.settled[other, team])
+            for other in range(self.n_teams)
+        ]
+        outcome = _search([self.games[g] for g in open_games], wins, need,
+                          self.n_playoff_teams, at_least=False)
+        return outcome is None
+
+    def _best_case(self, team: int, fixed: dict, budget: list = None):
+        """
+        An outcome consistent with fixed after which the team is in for
+        sure while winning every open game of its own, or None
+        """
+        wins, open_games = self._apply(team, fixed, own=1)
+        need = [
+            None if other == team else wins[team] + bool(self.settled[team, other])
+            for other in range(self.n_teams)
+        ]
+        outcome = _search([self.games[g] for g in open_games], wins, need,
+                          self.n_playoff_teams, at_least=False, budget=budget)
+        if outcome is None:
+            return None
+
+        best = dict(fixed)
+        for g, (_, a, b) in enumerate(self.games):
+            if g not in fixed and team in (a, b):
+                best[g] = int(team == b)
+        best.update(zip(open_games, outcome))
+        return best
+
+    def _core(self, team: int, counterexample: tuple, budget: list = None) -> dict:
+        """
+        Shrinks an outcome where the team misses out to results that keep
+        it out whatever the other games do
+        """
+        core = dict(enumerate(counterexample))
+        for g in sorted(core, key=lambda g: team in self.games[g][1:]):
+            result = core.pop(g)
+            if self._best_case(team, core, budget) is not None:
+                core[g] = result
+        return core
+
+    def clinching_results(self, team: int, node_budget: int = SCENARIO_NODE_BUDGET,
+                          max_results: int = None) -> tuple:
+        """
+        Smallest set of results after which the team has clinched
+
+        Outcomes in which the team misses out are collected one at a time,
+        each shrunk to the results that alone keep the team out. The set
+        has to overturn one result of each, and the smallest such set is
+        searched for until no outcome is left: the set is then minimal. If
+        the budget runs out first, a set from which no result can be
+        dropped is returned instead.
+
+        Parameters
+        ----------
+        team: int
+            index of the team
+        node_budget: int
+            search nodes allowed for the smallest set, past the
+            irreducible one
+        max_results: int | None
+            stop looking for sets larger than this and return the
+            irreducible set when no smaller one exists
+
+        Returns
+        -------
+        tuple
+            (game index -> winner, 0 for team and 1 for opponent, and
+            whether the search finished: the set is then the smallest, or
+            the smallest is larger than max_results), or (None, True) if
+            no results are enough, e.g. a points-for tie-break that stays open
+        """
+        best = self._best_case(team, {})
+        if best is None:
+            return None, True
+
+        # Drop every result the team can do without, its own games last
+        irreducible = dict(best)
+        for g in sorted(best, key=lambda g: team in self.games[g][1:]):
+            result = irreducible.pop(g)
+            if self._counterexample(team, irreducible) is not None:
+                irreducible[g] = result
+
+        largest = len(irreducible) - 1 if max_results is None else min(len(irreducible) - 1, max_results)
+        budget = [node_budget]
+        cores = []
+        fixed = {}
+        try:
+            while True:
+                # Adding an outcome never makes the smallest set smaller
+                fixed = self._hitting_set(cores, len(fixed), largest, budget)
+                if fixed is None:
+                    return irreducible, True
+                counterexample = self._counterexample(team, fixed, budget)
+                if counterexample is None:
+                    return fixed, True
+                cores.append(self._core(team, counterexample, budget))
+        except TimeoutError:
+            return irreducible, False
+
+    def _hitting_set(self, cores: list, min_size: int, max_size: int, budget: list):
+        """
+        Smallest set of min_size to max_size results overturning at least
+        one result of every core, or None
+        """
+        # Result (g, r) is bit 2g + r, a set of results is one integer
+        overturns = [sum(1 << (2 * g + 1 - r) for g, r in core.items()) for core in cores]
+
+        def extend(fixed, missed, size, seen):
+            budget[0] -= 1
+            if budget[0] <= 0:
+                raise TimeoutError("Scenario search ran out of budget")
+
+            if not missed:
+                return fixed
+            if size == 0 or fixed in seen:
+                return None
+            seen.add(fixed)
+
+            # Cores with no result in common each need a result of their own
+            needed, used = 0, 0
+            for options in missed:
+                if not options & used:
+                    needed += 1
+                    used |= options
+            if needed > size:
+                return None
+
+            options = min(missed, key=lambda options: bin(options).count('1'))
+            while options:
+                bit = options & -options
+                options ^= bit
+                # Neither result of that game is open any more
+                game = bit | (bit << 1 if bit.bit_length() % 2 else bit >> 1)
+                left = [other & ~game for other in missed if not other & bit]
+                if all(left):
+                    found = extend(fixed | bit, left, size - 1, seen)
+                    if found is not None:
+                        return found
+            return None
+
+        for size in range(min_size, max_size + 1):
+            found = extend(0, overturns, size, set())
+            if found is not None:
+                return {g: (found >> (2 * g + 1)) & 1 for g in range(len(self.games)) if (found >> (2 * g)) & 3}
+        return None
+
+    def solve(self, node_budget: int = SCENARIO_NODE_BUDGET, max_results: int = None) -> list:
+        """
+        Status of every team
+
+        Parameters
+        ----------
+        node_budget: int
+            search nodes allowed for all alive teams together, shared evenly
+        max_results: int | None
+            see clinching_results
+
+        Returns
+        -------
+        list
+            one dict per team: 'status' is 'clinched', 'eliminated' or
+            'alive', and for an alive team 'needs' and 'exact' from
+            clinching_results
+        """
+        report = []
+        for team in range(self.n_teams):
+            if self.is_clinched(team):
+                report.append({'status': 'clinched', 'needs': None, 'exact': True})
+            elif self.is_eliminated(team):
+                report.append({'status': 'eliminated', 'needs': None, 'exact': True})
+            else:
+                report.append({'status': 'alive', 'needs': None, 'exact': True})
+
+        alive = [team for team, status in enumerate(report) if status['status'] == 'alive']
+        for team in alive:
+            needs, exact = self.clinching_results(team, node_budget // len(alive), max_results)
+            report[team].update(needs=needs, exact=exact)
+        return report
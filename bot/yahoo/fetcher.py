@@ -0,0 +1,225 @@
+import time
+import heapq
+import random
+import itertools
+import threading
+import contextlib
+from concurrent.futures import Future
+from requests.exceptions import HTTPError
+from config.settings import (
+    YAHOO_MAX_CONCURRENCY, YAHOO_RATE_PER_SECOND, YAHOO_BURST, YAHOO_MAX_RETRIES
+)
+
+"""
+THIS FILE SCHEDULES REQUESTS TO THE YAHOO API. A BOUNDED SET OF
+WORKERS RUNS FETCHES CONCURRENTLY, A TOKEN BUCKET KEEPS US UNDER
+YAHOO'S QUOTA, AND INTERACTIVE COMMANDS JUMP AHEAD OF BACKGROUND SYNCS
+"""
+
+# Request priorities, lower runs first
+INTERACTIVE = 0
+BACKGROUND = 10
+
+# Priority of the request being made on the current thread
+_context = threading.local()
+
+
+def current_priority() -> int:
+    return getattr(_context, 'priority', INTERACTIVE)
+
+
+@contextlib.contextmanager
+def request_priority(priority: int):
+    """
+    Runs the enclosed Yahoo calls at the given priority, e.g. BACKGROUND for syncs
+    """
+    previous = current_priority()
+    _context.priority = priority
+    try:
+        yield
+    finally:
+        _context.priority = previous
+
+
+def is_throttled(error: Exception) -> bool:
+    """
+    Whether an exception is Yahoo telling us to slow down (HTTP 429 or 999)
+    """
+    if not isinstance(error, HTTPError):
+        return False
+    response = getattr(error, 'response', None)
+    if response is not None and response.status_code in (429, 999):
+        return True
+    # yfpy raises a bare HTTPError for status 999
+    return 'rate limit' in str(error).lower()
+
+
+##################################################
+############### PRIORITY TOKEN BUCKET ############
+##################################################
+
+class TokenBucket:
+    """
+    Token bucket rate limiter that hands tokens out by priority
+
+    Parameters
+    ----------
+    rate: float
+        tokens added per second (sustained requests per second)
+    capacity: int
+        maximum tokens, i.e. the size of a burst
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority: int = INTERACTIVE) -> None:
+        """
+        Blocks until a token is available and no higher-priority caller is waiting
+        """
+        ticket = (priority, next(self._sequence))
+
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            while True:
+                if self._waiters[0] != ticket:
+                    # Woken again whenever a token is handed out
+                    self._condition.wait()
+                    continue
+
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    heapq.heappop(self._waiters)
+                    self._tokens -= 1
+                    # Let the next waiter re-check
+                    self._condition.notify_all()
+                    return
+
+                # Sleep until a token could be ready, or until woken
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate, 0.001)
+                self._condition.wait(timeout=wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for a while, e.g. after Yahoo throttled us
+        """
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+##################################################
+################ FETCH SCHEDULER #################
+##################################################
+
+class FetchScheduler:
+    """
+    Runs Yahoo fetches on a bounded set of worker threads, highest priority
+    first, retrying with jittered exponential backoff when throttled
+
+    Parameters
+    ----------
+    max_concurrency: int
+        number of fetches in flight at once
+    bucket: TokenBucket
+        rate limiter paused on throttling responses
+    max_retries: int
+        attempts after the first before a throttling error is raised
+    """
+
+    def __init__(self, max_concurrency: int, bucket: TokenBucket, max_retries: int = 4,
+                 backoff_base: float = 1.0, backoff_cap: float = 30.0):
+        self.bucket = bucket
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._work, name=f'yahoo-fetch-{i}', daemon=True)
+            for i in range(max_concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, func, *args, priority: int = INTERACTIVE, **kwargs) -> Future:
+        """
+        Queues a fetch and returns a Future with its result
+        """
+        future = Future()
+        with self._condition:
+            heapq.heappush(self._queue, (priority, next(self._sequence), future, func, args, kwargs))
+            self._condition.notify()
+        return future
+
+    def map(self, func, iterable, priority: int = INTERACTIVE) -> list:
+        """
+        Runs func over iterable concurrently and returns results in order
+        """
+        futures = [self.submit(func, item, priority=priority) for item in iterable]
+        return [future.result() for future in futures]
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                priority, _, future, func, args, kwargs = heapq.heappop(self._queue)
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                with request_priority(priority):
+                    future.set_result(self._call(func, args, kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _call(self, func, args, kwargs):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not is_throttled(e) or attempt == self.max_retries:
+                    raise
+                # Full jitter keeps retries from arriving in lockstep
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                self.bucket.pause(delay)
+                print(f'Yahoo throttled {getattr(func, "__name__", func)}, retrying in {delay:.1f}s')
+                time.sleep(delay)
+
+
+##################################################
+############## PROCESS-WIDE INSTANCES ############
+##################################################
+
+# Shared by every Yahoo request made in this process
+bucket = TokenBucket(rate=YAHOO_RATE_PER_SECOND, capacity=YAHOO_BURST)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> FetchScheduler:
+    """
+    Returns the shared fetch scheduler, starting its workers on first use
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = FetchScheduler(YAHOO_MAX_CONCURRENCY, bucket, YAHOO_MAX_RETRIES)
+    return _scheduler
@@ -1,39 +1,25 @@
-import os
-import sys
 import json
+import hashlib
 import discord
-import uuid
 import pandas as pd
 import numpy as np
-from typing import Final
-from yfpy.query import YahooFantasySportsQuery
-from dotenv import load_dotenv
-from pathlib import Path
 from utils.scripts import map_team_key_to_nickname
-from joblib import Parallel, delayed
-
-# set directory location of private.json for authentication
-project_dir = Path(__file__).parent.parent
-sys.path.insert(0, str(project_dir))
-auth_dir = project_dir / "auth"
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Fetch Yahoo API credentials from environment variables
-CONSUMER_KEY: Final[str] = os.getenv('CONSUMER_KEY')
-CONSUMER_SECRET: Final[str] = os.getenv('CONSUMER_SECRET')
-REFRESH_TOKEN: Final[str] = os.getenv('REFRESH_TOKEN')
-
-# Fetch league information
-query = YahooFantasySportsQuery(
-    auth_dir, 
-    league_id='49754', # Fill in league_id
-    game_code='nfl',   # Leave this as is
-    game_id='423',     # Fill in current game id
-    consumer_key=CONSUMER_KEY,
-    consumer_secret=CONSUMER_SECRET,
-    )
+from yahoo.client import query
+from yahoo.store import (
+    ensure_synced, read_current_week, read_league_settings, read_matchups, read_standings, read_power_rankings,
+    newer_transactions, read_transaction_cursor, write_transaction_cursor
+)
+from yahoo.rankings import update_power_rankings, rank_change_emoji
+from yahoo.history import find_manager, read_head_to_head, read_regular_season_games
+from yahoo.whatif import get_season_matrix, whatif_seasons
+from yahoo.simulation import build_schedule, run_adaptive_simulations, compare_variance_reduction
+from yahoo.clinch import ClinchSolver
+from yahoo.teams import get_team_index
+from config.settings import (
+    YAHOO_GAME_ID, ODDS_SIMULATIONS, ODDS_WORKERS, ODDS_MARGIN, ODDS_TIME_BUDGET, ODDS_BATCH_SIZE, ODDS_VARIANCE_REDUCTION,
+    CLINCH_POINTS_MARGIN, CLINCH_NODE_BUDGET
+)
+
 ##################################################
 ### YAHOO FANTASY SPORTS API COMMAND FUNCTIONS ###
 ##################################################
@@ -56,13 +42,64 @@ def get_current_week():
 
     return current_week
 
-def get_scoreboard():
+def read_scoreboard(week=None, fresh=False):
+    """
+    Reads the scoreboard into plain, comparable matchup records
+
+    Parameters
+    ----------
+    week: int | None
+        fantasy week, defaults to the current week
+    fresh: bool
+        skip the cached copy, e.g. when polling live scores
+
+    Returns
+    -------
+    list
+        one dict per matchup with 'status' and two 'teams', each with
+        'team_key', 'nickname', 'points' and 'projected'
+    """
+    if fresh:
+        query.invalidate('scoreboard')
+    week = get_current_week() if week is None else week
+    scoreboard = query.get_league_scoreboard_by_week(week)
+
+    matchups = []
+    for matchup in scoreboard.matchups:
+        teams = matchup.teams
+        if len(teams) != 2:
+            continue
+        matchups.append({
+            'status': matchup.status,
+            'teams': [
+                {
+                    'team_key': team.team_key,
+                    'nickname': team.managers[0].nickname if team.managers else 'Unknown',
+                    'points': round(float(team.team_points.total or 0), 2),
+                    'projected': round(float(team.team_projected_points.total or 0), 2),
+                }
+                for team in teams
+            ],
+        })
+
+    return matchups
+
+def hash_scoreboard(matchups):
+    """
+    Stable fingerprint of a scoreboard, equal only if nothing changed
+    """
+    return hashlib.sha1(json.dumps(matchups, sort_keys=True).encode()).hexdigest()
+
+def format_scoreboard(matchups, changes=None):
     """
     Converts multiple matchups data into Discord Embed object
 
     Paramaters
     ----------
-    None
+    matchups: list
+        output of read_scoreboard
+    changes: dict | None
+        points gained per nickname since the last update, shown on top
 
     Returns
     -------
@@ -72,37 +109,36 @@ def get_scoreboard():
     """
     embed = discord.Embed(title="League Matchups", color=0x00ff00)
 
-    current_week = get_current_week()
-    scoreboard_data = query.get_league_scoreboard_by_week(current_week).to_json()
-
-    # Load JSON data into Python dictionary
-    data = json.loads(scoreboard_data)
+    if changes:
+        embed.description = " · ".join(f"{name} **{delta:+.2f}**" for name, delta in changes.items())
 
     # Iterate through each matchup
-    matchups = data.get('matchups', [])
-    for matchup_info in matchups:
-        matchup = matchup_info.get('matchup', {})
-        
-        teams = matchup.get('teams', [])
-        if len(teams) != 2:
-            continue
-        
-        team1 = teams[0].get('team', {})
-        team2 = teams[1].get('team', {})
-        
-        # Extracting necessary fields
-        nickname1 = team1.get('managers', {}).get('manager', {}).get('nickname', 'Unknown')
-        total1 = team1.get('team_points', {}).get('total', '0')
-        nickname2 = team2.get('managers', {}).get('manager', {}).get('nickname', 'Unknown')
-        total2 = team2.get('team_points', {}).get('total', '0')
-        
+    for matchup in matchups:
+        team1, team2 = matchup['teams']
+
         # Add fields to the embed
-        embed.add_field(name=f"{nickname1}", value=f"Score: **{total1}**", inline=True)
+        embed.add_field(name=f"{team1['nickname']}", value=f"Score: **{team1['points']}**", inline=True)
         embed.add_field(name="vs", value="\u200b", inline=True)  # \u200b is a zero-width space
-        embed.add_field(name=f"{nickname2}", value=f"Score: **{total2}**", inline=True)
+        embed.add_field(name=f"{team2['nickname']}", value=f"Score: **{team2['points']}**", inline=True)
     
     return embed
 
+def get_scoreboard():
+    """
+    Converts multiple matchups data into Discord Embed object
+
+    Paramaters
+    ----------
+    None
+
+    Returns
+    -------
+    discord.Embed
+        A Discord Embed object containing the formatting matchups
+
+    """
+    return format_scoreboard(read_scoreboard())
+
 def get_standings():
     """
     Converts standings data into a Discord Embed Object
@@ -116,13 +152,26 @@ def get_standings():
     discord.Embed
         A Discord Embed object containing the formatted standings
     """
-    embed = discord.Embed(title="League Standings", color=0x00ff00)
-    
-    standings_data = query.get_league_standings()
-    standings_data = standings_data.to_json()
+    # Read the last synced standings, syncing first if they are stale
+    ensure_synced()
+
+    return format_standings(read_standings())
 
-    # Load JSON data into a Python dictionary
-    data = json.loads(standings_data)
+def format_standings(standings):
+    """
+    Converts a standings table into a Discord Embed Object
+
+    Parameters
+    ----------
+    standings: pd.DataFrame
+        one row per team as from read_standings
+
+    Returns
+    -------
+    discord.Embed
+        A Discord Embed object containing the formatted standings
+    """
+    embed = discord.Embed(title="League Standings", color=0x00ff00)
 
     # Header for the table
     header = f"{'Rank':<5}{'Manager':<20}{'Wins':<5}{'Losses':<7}{'PF':<10}{'PA':<10}"
@@ -130,19 +179,17 @@ def get_standings():
     # Add the header to the embed
     embed.add_field(name="Standings", value=f"```\n{header}\n```", inline=False)
     
-    # Iterate through each team in the "teams" list
-    teams = data.get('teams', [])
-    for team_info in teams:
-        team = team_info.get('team', {})
+    # Iterate through each team's row
+    for _, team in standings.iterrows():
         
         # Extract relevant fields
-        rank = team.get('team_standings', {}).get('rank')
-        nickname = team.get('managers', {}).get('manager', {}).get('nickname')
-        wins = team.get('team_standings', {}).get('outcome_totals', {}).get('wins')
-        losses = team.get('team_standings', {}).get('outcome_totals', {}).get('losses')
-        total = team.get('team_points', {}).get('total')
-        pa = round(team.get('team_standings', {}).get('points_against'), 2)
-        clinched_playoffs = team.get('clinched_playoffs')
+        rank = team['rank']
+        nickname = team['nickname']
+        wins = team['wins']
+        losses = team['losses']
+        total = team['points_for']
+        pa = round(team['points_against'], 2)
+        clinched_playoffs = team['clinched_playoffs']
 
         # Determine if the team is in the bottom 4 ranks
         is_bottom_4 = rank is not None and rank >= 9
@@ -156,42 +203,148 @@ def get_standings():
         full_nickname = f"{nickname}{playoffs_emoji}{rank_emoji}"
         
         # Format the output string for each team
-        if all(x is not None for x in [rank, nickname, wins, losses, total, pa]):
+        if all(pd.notna(x) for x in [rank, nickname, wins, losses, total, pa]):
             team_info_str = f"{rank:<5}{full_nickname:<20}{wins:<5}{losses:<7}{total:<10}{pa:<10}"
             embed.add_field(name="\u200b", value=f"```\n{team_info_str}\n```", inline=False)
         
     return embed
 
 
-def get_transactions():
+# Transaction types posted by the feed, with their embed labels
+TRANSACTION_LABELS = {
+    'add': '➕ Add',
+    'drop': '➖ Drop',
+    'add/drop': '🔁 Add/Drop',
+    'trade': '🔄 Trade',
+}
+
+# Discord allows 25 fields per embed
+MAX_TRANSACTION_FIELDS = 25
+
+def read_new_transactions(game_id=None):
     """
-    Converts transactions data into a Discord Embed Object
+    Transactions made since the feed's high-water mark
+
+    On the feed's first run the mark is set to the newest transaction, so
+    the season's history is not posted all at once.
 
     Parameters
     ----------
-    None
+    game_id: str | None
+        season, defaults to YAHOO_GAME_ID
+
+    Returns
+    -------
+    list
+        new transactions of any type, oldest first
+    """
+    transactions = query.get_league_transactions()
+    cursor = read_transaction_cursor(game_id)
+
+    if cursor is None:
+        if transactions:
+            write_transaction_cursor(transactions[0], game_id)
+        return []
+
+    return list(reversed(newer_transactions(transactions, cursor)))
+
+def postable_transactions(transactions):
+    """
+    Successful adds, drops and trades, leaving out commissioner edits and
+    pending or vetoed trades
+    """
+    return [
+        transaction for transaction in transactions
+        if transaction.type in TRANSACTION_LABELS and transaction.status == 'successful'
+    ]
+
+def describe_transaction(transaction):
+    """
+    Converts one transaction into an embed field
+
+    Parameters
+    ----------
+    transaction: yfpy.models.Transaction
+
+    Returns
+    -------
+    tuple
+        (name, value) of the field, one line per player moved
+    """
+    lines = []
+    for player in transaction.players:
+        data = player.transaction_data
+        # yfpy gives a list when a player moves more than once
+        data = data[0] if isinstance(data, list) else data
+        name = f"{player.name.full} ({player.display_position}, {player.editorial_team_abbr.upper()})"
+
+        if data.type == 'add':
+            source = data.source_type.replace('freeagents', 'free agency')
+            bid = f" for ${transaction.faab_bid}" if transaction.faab_bid is not None else ""
+            lines.append(f"{data.destination_team_name} added {name} from {source}{bid}")
+        elif data.type == 'drop':
+            lines.append(f"{data.source_team_name} dropped {name}")
+        else:
+            lines.append(f"{name} to {data.destination_team_name}")
+
+    label = TRANSACTION_LABELS[transaction.type]
+    if transaction.type == 'trade':
+        label = f"{label}: {transaction.trader_team_name} ↔ {transaction.tradee_team_name}"
+
+    return label, "\n".join(lines) or "\u200b"
+
+def format_transactions(transactions):
+    """
+    Batches transactions into one Discord Embed object
+
+    Parameters
+    ----------
+    transactions: list
+        yfpy Transactions, oldest first
 
     Returns
     -------
     discord.Embed
         A Discord Embed object containing the formatted transactions
     """
-    embed = discord.Embed(title="New Transaction", color=0x00ff00)
+    title = "New Transaction" if len(transactions) == 1 else f"{len(transactions)} New Transactions"
+    embed = discord.Embed(title=title, color=0x00ff00)
 
-    transactions_data = query.get_league_transactions()
-    transactions_data = transactions_data.to_json()
+    for transaction in transactions[:MAX_TRANSACTION_FIELDS]:
+        name, value = describe_transaction(transaction)
+        embed.add_field(name=name, value=value, inline=False)
 
-    # Load JSON data into Python dictionary
-    data = json.loads(transactions_data)
+    if len(transactions) > MAX_TRANSACTION_FIELDS:
+        embed.set_footer(text=f"and {len(transactions) - MAX_TRANSACTION_FIELDS} more")
 
-    transactions = data.get()
+    return embed
 
-    return None
+def get_transactions():
+    """
+    Converts new transactions into a Discord Embed Object
 
-def get_playoff_odds():
+    Does not move the high-water mark; the transaction feed does that once
+    the embed has been posted.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    discord.Embed | None
+        A Discord Embed object containing the formatted transactions, None
+        if nothing happened since the last post
     """
-    Calculates individual team's odds of making the playoffs using
-    Monte Carlo simulations
+    transactions = postable_transactions(read_new_transactions())
+    if not transactions:
+        return None
+
+    return format_transactions(transactions)
+
+def get_simulation_inputs():
+    """
+    Loads the season so far and builds the arrays the Monte Carlo engine needs
 
     Parameters
     ----------
@@ -199,128 +352,391 @@ def get_playoff_odds():
 
     Returns
     -------
-    discord.Embed
-        A discord Embed object containing formatted playoff odds
+    dict
+        team_keys, mean, std, wins, points, schedule and n_playoff_teams,
+        aligned on team_keys, and the remaining weeks
     """
-    # Embed structure
-    embed = discord.Embed(title="Playoff Odds", color=0x00ff00)
+    # Sync the local store if stale, then read the season from it
+    ensure_synced()
+    settings = read_league_settings()
+
+    # Load the regular season schedule and results
+    df = read_matchups(range(1, settings['playoff_start_week']))
+
+    return build_simulation_inputs(df, settings['playoff_start_week'], settings['num_playoff_teams'])
+
+def build_simulation_inputs(df, playoff_start_week, n_playoff_teams):
+    """
+    Builds the arrays the Monte Carlo engine needs from a season's matchups
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        regular season matchup records, as from read_matchups
+    playoff_start_week: int
+        first playoff week, the regular season ends the week before
+    n_playoff_teams: int
+        teams that make the playoffs
+
+    Returns
+    -------
+    dict
+        team_keys, mean, std, wins, points, schedule and n_playoff_teams,
+        aligned on team_keys, and weeks, the remaining weeks
+    """
+    # The week in progress is not played yet, only finished weeks count
+    final = (df['status'] == 'postevent').groupby(df['week']).all()
+    first_week = next(
+        (week for week in range(1, playoff_start_week) if not final.get(week, False)),
+        playoff_start_week,
+    )
+    played = df[df['week'] < first_week]
 
-    # Get current week
-    current_week = get_current_week()
-
-    # Initialize an empty list to store records
-    records = []
-
-    for i in range(1, 15): # the 7 will be eventually replacted by current_week
-        # Query data from yahoo
-        matchups = query.get_league_matchups_by_week(i)
-        # Loop through matchup data
-        for i in range(len(matchups)):
-            matchup = matchups[i].to_json() # matchup[i] is a yfpy object
-            matchup_dict = json.loads(matchup)
-            
-            # Generate a unique matchup_id (UUID)
-            matchup_id = str(uuid.uuid4())
-
-            # Extract information for each team in the matchup
-            for team in matchup_dict.get('teams', []):
-                team_info = team.get('team', {})
-                record = {
-                    'matchup_id': matchup_id,
-                    'week': matchup_dict.get('week'),
-                    'winner_team_key': matchup_dict.get('winner_team_key'),
-                    'team_key': team_info.get('team_key'),
-                    'team_total_points': team_info.get('team_points', {}).get('total'),
-                }
-                
-                # Add the record to the list
-                records.append(record)
-
-    # Convert the list of records to a DataFrame
-    df = pd.DataFrame(records)
-    # Creating win column 
-    df["win"] = np.where(df['winner_team_key'] == df['team_key'], 1, 0)
-    
     # Calculate average points and standard deviation for each team
-    team_stats = df[df['week'] <= current_week].groupby('team_key').agg({
+    team_stats = played.groupby('team_key').agg({
         'team_total_points': ['mean', 'std', 'sum'],
         'win': 'sum' 
-    }).reset_index()
+    })
 
     # Set column names
-    team_stats.columns = ['team_key', 'avg_points', 'std_points', 'total_points', 'wins']
-    
-    ##########################################
-    ### Monte Carlo simulations start here ###
-    ##########################################
-
-    # Parameters
-    n_simulations = 10000                 # Number of Monte Carlo simulations
-    n_weeks_remaining = 14 - current_week # Number of weeks remaining in the season
-    n_playoff_teams = 8                   # Number of teams that make the playoffs
-
-    def simulate_season(seed):
-        # Reproducibility
-        np.random.seed(seed)
-        # Simulate remainder of season
-        for _ in range(n_simulations):
-            # df to simulate each team's season
-            team_simulation = team_stats[['team_key']].copy()
-            team_simulation['wins'] = team_stats['wins'].copy()
-            team_simulation['total_points'] = team_stats['total_points'].copy()
-
-            for week in range(n_weeks_remaining):
-                # Simulate points for each team
-                simulated_points = np.random.normal(
-                    team_stats['avg_points'],
-                    team_stats['std_points']
-                )
-                # Simulate matchups based on real schedule
-                for idx, row in df[df['week'] == current_week + week].iterrows():
-                    team1 = row['team_key']
-                    team2 = df[(df['week'] == row['week']) & (df['matchup_id'] == row['matchup_id']) & (df['team_key'] != team1)]['team_key'].values[0]
-                    
-                    points_team1 = simulated_points[team_stats[team_stats['team_key'] == team1].index[0]]
-                    points_team2 = simulated_points[team_stats[team_stats['team_key'] == team2].index[0]]
-                    
-                    if points_team1 > points_team2:
-                        team_simulation.loc[team_simulation['team_key'] == team1, 'wins'] += 1
-                    else:
-                        team_simulation.loc[team_simulation['team_key'] == team2, 'wins'] += 1
-                    
-                    team_simulation.loc[team_simulation['team_key'] == team1, 'total_points'] += points_team1
-                    team_simulation.loc[team_simulation['team_key'] == team2, 'total_points'] += points_team2
-            
-            # Sort teams first by wins, then by total points for tie-breaking
-            team_simulation = team_simulation.sort_values(by=['wins', 'total_points'], ascending=[False, False])
-            
-            # Select top N teams for playoffs
-            playoff_teams = team_simulation.head(n_playoff_teams)['team_key'].values
-            return playoff_teams
-    
-    # Run simulations in parallel
-    results = Parallel(n_jobs=-1)(delayed(simulate_season)(seed) for seed in range(n_simulations))
-    # Count playoff appearances for each team
-    playoff_counts = pd.Series(np.concatenate(results)).value_counts()
-    # Calculate the playoff odds as a percentage
-    team_stats['playoff_odds'] = (playoff_counts / n_simulations * 100).reindex(team_stats['team_key']).fillna(0).values
+    team_stats.columns = ['avg_points', 'std_points', 'total_points', 'wins']
+
+    # Every scheduled team is simulated; league-wide scoring stands in
+    # until a team has played enough weeks to have its own
+    team_keys = np.sort(df['team_key'].unique())
+    team_stats = team_stats.reindex(team_keys).fillna({
+        'avg_points': played['team_total_points'].mean(),
+        'std_points': played['team_total_points'].std(),
+        'total_points': 0.0,
+        'wins': 0,
+    })
+
+    # Build the remaining schedule once as an opponent index array
+    remaining_weeks = np.arange(first_week, playoff_start_week)
+    schedule = build_schedule(df, team_keys, remaining_weeks)
+
+    return {
+        'team_keys': team_keys,
+        'mean': team_stats['avg_points'].to_numpy(dtype=float),
+        'std': team_stats['std_points'].to_numpy(dtype=float),
+        'wins': team_stats['wins'].to_numpy(dtype=float),
+        'points': team_stats['total_points'].to_numpy(dtype=float),
+        'schedule': schedule,
+        'n_playoff_teams': int(n_playoff_teams),
+        'weeks': remaining_weeks,
+    }
+
+def simulate_playoff_odds(inputs):
+    """
+    Runs the Monte Carlo simulation on prepared inputs. Pure CPU work with no
+    Yahoo calls, so it can be shipped to a worker process.
+
+    Parameters
+    ----------
+    inputs: dict
+        output of get_simulation_inputs
+
+    Returns
+    -------
+    dict
+        simulation result from run_adaptive_simulations
+    """
+    inputs = {key: value for key, value in inputs.items() if key not in ('team_keys', 'weeks')}
+
+    # Simulate in batches until every team's odds are within ODDS_MARGIN
+    simulation = run_adaptive_simulations(
+        **inputs,
+        tolerance=ODDS_MARGIN / 100,
+        time_budget=ODDS_TIME_BUDGET,
+        max_simulations=ODDS_SIMULATIONS,
+        batch_size=ODDS_BATCH_SIZE,
+        n_workers=ODDS_WORKERS,
+        seed=0,
+        variance_reduction=ODDS_VARIANCE_REDUCTION,
+    )
+    print(f"Simulated {simulation['n_simulations']} seasons at {simulation['sims_per_second']:,.0f} sims/s")
+
+    return simulation
+
+def seed_probabilities(team_keys, simulation):
+    """
+    Converts simulated finishing positions into a seed probability matrix
+
+    Parameters
+    ----------
+    team_keys: np.ndarray
+        team keys in simulation order
+    simulation: dict
+        output of simulate_playoff_odds
+
+    Returns
+    -------
+    pd.DataFrame
+        one row per team, column n is the percentage of seasons it finished
+        as seed n
+    """
+    seeds = simulation['seeds'] / simulation['n_simulations'] * 100
+    matrix = pd.DataFrame(seeds, columns=range(1, seeds.shape[1] + 1))
+    matrix.insert(0, 'team_key', team_keys)
+
+    return matrix
+
+def format_playoff_odds(team_keys, simulation):
+    """
+    Converts simulated playoff counts into a Discord Embed Object
+
+    Parameters
+    ----------
+    team_keys: np.ndarray
+        team keys in simulation order
+    simulation: dict
+        output of simulate_playoff_odds
+
+    Returns
+    -------
+    discord.Embed
+        A discord Embed object containing formatted playoff odds
+    """
+    # Embed structure
+    embed = discord.Embed(title="Playoff Odds", color=0x00ff00)
+
+    n_simulations = simulation['n_simulations']
     # Final table for embed
     odds_df = pd.DataFrame()
-    odds_df['team_key'] = team_stats['team_key']
-    odds_df['playoff_odds'] = team_stats['playoff_odds']
+    odds_df['team_key'] = team_keys
+    # Calculate the playoff and bracket odds as percentages
+    odds_df['playoff_odds'] = simulation['counts'] / n_simulations * 100
+    for stage in ('bye', 'semifinal', 'final', 'champion'):
+        odds_df[stage] = simulation[stage] / n_simulations * 100
+    # Most likely seed of each team
+    seeds = seed_probabilities(team_keys, simulation).drop(columns='team_key')
+    odds_df['seed'] = seeds.idxmax(axis=1)
     odds_df = map_team_key_to_nickname(odds_df, 'team_key')
-    odds_df = odds_df.sort_values(by='playoff_odds', ascending=False).reset_index(drop=True)
+    odds_df = odds_df.sort_values(by=['playoff_odds', 'champion'], ascending=False).reset_index(drop=True)
+
+    # Byes only exist when the field does not fill the bracket
+    stages = ['semifinal', 'final', 'champion']
+    headers = ['Semi', 'Final', 'Title']
+    if odds_df['bye'].any():
+        stages.insert(0, 'bye')
+        headers.insert(0, 'Bye')
 
     # Iterate to collect data from embed
     manager_col = "\n".join([f"{row['nickname']}" for _, row in odds_df.iterrows()])
-    odds_col = "\n".join([f"{row['playoff_odds']:.2f}" for _, row in odds_df.iterrows()])
+    odds_col = "\n".join([f"{row['playoff_odds']:6.2f}  #{row['seed']}" for _, row in odds_df.iterrows()])
+    bracket_col = "\n".join([
+        " ".join(f"{row[stage]:5.1f}" for stage in stages) for _, row in odds_df.iterrows()
+    ])
 
     # Adding the table to the embed
     embed.add_field(name="Manager", value=f"```{manager_col}```", inline=True)
-    embed.add_field(name="Playoff Odds", value=f"```{odds_col}```", inline=True)
+    embed.add_field(name="Playoffs · Seed", value=f"```{odds_col}```", inline=True)
+    embed.add_field(name=" · ".join(headers), value=f"```{bracket_col}```", inline=True)
+    embed.set_footer(text=f"{n_simulations:,} simulations · ±{simulation['margin'] * 100:.2f}% margin of error (95%)")
 
     return embed
 
+def get_playoff_odds():
+    """
+    Calculates individual team's odds of making the playoffs, of reaching
+    each playoff round and of winning the title using Monte Carlo simulations
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    discord.Embed
+        A discord Embed object containing formatted playoff odds
+    """
+    inputs = get_simulation_inputs()
+    simulation = simulate_playoff_odds(inputs)
+
+    return format_playoff_odds(inputs['team_keys'], simulation)
+
+def get_seed_matrix():
+    """
+    Simulates the rest of the season and reports how likely each team is to
+    finish as every seed
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    pd.DataFrame
+        per-team seed probabilities as percentages, see seed_probabilities
+    """
+    inputs = get_simulation_inputs()
+    simulation = simulate_playoff_odds(inputs)
+
+    return map_team_key_to_nickname(seed_probabilities(inputs['team_keys'], simulation), 'team_key')
+
+# Longest clinching scenario spelled out game by game
+MAX_SCENARIO_RESULTS = 6
+
+def solve_clinch_scenarios(inputs):
+    """
+    Runs the exact clinch and elimination solver on prepared inputs. Pure
+    CPU work with no Yahoo calls, so it can be shipped to a worker process.
+
+    Parameters
+    ----------
+    inputs: dict
+        output of get_simulation_inputs
+
+    Returns
+    -------
+    dict
+        'games' the remaining (week index, team, opponent) matchups and
+        'teams' the ClinchSolver.solve report, aligned on inputs['team_keys'],
+        and 'weeks' the remaining weeks
+    """
+    solver = ClinchSolver(
+        inputs['wins'], inputs['points'], inputs['schedule'],
+        inputs['n_playoff_teams'], points_margin=CLINCH_POINTS_MARGIN,
+    )
+
+    # Longer scenarios are not spelled out, so the search stops there
+    teams = solver.solve(CLINCH_NODE_BUDGET, max_results=MAX_SCENARIO_RESULTS)
+
+    return {'games': solver.games, 'teams': teams, 'weeks': inputs['weeks']}
+
+def describe_scenario(team, needs, games, team_keys, weeks):
+    """
+    Spells out the results a team needs, its own games first
+
+    Parameters
+    ----------
+    team: int
+        index of the team in team_keys
+    needs: dict
+        game index -> winner (0 for team, 1 for opponent), from the solver
+    games: list
+        remaining (week index, team, opponent) matchups, from the solver
+    team_keys: np.ndarray
+        team keys in solver order
+    weeks: np.ndarray
+        remaining weeks, indexed by the games' week index
+
+    Returns
+    -------
+    str
+        one line per result, e.g. "beats Hunter (wk 12)"
+    """
+    team_index = get_team_index()
+    lines = []
+    for g in sorted(needs, key=lambda g: (team not in games[g][1:], games[g][0])):
+        week, a, b = games[g]
+        winner, loser = (b, a) if needs[g] else (a, b)
+        loser_name = team_index.nickname(team_keys[loser])
+        if winner == team:
+            lines.append(f"beats {loser_name} (wk {weeks[week]})")
+        else:
+            lines.append(f"{team_index.nickname(team_keys[winner])} over {loser_name} (wk {weeks[week]})")
+
+    return "\n".join(lines)
+
+def format_clinch_scenarios(team_keys, scenarios):
+    """
+    Converts the solver report into a Discord Embed Object
+
+    Parameters
+    ----------
+    team_keys: np.ndarray
+        team keys in solver order
+    scenarios: dict
+        output of solve_clinch_scenarios
+
+    Returns
+    -------
+    discord.Embed
+        A discord Embed object listing clinched and eliminated teams, and
+        the results each team in the hunt needs to clinch
+    """
+    # Embed structure
+    embed = discord.Embed(title="Clinching Scenarios", color=0x00ff00)
+
+    team_index = get_team_index()
+    teams = scenarios['teams']
+
+    clinched = [team_index.nickname(team_keys[t]) for t, team in enumerate(teams) if team['status'] == 'clinched']
+    eliminated = [team_index.nickname(team_keys[t]) for t, team in enumerate(teams) if team['status'] == 'eliminated']
+    embed.add_field(name="Clinched ⭐️", value="\n".join(clinched) or "Nobody yet", inline=True)
+    embed.add_field(name="Eliminated", value="\n".join(eliminated) or "Nobody yet", inline=True)
+
+    # Closest to clinching first, teams that cannot clinch on wins last
+    alive = [t for t, team in enumerate(teams) if team['status'] == 'alive']
+    alive.sort(key=lambda t: len(teams[t]['needs']) if teams[t]['needs'] is not None else len(scenarios['games']) + 1)
+    for t in alive:
+        needs = teams[t]['needs']
+        if needs is None:
+            value = "Can still get in, but not on wins alone"
+        elif len(needs) > MAX_SCENARIO_RESULTS and teams[t]['exact']:
+            value = f"Needs more than {MAX_SCENARIO_RESULTS} results to go their way"
+        elif len(needs) > MAX_SCENARIO_RESULTS:
+            value = f"Needs up to {len(needs)} results to go their way"
+        else:
+            value = describe_scenario(t, needs, scenarios['games'], team_keys, scenarios['weeks'])
+        embed.add_field(name=team_index.nickname(team_keys[t]), value=value, inline=False)
+
+    embed.set_footer(
+        text=f"Ranked by wins, then points for. A tie in wins only counts as won when the points-for "
+             f"lead is over {CLINCH_POINTS_MARGIN:.0f} per week left."
+    )
+
+    return embed
+
+def get_clinch_scenarios():
+    """
+    Works out exactly which teams have clinched a playoff spot or been
+    eliminated, and the fewest results each other team needs to clinch
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    discord.Embed
+        A discord Embed object containing the clinching scenarios
+    """
+    inputs = get_simulation_inputs()
+    scenarios = solve_clinch_scenarios(inputs)
+
+    return format_clinch_scenarios(inputs['team_keys'], scenarios)
+
+def get_odds_variance_report(n_simulations=2000, n_replicates=50):
+    """
+    Compares the naive and variance-reduced playoff odds estimators on the
+    current league data
+
+    Parameters
+    ----------
+    n_simulations: int
+        seasons simulated per replicate
+    n_replicates: int
+        independent runs of each estimator
+
+    Returns
+    -------
+    pd.DataFrame
+        per-team standard errors and effective sample sizes of both estimators
+    """
+    inputs = get_simulation_inputs()
+    del inputs['weeks']
+
+    report = compare_variance_reduction(
+        **inputs,
+        n_simulations=n_simulations,
+        n_replicates=n_replicates,
+        seed=0,
+    )
+
+    return map_team_key_to_nickname(report, 'team_key')
+
 
 def get_power_rankings():
     """
@@ -338,80 +754,77 @@ def get_power_rankings():
     """
     # Embed structure
     embed = discord.Embed(title="Richie's Power Rankings", color=0x00ff00)
-    # Get current week
-    current_week = get_current_week()
-
-    # Initialize an empty list to store records
-    records = []
-
-    for i in range(1, current_week + 1): 
-        # Query data from yahoo
-        matchups = query.get_league_matchups_by_week(i)
-        # Loop through matchup data
-        for i in range(len(matchups)):
-            matchup = matchups[i].to_json() # matchup[i] is a yfpy object
-            matchup_dict = json.loads(matchup)
-            
-            # Generate a unique matchup_id (UUID)
-            matchup_id = str(uuid.uuid4())
-
-            # Extract information for each team in the matchup
-            for team in matchup_dict.get('teams', []):
-                team_info = team.get('team', {})
-                record = {
-                    'matchup_id': matchup_id,
-                    'week': matchup_dict.get('week'),
-                    'winner_team_key': matchup_dict.get('winner_team_key'),
-                    'team_key': team_info.get('team_key'),
-                    'team_total_points': team_info.get('team_points', {}).get('total'),
-                    'team_projected_points': team_info.get('team_projected_points', {}).get('total')
-                }
-                
-                # Add the record to the list
-                records.append(record)
-
-    # Convert the list of records to a DataFrame
-    df = pd.DataFrame(records)
-    # Creating win column 
-    df["win"] = np.where(df['winner_team_key'] == df['team_key'], 1, 0)
-    
-    # Calculate average points and standard deviation for each team
-    team_stats = df.groupby('team_key').agg({
-        'team_total_points': ['mean', 'std', 'sum', 'min', 'max'],
-        'win': 'sum' 
-    }).reset_index()
-
-    # Set column names
-    team_stats.columns = ['team_key', 'avg_points', 'std_points', 'total_points', 'max_points', 'min_points', 'wins']
+    # Sync the local store if stale, then apply any newly completed weeks
+    ensure_synced()
+    update_power_rankings()
+
+    # Latest snapshot and the one before it, both precomputed
+    p_rank_table = read_power_rankings()
+    if p_rank_table.empty:
+        embed.description = "No completed weeks yet"
+        return embed
+    week = int(p_rank_table['week'].iloc[0])
+    previous = read_power_rankings(week - 1).set_index('team_key')['rank']
+
+    # Rank change since last week, positive meaning the team moved up
+    p_rank_table['change'] = (previous.reindex(p_rank_table['team_key']).to_numpy() - p_rank_table['rank']).fillna(0)
     # Map team key to nickname
-    team_stats = map_team_key_to_nickname(team_stats, 'team_key')
-    # Calculate ranking
-    team_stats['p_rank'] = (
-        (team_stats.avg_points * 6) +
-        ((team_stats.max_points + team_stats.min_points) * 2) +
-        (((team_stats.wins / current_week) * 200) * 2)
-    ) / 10
-    # grab only rank and nickname
-    p_rank_table = pd.DataFrame()
-    p_rank_table['Manager'] = team_stats['nickname']
-    p_rank_table['Power Score'] = team_stats['p_rank']
-   # Add a new 'Rank' column based on the Power Score
-    p_rank_table['Rank'] = p_rank_table['Power Score'].rank(ascending=False, method='min').astype(int)
-    # Sort by Rank if needed
-    p_rank_table = p_rank_table.sort_values('Rank').reset_index(drop=True)
+    p_rank_table = map_team_key_to_nickname(p_rank_table, 'team_key')
     # Prepare the table content
-    rank_col = "\n".join([f"{row['Rank']}" for _, row in p_rank_table.iterrows()])
-    manager_col = "\n".join([f"{row['Manager']}" for _, row in p_rank_table.iterrows()])
-    score_col = "\n".join([f"{row['Power Score']:.2f}" for _, row in p_rank_table.iterrows()])
+    rank_col = "\n".join([f"{row['rank']} {rank_change_emoji(row['change'])}" for _, row in p_rank_table.iterrows()])
+    manager_col = "\n".join([f"{row['nickname']}" for _, row in p_rank_table.iterrows()])
+    score_col = "\n".join([f"{row['power_score']:.2f}" for _, row in p_rank_table.iterrows()])
 
     # Adding the table to the embed
     embed.add_field(name="Rank", value=f"```{rank_col}```", inline=True)
     embed.add_field(name="Manager", value=f"```{manager_col}```", inline=True)
     embed.add_field(name="Power Score", value=f"```{score_col}```", inline=True)
+    embed.set_footer(text=f"Through week {week}")
     
     return embed
 
 
+def get_head_to_head(manager_name, opponent_name):
+    """
+    All-time head-to-head record between two managers, read from the
+    precomputed history aggregates
+
+    Parameters
+    ----------
+    manager_name: str
+        nickname of the first manager
+    opponent_name: str
+        nickname of the second manager
+
+    Returns
+    -------
+    discord.Embed
+        A discord Embed object containing the head-to-head record
+    """
+    manager = find_manager(manager_name)
+    opponent = find_manager(opponent_name)
+
+    # Tell the user which name was not found
+    missing = [name for name, found in ((manager_name, manager), (opponent_name, opponent)) if found is None]
+    if missing:
+        return discord.Embed(title="Head to Head", description=f"No manager named {', '.join(missing)}", color=0xff0000)
+
+    embed = discord.Embed(title=f"{manager['nickname']} vs {opponent['nickname']}", color=0x00ff00)
+
+    record = read_head_to_head(manager['manager_guid'], opponent['manager_guid'])
+    if record is None:
+        embed.description = "These two have never played each other"
+        return embed
+
+    games = record['games']
+    embed.add_field(name="All-Time Record", value=f"**{record['wins']}-{record['losses']}-{record['ties']}**", inline=True)
+    embed.add_field(name="Avg. Score", value=f"{record['points_for'] / games:.2f} - {record['points_against'] / games:.2f}", inline=True)
+    embed.add_field(name="Playoff Meetings", value=f"{record['playoff_games']}", inline=True)
+    embed.set_footer(text=f"{games} games · {record['first_year']}-{record['last_year']}")
+
+    return embed
+
+
 def get_whatif_matrix():
     """
     Creates a matrix displaying each team's record as if 
@@ -427,10 +840,58 @@ def get_whatif_matrix():
         A discord Embed object containing formatted matrix
     """
     # Embed structure
-    embed = discord.Embed(title="Playoff Odds", color=0x00ff00)
+    embed = discord.Embed(title="What If?", color=0x00ff00)
+
+    # Sync the local store if stale, then read every week played so far
+    ensure_synced()
+    current_week = read_current_week()
+    df = read_matchups(range(1, current_week + 1))
+
+    # Only completed regular season weeks count
+    regular = df[~df['is_playoffs']]
+    is_final = regular.groupby('week')['status'].agg(lambda status: (status == 'postevent').all())
+    completed = is_final.index[is_final].to_numpy()
+
+    # Weeks already counted are skipped, only new weeks are computed
+    team_keys = np.sort(df['team_key'].unique())
+    matrix = get_season_matrix(team_keys, YAHOO_GAME_ID)
+    matrix.update(regular, completed)
+
+    # Columns are numbered to match the rows, which keeps the table narrow
+    nicknames = map_team_key_to_nickname(pd.DataFrame({'team_key': team_keys}), 'team_key')['nickname']
+    labels = [f"{i + 1:>2} {str(name)[:4]:<4}" for i, name in enumerate(nicknames)]
+
+    header = " " * 8 + "".join(f"{i + 1:>3}" for i in range(len(labels)))
+    rows = [
+        f"{label} " + "".join(f"{wins:>3}" for wins in matrix.wins[i])
+        for i, label in enumerate(labels)
+    ]
+
+    embed.add_field(name="Wins on Each Schedule", value="```\n" + "\n".join([header] + rows) + "\n```", inline=False)
+    embed.set_footer(text=f"Rows: team · Columns: schedule played · Diagonal: real record · {len(matrix.weeks)} weeks")
+
+    return embed
+
+
+def get_whatif_history(years=None):
+    """
+    Schedule luck of every manager in every stored season: real wins
+    against the average, best and worst wins over every other schedule
+
+    Parameters
+    ----------
+    years: iterable | None
+        seasons to include, every stored season if None
+
+    Returns
+    -------
+    pd.DataFrame
+        one row per manager per season, luckiest first
+    """
+    games = read_regular_season_games(years)
+    luck = whatif_seasons(games)
 
-    # Get current week
-    current_week = get_current_week()
+    managers = games[['year', 'team_key', 'nickname']].drop_duplicates()
+    luck = luck.merge(managers, on=['year', 'team_key'], how='left')
 
-    # Initialize an empty list to store records
-    records = []
\ No newline at end of file
+    return luck.sort_values('luck', ascending=False).reset_index(drop=True)
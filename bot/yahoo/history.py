@@ -0,0 +1,478 @@
+import threading
+import pandas as pd
+from pathlib import Path
+from sqlalchemy import (
+    create_engine, MetaData, Table, Column, Integer, String, Float, Boolean, Index, ForeignKey,
+    select, delete, func
+)
+from config.settings import HISTORY_DATABASE_URL
+
+"""
+THIS FILE DEFINES THE LEAGUE HISTORY DATABASE FILLED BY client/yahoo.py.
+MANAGERS ARE IDENTIFIED BY THEIR YAHOO GUID SO THEY CAN BE FOLLOWED
+ACROSS SEASONS. AGGREGATE TABLES ARE KEPT PER SEASON AND ONLY THE
+SEASONS A SYNC TOUCHED ARE REBUILT; ALL-TIME TABLES ARE THEN SUMMED
+FROM THE FEW HUNDRED PER-SEASON ROWS
+"""
+
+metadata = MetaData()
+
+##################################################
+################ NORMALIZED TABLES ###############
+##################################################
+
+managers_table = Table('managers', metadata,
+    Column('manager_guid', String, primary_key=True),
+    Column('nickname', String, nullable=False),
+    Column('last_year', Integer),
+    Index('ix_managers_nickname', 'nickname'),
+)
+
+seasons_table = Table('seasons', metadata,
+    Column('year', Integer, primary_key=True),
+    Column('game_id', String, nullable=False),
+    Column('league_id', String, nullable=False),
+    Column('end_week', Integer),
+    Column('is_finished', Boolean),
+)
+
+teams_table = Table('teams', metadata,
+    Column('team_key', String, primary_key=True),
+    Column('year', Integer, ForeignKey('seasons.year'), nullable=False),
+    Column('manager_guid', String, ForeignKey('managers.manager_guid'), nullable=False),
+    Column('team_name', String),
+    Column('rank', Integer),
+    Column('wins', Integer),
+    Column('losses', Integer),
+    Column('ties', Integer),
+    Column('points_for', Float),
+    Column('points_against', Float),
+    Column('playoff_seed', Integer),
+    Index('ix_teams_year', 'year'),
+    Index('ix_teams_manager', 'manager_guid', 'year'),
+)
+
+matchups_table = Table('matchups', metadata,
+    Column('year', Integer, primary_key=True),
+    Column('week', Integer, primary_key=True),
+    Column('matchup_id', Integer, primary_key=True),
+    Column('winner_team_key', String),
+    Column('is_playoffs', Boolean),
+    Column('status', String),
+)
+
+weekly_scores_table = Table('weekly_scores', metadata,
+    Column('year', Integer, primary_key=True),
+    Column('week', Integer, primary_key=True),
+    Column('team_key', String, primary_key=True),
+    Column('matchup_id', Integer),
+    Column('opponent_team_key', String),
+    Column('points', Float),
+    Column('projected_points', Float),
+    Column('win', Boolean),
+    Column('is_playoffs', Boolean),
+    Index('ix_weekly_scores_team', 'team_key'),
+)
+
+progress_table = Table('etl_progress', metadata,
+    Column('year', Integer, primary_key=True),
+    Column('week', Integer, primary_key=True),
+    Column('rows', Integer),
+    Column('loaded_at', Float),
+)
+
+##################################################
+################ AGGREGATE TABLES ################
+##################################################
+
+# One row per manager per season: record, points and finish
+season_finishes_table = Table('agg_season_finishes', metadata,
+    Column('year', Integer, primary_key=True),
+    Column('manager_guid', String, primary_key=True),
+    Column('team_key', String),
+    Column('rank', Integer),
+    Column('playoff_seed', Integer),
+    Column('wins', Integer),
+    Column('losses', Integer),
+    Column('ties', Integer),
+    Column('points_for', Float),
+    Column('points_against', Float),
+    Column('playoff_wins', Integer),
+    Column('playoff_losses', Integer),
+    Column('high_score', Float),
+    Column('low_score', Float),
+    Index('ix_season_finishes_manager', 'manager_guid'),
+)
+
+# One row per manager pair per season, both directions
+h2h_seasons_table = Table('agg_h2h_seasons', metadata,
+    Column('year', Integer, primary_key=True),
+    Column('manager_guid', String, primary_key=True),
+    Column('opponent_guid', String, primary_key=True),
+    Column('games', Integer),
+    Column('wins', Integer),
+    Column('losses', Integer),
+    Column('ties', Integer),
+    Column('points_for', Float),
+    Column('points_against', Float),
+    Column('playoff_games', Integer),
+)
+
+# Highest and lowest score of every week
+weekly_extremes_table = Table('agg_weekly_extremes', metadata,
+    Column('year', Integer, primary_key=True),
+    Column('week', Integer, primary_key=True),
+    Column('high_manager_guid', String),
+    Column('high_points', Float),
+    Column('low_manager_guid', String),
+    Column('low_points', Float),
+    Index('ix_weekly_extremes_high', 'high_points'),
+    Index('ix_weekly_extremes_low', 'low_points'),
+)
+
+# All-time totals, summed from the per-season tables above
+records_table = Table('agg_alltime_records', metadata,
+    Column('manager_guid', String, primary_key=True),
+    Column('seasons', Integer),
+    Column('wins', Integer),
+    Column('losses', Integer),
+    Column('ties', Integer),
+    Column('points_for', Float),
+    Column('points_against', Float),
+    Column('playoff_wins', Integer),
+    Column('playoff_losses', Integer),
+    Column('championships', Integer),
+    Column('last_places', Integer),
+    Column('best_finish', Integer),
+    Column('high_score', Float),
+)
+
+h2h_table = Table('agg_head_to_head', metadata,
+    Column('manager_guid', String, primary_key=True),
+    Column('opponent_guid', String, primary_key=True),
+    Column('games', Integer),
+    Column('wins', Integer),
+    Column('losses', Integer),
+    Column('ties', Integer),
+    Column('points_for', Float),
+    Column('points_against', Float),
+    Column('playoff_games', Integer),
+    Column('first_year', Integer),
+    Column('last_year', Integer),
+)
+
+##################################################
+################### CONNECTION ###################
+##################################################
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine(database_url: str = None):
+    """
+    Returns an engine for the history database, creating missing tables
+
+    Parameters
+    ----------
+    database_url: str | None
+        SQLAlchemy URL, the shared HISTORY_DATABASE_URL engine if None
+
+    Returns
+    -------
+    sqlalchemy.Engine
+    """
+    global _engine
+    if database_url is not None and database_url != HISTORY_DATABASE_URL:
+        return _create_engine(database_url)
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(HISTORY_DATABASE_URL)
+    return _engine
+
+
+def _create_engine(database_url: str):
+    if database_url.startswith('sqlite:///'):
+        Path(database_url[len('sqlite:///'):]).parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(database_url)
+    metadata.create_all(engine)
+    return engine
+
+
+def upsert(connection, table, rows: list, newer: str = None) -> None:
+    """
+    Bulk inserts rows, replacing any row with the same primary key.
+    Works on SQLite and Postgres.
+
+    Parameters
+    ----------
+    connection: sqlalchemy.Connection
+        open connection, usually inside engine.begin()
+    table: sqlalchemy.Table
+        target table
+    rows: list
+        dicts keyed by column name
+    newer: str | None
+        only replace rows whose value in this column is not larger,
+        e.g. 'last_year' so an older season never overwrites a newer one
+    """
+    if not rows:
+        return
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    keys = [c.name for c in table.primary_key.columns]
+    statement = insert(table)
+    updates = {c.name: statement.excluded[c.name] for c in table.columns if c.name not in keys}
+    where = table.c[newer] <= statement.excluded[newer] if newer else None
+    connection.execute(statement.on_conflict_do_update(index_elements=keys, set_=updates, where=where), rows)
+
+
+##################################################
+############### AGGREGATE REFRESH ################
+##################################################
+
+def _read_games(connection, years: list) -> pd.DataFrame:
+    """
+    Completed games of the given seasons, one row per team, with both managers
+    """
+    scores, games = weekly_scores_table.c, matchups_table.c
+    team = teams_table.alias('team')
+    opponent = teams_table.alias('opponent')
+    opponent_scores = weekly_scores_table.alias('opponent_scores')
+
+    statement = (
+        select(
+            scores.year, scores.week, scores.team_key, scores.points, scores.win, scores.is_playoffs,
+            team.c.manager_guid, opponent.c.manager_guid.label('opponent_guid'),
+            opponent_scores.c.points.label('opponent_points'),
+            opponent_scores.c.win.label('opponent_win'),
+        )
+        .join(matchups_table, (games.year == scores.year) & (games.week == scores.week) & (games.matchup_id == scores.matchup_id))
+        .join(team, team.c.team_key == scores.team_key)
+        .join(opponent, opponent.c.team_key == scores.opponent_team_key)
+        .join(opponent_scores, (opponent_scores.c.year == scores.year) & (opponent_scores.c.week == scores.week)
+              & (opponent_scores.c.team_key == scores.opponent_team_key))
+        .where(scores.year.in_(years), games.status == 'postevent')
+    )
+    df = pd.read_sql(statement, connection)
+
+    return df.astype({'win': bool, 'opponent_win': bool, 'is_playoffs': bool})
+
+
+def _season_aggregates(games: pd.DataFrame, teams: pd.DataFrame) -> tuple:
+    """
+    Builds the per-season aggregate rows from completed games and final teams
+    """
+    games = games.assign(
+        loss=games['opponent_win'],
+        tie=~games['win'] & ~games['opponent_win'],
+        playoff_win=games['win'] & games['is_playoffs'],
+        playoff_loss=games['opponent_win'] & games['is_playoffs'],
+    )
+    regular = games[~games['is_playoffs']]
+
+    # Season finishes: final rank and seed from Yahoo, records from games
+    records = regular.groupby(['year', 'manager_guid']).agg(
+        wins=('win', 'sum'), losses=('loss', 'sum'), ties=('tie', 'sum'),
+        points_for=('points', 'sum'), points_against=('opponent_points', 'sum'),
+    )
+    playoffs = games.groupby(['year', 'manager_guid']).agg(
+        playoff_wins=('playoff_win', 'sum'), playoff_losses=('playoff_loss', 'sum'),
+        high_score=('points', 'max'), low_score=('points', 'min'),
+    )
+    finishes = (
+        teams[['year', 'manager_guid', 'team_key', 'rank', 'playoff_seed']]
+        .join(records.join(playoffs), on=['year', 'manager_guid'], how='inner')
+        .reset_index(drop=True)
+    )
+
+    # Head to head: every game seen from both sides
+    h2h = games.groupby(['year', 'manager_guid', 'opponent_guid']).agg(
+        games=('win', 'size'), wins=('win', 'sum'), losses=('loss', 'sum'), ties=('tie', 'sum'),
+        points_for=('points', 'sum'), points_against=('opponent_points', 'sum'),
+        playoff_games=('is_playoffs', 'sum'),
+    ).reset_index()
+
+    # Weekly highs and lows, ties going to the first manager seen
+    by_week = games.sort_values(['year', 'week', 'points', 'manager_guid'])
+    lows = by_week.groupby(['year', 'week']).first()
+    highs = by_week.groupby(['year', 'week']).last()
+    extremes = pd.DataFrame({
+        'high_manager_guid': highs['manager_guid'],
+        'high_points': highs['points'],
+        'low_manager_guid': lows['manager_guid'],
+        'low_points': lows['points'],
+    }).reset_index()
+
+    return finishes, h2h, extremes
+
+
+def _records(rows) -> list:
+    # numpy scalars confuse some DBAPIs, hand plain Python values over
+    return [
+        {key: (value.item() if hasattr(value, 'item') else value) for key, value in row.items()}
+        for row in rows.to_dict('records')
+    ]
+
+
+def refresh_aggregates(engine, years) -> None:
+    """
+    Rebuilds the aggregates of the given seasons, then the all-time tables
+
+    Parameters
+    ----------
+    engine: sqlalchemy.Engine
+        history database
+    years: iterable
+        seasons whose rows changed during the last sync
+    """
+    years = sorted(set(int(year) for year in years))
+    if not years:
+        return
+
+    with engine.begin() as connection:
+        games = _read_games(connection, years)
+        teams = pd.read_sql(select(teams_table).where(teams_table.c.year.in_(years)), connection)
+        finishes, h2h, extremes = _season_aggregates(games, teams)
+
+        # Per-season tables: replace only the touched seasons
+        for table, rows in ((season_finishes_table, finishes), (h2h_seasons_table, h2h),
+                            (weekly_extremes_table, extremes)):
+            connection.execute(delete(table).where(table.c.year.in_(years)))
+            if len(rows):
+                connection.execute(table.insert(), _records(rows))
+
+        # All-time tables: a few hundred per-season rows, summed in full
+        all_finishes = pd.read_sql(
+            select(season_finishes_table, seasons_table.c.is_finished)
+            .join(seasons_table, seasons_table.c.year == season_finishes_table.c.year),
+            connection,
+        )
+        # Final ranks only count once a season is over
+        finished = all_finishes['is_finished'].astype(bool)
+        last_place = all_finishes.groupby('year')['rank'].transform('max')
+        all_finishes = all_finishes.assign(
+            championship=finished & (all_finishes['rank'] == 1),
+            last_place=finished & (all_finishes['rank'] == last_place),
+        )
+        records = all_finishes.groupby('manager_guid').agg(
+            seasons=('year', 'nunique'), wins=('wins', 'sum'), losses=('losses', 'sum'),
+            ties=('ties', 'sum'), points_for=('points_for', 'sum'),
+            points_against=('points_against', 'sum'), playoff_wins=('playoff_wins', 'sum'),
+            playoff_losses=('playoff_losses', 'sum'), championships=('championship', 'sum'),
+            last_places=('last_place', 'sum'), best_finish=('rank', 'min'), high_score=('high_score', 'max'),
+        ).reset_index()
+
+        all_h2h = pd.read_sql(select(h2h_seasons_table), connection)
+        head_to_head = all_h2h.groupby(['manager_guid', 'opponent_guid']).agg(
+            games=('games', 'sum'), wins=('wins', 'sum'), losses=('losses', 'sum'), ties=('ties', 'sum'),
+            points_for=('points_for', 'sum'), points_against=('points_against', 'sum'),
+            playoff_games=('playoff_games', 'sum'), first_year=('year', 'min'), last_year=('year', 'max'),
+        ).reset_index()
+
+        for table, rows in ((records_table, records), (h2h_table, head_to_head)):
+            connection.execute(delete(table))
+            if len(rows):
+                connection.execute(table.insert(), _records(rows))
+
+
+##################################################
+##################### READS ######################
+##################################################
+
+def find_manager(name: str, engine=None) -> dict:
+    """
+    Looks a manager up by nickname, case-insensitively
+
+    Parameters
+    ----------
+    name: str
+        nickname, e.g. "Pete"
+
+    Returns
+    -------
+    dict | None
+        manager_guid and nickname, None if nobody matches
+    """
+    engine = get_engine() if engine is None else engine
+    with engine.connect() as connection:
+        row = connection.execute(
+            select(managers_table)
+            .where(func.lower(managers_table.c.nickname) == name.strip().lower())
+            .order_by(managers_table.c.last_year.desc())
+        ).mappings().first()
+    return dict(row) if row else None
+
+
+def read_head_to_head(manager_guid: str, opponent_guid: str, engine=None) -> dict:
+    """
+    All-time head-to-head record of one manager against another
+
+    Returns
+    -------
+    dict | None
+        one agg_head_to_head row, None if they never played
+    """
+    engine = get_engine() if engine is None else engine
+    with engine.connect() as connection:
+        row = connection.execute(
+            select(h2h_table).where(
+                h2h_table.c.manager_guid == manager_guid,
+                h2h_table.c.opponent_guid == opponent_guid,
+            )
+        ).mappings().first()
+    return dict(row) if row else None
+
+
+def read_alltime_records(engine=None) -> pd.DataFrame:
+    """
+    All-time records of every manager, best win total first
+    """
+    engine = get_engine() if engine is None else engine
+    statement = (
+        select(records_table, managers_table.c.nickname)
+        .join(managers_table, managers_table.c.manager_guid == records_table.c.manager_guid)
+        .order_by(records_table.c.wins.desc())
+    )
+    with engine.connect() as connection:
+        return pd.read_sql(statement, connection)
+
+
+def read_regular_season_games(years=None, engine=None) -> pd.DataFrame:
+    """
+    Completed regular season scores, in the layout of load_matchups
+
+    Parameters
+    ----------
+    years: iterable | None
+        seasons to read, every stored season if None
+
+    Returns
+    -------
+    pd.DataFrame
+        'year', 'week', 'matchup_id', 'team_key', 'team_total_points',
+        'manager_guid' and 'nickname', one row per team per game
+    """
+    engine = get_engine() if engine is None else engine
+    scores, games = weekly_scores_table.c, matchups_table.c
+
+    statement = (
+        select(
+            scores.year, scores.week, scores.matchup_id, scores.team_key,
+            scores.points.label('team_total_points'),
+            teams_table.c.manager_guid, managers_table.c.nickname,
+        )
+        .join(matchups_table, (games.year == scores.year) & (games.week == scores.week) & (games.matchup_id == scores.matchup_id))
+        .join(teams_table, teams_table.c.team_key == scores.team_key)
+        .join(managers_table, managers_table.c.manager_guid == teams_table.c.manager_guid)
+        .where(games.status == 'postevent', ~scores.is_playoffs)
+    )
+    if years is not None:
+        statement = statement.where(scores.year.in_(list(years)))
+
+    with engine.connect() as connection:
+        return pd.read_sql(statement, connection)
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from yahoo.client import query
+from yahoo.fetcher import get_scheduler, current_priority
+
+"""
+THIS FILE LOADS YAHOO MATCHUPS INTO A COLUMNAR DATAFRAME SHARED BY
+EVERY ANALYTICS FUNCTION. VALUES ARE READ STRAIGHT OFF THE yfpy
+OBJECTS, WITHOUT THE to_json -> json.loads ROUND TRIP
+"""
+
+# Column order and dtypes of every frame returned by this module
+MATCHUP_COLUMNS = {
+    'matchup_id': np.int64,
+    'week': np.int64,
+    'winner_team_key': object,
+    'team_key': object,
+    'team_total_points': np.float64,
+    'team_projected_points': np.float64,
+    'win': np.int64,
+    'is_playoffs': np.bool_,
+    'status': object,
+}
+
+
+def make_matchup_id(week, index):
+    """
+    Deterministic matchup id built from the week and the matchup's position
+
+    Parameters
+    ----------
+    week: int | np.ndarray
+        fantasy week
+    index: int | np.ndarray
+        position of the matchup within the week
+
+    Returns
+    -------
+    int | np.ndarray
+        week * 100 + index, e.g. 703 for the fourth matchup of week 7
+    """
+    return week * 100 + index
+
+
+def matchups_to_frame(matchups_by_week) -> pd.DataFrame:
+    """
+    Flattens yfpy matchups into one row per team per matchup
+
+    Parameters
+    ----------
+    matchups_by_week: iterable
+        (week, list of yfpy Matchup) pairs
+
+    Returns
+    -------
+    pd.DataFrame
+        columns and dtypes as in MATCHUP_COLUMNS
+    """
+    columns = {name: [] for name in MATCHUP_COLUMNS}
+
+    for week, matchups in matchups_by_week:
+        for index, matchup in enumerate(matchups):
+            matchup_id = make_matchup_id(int(week), index)
+            winner = matchup.winner_team_key or None
+
+            for team in matchup.teams:
+                columns['matchup_id'].append(matchup_id)
+                columns['week'].append(week)
+                columns['winner_team_key'].append(winner)
+                columns['team_key'].append(team.team_key)
+                columns['team_total_points'].append(team.team_points.total)
+                columns['team_projected_points'].append(team.team_projected_points.total)
+                columns['win'].append(winner is not None and winner == team.team_key)
+                columns['is_playoffs'].append(matchup.is_playoffs)
+                columns['status'].append(matchup.status)
+
+    return pd.DataFrame({
+        name: np.asarray(values, dtype=dtype) for (name, dtype), values
+        in zip(MATCHUP_COLUMNS.items(), columns.values())
+    })
+
+
+def load_matchups(weeks, source=None) -> pd.DataFrame:
+    """
+    Loads every matchup for the given weeks, fetching uncached weeks concurrently
+
+    Parameters
+    ----------
+    weeks: iterable
+        weeks to load, e.g. range(1, current_week + 1)
+    source: YahooFantasySportsQuery | None
+        query to read from, defaults to the shared client
+
+    Returns
+    -------
+    pd.DataFrame
+        one row per team per matchup, columns as in MATCHUP_COLUMNS
+    """
+    source = query if source is None else source
+    weeks = list(weeks)
+
+    # Weeks are fetched concurrently, at the caller's priority
+    matchups = get_scheduler().map(source.get_league_matchups_by_week, weeks, priority=current_priority())
+
+    return matchups_to_frame(zip(weeks, matchups))
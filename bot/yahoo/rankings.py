@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+from yahoo.store import (
+    read_completed_weeks, read_matchups, read_power_rankings, write_power_rankings
+)
+
+"""
+THIS FILE KEEPS THE POWER RANKINGS AS RUNNING PER-TEAM AGGREGATES.
+EACH COMPLETED WEEK IS APPLIED ONCE ON TOP OF THE PREVIOUS WEEK'S
+STORED SNAPSHOT, SO DELTAS AND RANK HISTORY ARE JUST READS
+"""
+
+# Rank change emojis
+P_RANK_UP_EMOJI = "🟢"
+P_RANK_DOWN_EMOJI = "🔻"
+P_RANK_SAME_EMOJI = "🟰"
+
+STATE_COLUMNS = ['games', 'total_points', 'min_points', 'max_points', 'wins']
+
+
+def empty_state(team_keys) -> pd.DataFrame:
+    """
+    Running aggregates of a season before any game, indexed by team key
+    """
+    return pd.DataFrame({
+        'games': 0,
+        'total_points': 0.0,
+        'min_points': np.inf,
+        'max_points': -np.inf,
+        'wins': 0,
+    }, index=pd.Index(team_keys, name='team_key'))
+
+
+def apply_week(state: pd.DataFrame, week: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds one completed week to the running aggregates, O(teams)
+
+    Parameters
+    ----------
+    state: pd.DataFrame
+        running aggregates indexed by team key, as from empty_state
+    week: pd.DataFrame
+        that week's matchup records with 'team_key', 'team_total_points'
+        and 'win' columns
+
+    Returns
+    -------
+    pd.DataFrame
+        new running aggregates; teams without a game that week are unchanged
+    """
+    week = week.set_index('team_key')
+    points = week['team_total_points'].reindex(state.index)
+    played = points.notna()
+
+    state = state.copy()
+    state['games'] += played.astype(int)
+    state['total_points'] += points.fillna(0.0)
+    state['min_points'] = np.fmin(state['min_points'], points)
+    state['max_points'] = np.fmax(state['max_points'], points)
+    state['wins'] += week['win'].reindex(state.index).fillna(0).astype(int)
+
+    return state
+
+
+def power_scores(state: pd.DataFrame) -> pd.Series:
+    """
+    ((avg. score x 6) + [(highest score + lowest score) x 2] + [(winning % x 200) x 2]) / 10
+    """
+    games = state['games'].where(state['games'] > 0)
+    return (
+        (state['total_points'] / games * 6) +
+        ((state['max_points'] + state['min_points']) * 2) +
+        (((state['wins'] / games) * 200) * 2)
+    ) / 10
+
+
+def rank_snapshot(state: pd.DataFrame, week: int) -> pd.DataFrame:
+    """
+    Running aggregates plus power score and rank, ready to be stored
+    """
+    snapshot = state.copy()
+    snapshot['power_score'] = power_scores(state)
+    snapshot['rank'] = snapshot['power_score'].rank(ascending=False, method='min').astype(int)
+    snapshot['week'] = week
+
+    return snapshot.reset_index()
+
+
+def rank_change_emoji(change: int) -> str:
+    """
+    Emoji for a rank change, positive meaning the team moved up
+    """
+    if change > 0:
+        return P_RANK_UP_EMOJI
+    if change < 0:
+        return P_RANK_DOWN_EMOJI
+    return P_RANK_SAME_EMOJI
+
+
+def update_power_rankings(game_id: str = None) -> list:
+    """
+    Applies every completed week that has no snapshot yet
+
+    Parameters
+    ----------
+    game_id: str | None
+        season, defaults to YAHOO_GAME_ID
+
+    Returns
+    -------
+    list
+        weeks that were applied
+    """
+    latest = read_power_rankings(game_id=game_id)
+    last_week = int(latest['week'].max()) if len(latest) else 0
+
+    new_weeks = [week for week in read_completed_weeks(game_id) if week > last_week]
+    if not new_weeks:
+        return []
+
+    # Only the new weeks are read, on top of the latest snapshot
+    df = read_matchups(new_weeks, game_id=game_id)
+    if len(latest):
+        state = latest.set_index('team_key')[STATE_COLUMNS]
+    else:
+        state = empty_state(np.sort(df['team_key'].unique()))
+
+    for week in new_weeks:
+        state = apply_week(state, df[df['week'] == week])
+        write_power_rankings(rank_snapshot(state, week), game_id=game_id)
+
+    return new_weeks
@@ -1,77 +1,164 @@
-import os
-import sys
-import json
-from typing import Final
-from yfpy.query import YahooFantasySportsQuery
-from dotenv import load_dotenv
-from pathlib import Path
-from functionality import get_current_week
-
-# set directory location of private.json for authentication
-project_dir = Path(__file__).parent.parent
-sys.path.insert(0, str(project_dir))
-auth_dir = project_dir / "auth"
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Fetch Yahoo API credentials from environment variables
-CONSUMER_KEY: Final[str] = os.getenv('CONSUMER_KEY')
-CONSUMER_SECRET: Final[str] = os.getenv('CONSUMER_SECRET')
-REFRESH_TOKEN: Final[str] = os.getenv('REFRESH_TOKEN')
-
-# Fetch league information
-query = YahooFantasySportsQuery(
-    auth_dir, 
-    league_id='49754', # Fill in league_id
-    game_code='nfl',   # Leave this as is
-    game_id='423',     # Fill in current game id
-    consumer_key=CONSUMER_KEY,
-    consumer_secret=CONSUMER_SECRET,
-    )
+import time
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from yahoo.fetcher import request_priority, BACKGROUND
+
 ####################################################
 ### YAHOO FANTASY SPORTS API SCHEDULED FUNCTIONS ###
 ####################################################
 
-def get_power_rankings():
+"""
+THIS FILE HOLDS THE PRECOMPUTED COMMAND RESULTS (SNAPSHOTS) AND THE
+NFL-CALENDAR CADENCE THEY ARE REFRESHED ON. THE REFRESH LOOP ITSELF
+LIVES IN THE Scheduler COG (scheduler.py)
+"""
+
+# NFL kickoffs are scheduled in Eastern time
+NFL_TIMEZONE = ZoneInfo('America/New_York')
+
+# Seconds between refreshes of each snapshot, by part of the NFL week
+REFRESH_INTERVALS = {
+    # Games being played: scores move every minute
+    'live': {'scoreboard': 60, 'standings': 600, 'powrank': 600, 'odds': 1800, 'clinch': 1800},
+    # Game days outside the windows, and Tuesday morning stat corrections
+    'gameday': {'scoreboard': 1800, 'standings': 1800, 'powrank': 1800, 'odds': 3 * 3600, 'clinch': 3 * 3600},
+    # Nothing is played midweek
+    'midweek': {'scoreboard': 6 * 3600, 'standings': 6 * 3600, 'powrank': 6 * 3600, 'odds': 12 * 3600, 'clinch': 12 * 3600},
+}
+
+# (weekday, start hour, end hour) in Eastern time, Monday is 0
+GAME_WINDOWS = [
+    (3, 20, 24),    # Thursday Night Football
+    (6, 9, 24),     # Sunday, London games through Sunday Night Football
+    (0, 19, 24),    # Monday Night Football
+    (5, 16, 24),    # Late-season Saturday games
+]
+
+# Days on which scores or stat corrections can still change
+GAME_DAYS = {0, 1, 3, 5, 6}
+
+
+def week_phase(now: datetime = None) -> str:
     """
-    This function returns the power rankings of the teams in the league for a given week,
-    along with the change in the power rankings from the previous week. The power rankings
-    are determined by the following equation:
+    Part of the NFL week a moment falls in
 
-    Power rankings are then delivered by Marcy with commentary developed by Llamma.cpp, and 
-    trained on ESPN, CBS, and The Atheletic NFL power rankings articles along with previous
-    group chat data. 
-    
     Parameters
     ----------
-    data
-        json formatted string of
+    now: datetime | None
+        moment to classify, defaults to now
 
     Returns
     -------
-    string
-        formatted for discord chat
+    str
+        'live', 'gameday' or 'midweek', a key of REFRESH_INTERVALS
+    """
+    now = datetime.now(NFL_TIMEZONE) if now is None else now.astimezone(NFL_TIMEZONE)
+
+    for weekday, start, end in GAME_WINDOWS:
+        if now.weekday() == weekday and start <= now.hour < end:
+            return 'live'
+    # Tuesday only counts until noon, when stat corrections are in
+    if now.weekday() in GAME_DAYS and not (now.weekday() == 1 and now.hour >= 12):
+        return 'gameday'
+    return 'midweek'
+
+
+def refresh_interval(name: str, now: datetime = None) -> float:
+    """
+    Seconds a snapshot stays fresh at the given moment
+    """
+    return REFRESH_INTERVALS[week_phase(now)][name]
+
+
+##################################################
+################### SNAPSHOTS ####################
+##################################################
+
+class Snapshot:
+    """
+    One precomputed command result
+
+    Parameters
+    ----------
+    name: str
+        command the result belongs to, e.g. 'standings'
+    version: int
+        increases by one with every refresh of that command
+    value: object
+        the result itself, usually a discord.Embed
+    elapsed: float
+        seconds the refresh took
     """
-    
-    current_week = get_current_week()
 
-    for i in range(1, current_week + 1):
-        matchups_data = query.get_league_matchups_by_week(i).to_json()
-        data = json.dumps(matchups_data)
+    def __init__(self, name: str, version: int, value, elapsed: float):
+        self.name = name
+        self.version = version
+        self.value = value
+        self.elapsed = elapsed
+        self.created_at = time.time()
 
-        teams = data.get('teams', [])
-        for team_info in teams:
-            team = team_info.get('team', {})
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
 
-            
 
+_snapshots = {}
+_snapshots_lock = threading.Lock()
 
 
-    p_rank_up_emoji = "🟢"
-    p_rank_down_emoji = "🔻"
-    p_rank_same_emoji = "🟰"
+def publish_snapshot(name: str, value, elapsed: float = 0.0) -> Snapshot:
+    """
+    Stores a new version of a command result and returns it
+    """
+    with _snapshots_lock:
+        previous = _snapshots.get(name)
+        snapshot = Snapshot(name, previous.version + 1 if previous else 1, value, elapsed)
+        _snapshots[name] = snapshot
+    return snapshot
+
+
+def get_snapshot(name: str) -> Snapshot:
+    """
+    Latest snapshot of a command, None if it was never computed
+    """
+    with _snapshots_lock:
+        return _snapshots.get(name)
+
+
+def is_due(name: str, now: datetime = None) -> bool:
+    """
+    Whether a snapshot is missing or older than its current refresh interval
+    """
+    snapshot = get_snapshot(name)
+    return snapshot is None or snapshot.age >= refresh_interval(name, now)
 
-    return 
 
-get_power_rankings()
\ No newline at end of file
+def format_age(seconds: float) -> str:
+    """
+    Short human age, e.g. 'just now', '4m ago', '2h ago'
+    """
+    if seconds < 60:
+        return 'just now'
+    if seconds < 3600:
+        return f'{seconds // 60:.0f}m ago'
+    return f'{seconds // 3600:.0f}h ago'
+
+
+def with_age(snapshot: Snapshot):
+    """
+    Copy of a snapshot's embed with its age added to the footer
+    """
+    embed = snapshot.value.copy()
+    age = f'Updated {format_age(snapshot.age)}'
+    footer = embed.footer.text
+    embed.set_footer(text=f'{footer} · {age}' if footer else age)
+    return embed
+
+
+def in_background(func, *args, **kwargs):
+    """
+    Runs func with its Yahoo requests queued behind interactive ones
+    """
+    with request_priority(BACKGROUND):
+        return func(*args, **kwargs)
@@ -0,0 +1,825 @@
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+"""
+THIS FILE CONTAINS THE VECTORIZED MONTE CARLO ENGINE USED
+BY THE PLAYOFF ODDS COMMAND
+"""
+
+##################################################
+######### SCHEDULE AND SCORE CONSTRUCTION ########
+##################################################
+
+def build_schedule(df: pd.DataFrame, team_keys: np.ndarray, weeks: np.ndarray) -> np.ndarray:
+    """
+    Builds the remaining schedule as an integer opponent array
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        matchup records with 'week', 'matchup_id' and 'team_key' columns
+    team_keys: np.ndarray
+        team keys in the order used by the simulation
+    weeks: np.ndarray
+        weeks to simulate
+
+    Returns
+    -------
+    np.ndarray
+        (weeks x teams) array where entry [w, t] is the index of the
+        opponent of team t in weeks[w], or -1 if the team has no matchup
+    """
+    schedule = np.full((len(weeks), len(team_keys)), -1, dtype=np.int64)
+
+    games = df.loc[df['week'].isin(weeks), ['week', 'matchup_id', 'team_key']]
+    if games.empty:
+        return schedule
+
+    # Pair every team with the other team sharing its matchup
+    pairs = games.merge(games, on=['week', 'matchup_id'], suffixes=('', '_opp'))
+    pairs = pairs[pairs['team_key'] != pairs['team_key_opp']]
+
+    team_index = pd.Index(team_keys)
+    week_index = pd.Index(weeks)
+    w = week_index.get_indexer(pairs['week'])
+    t = team_index.get_indexer(pairs['team_key'])
+    o = team_index.get_indexer(pairs['team_key_opp'])
+
+    # Ignore teams that are not part of the simulation
+    valid = (t >= 0) & (o >= 0)
+    schedule[w[valid], t[valid]] = o[valid]
+
+    return schedule
+
+
+def draw_scores(mean: np.ndarray, std: np.ndarray, n_simulations: int,
+                n_weeks: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draws every simulated score in a single call
+
+    Parameters
+    ----------
+    mean: np.ndarray
+        average points per team
+    std: np.ndarray
+        standard deviation of points per team
+    n_simulations: int
+        number of simulated seasons
+    n_weeks: int
+        number of weeks left to play
+    rng: np.random.Generator
+        source of randomness
+
+    Returns
+    -------
+    np.ndarray
+        (simulations x weeks x teams) array of simulated points
+    """
+    # A team with a single game played has an undefined deviation
+    std = np.nan_to_num(np.asarray(std, dtype=np.float64), nan=0.0)
+
+    return rng.normal(mean, std, size=(n_simulations, n_weeks, len(mean)))
+
+
+# Coefficients of Acklam's rational approximation to the inverse normal CDF
+_PPF_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+          1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_PPF_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+          6.680131188771972e+01, -1.328068155288572e+01, 1.0)
+_PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+          -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+          3.754408661907416e+00, 1.0)
+_PPF_LOW = 0.02425
+
+
+def _norm_ppf(u: np.ndarray) -> np.ndarray:
+    """
+    Vectorized inverse of the standard normal CDF (relative error below 1.2e-9)
+    """
+    u = np.clip(u, 1e-12, 1 - 1e-12)
+    z = np.empty_like(u)
+
+    # Central region
+    central = (u >= _PPF_LOW) & (u <= 1 - _PPF_LOW)
+    q = u[central] - 0.5
+    r = q * q
+    z[central] = q * np.polyval(_PPF_A, r) / np.polyval(_PPF_B, r)
+
+    # Tails, mirrored around the median
+    tail = ~central
+    q = np.sqrt(-2 * np.log(np.minimum(u[tail], 1 - u[tail])))
+    sign = np.where(u[tail] < 0.5, 1.0, -1.0)
+    z[tail] = sign * np.polyval(_PPF_C, q) / np.polyval(_PPF_D, q)
+
+    return z
+
+
+def draw_scores_stratified(mean: np.ndarray, std: np.ndarray, n_simulations: int,
+                           n_weeks: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draws simulated scores with Latin hypercube strata and antithetic pairs
+
+    Every (week, team) score is drawn from a different stratum of the normal
+    distribution in each season of the first half, and the second half
+    mirrors it (z -> -z). The marginal distribution of every score is
+    unchanged, so the playoff odds stay unbiased; only their variance drops.
+    Seasons within one call are dependent, so error estimates must come from
+    independent calls (see replicate_margin).
+
+    Parameters
+    ----------
+    see draw_scores
+
+    Returns
+    -------
+    np.ndarray
+        (simulations x weeks x teams) array of simulated points
+    """
+    std = np.nan_to_num(np.asarray(std, dtype=np.float64), nan=0.0)
+    n_teams = len(mean)
+    n_half = (n_simulations + 1) // 2
+    n_columns = n_weeks * n_teams
+
+    # One random permutation of the strata per (week, team) column
+    strata = rng.permuted(np.tile(np.arange(n_half), (n_columns, 1)), axis=1)
+    u = (strata + rng.random((n_columns, n_half))) / n_half
+    z = _norm_ppf(u).T.reshape(n_half, n_weeks, n_teams)
+
+    # Antithetic half mirrors every draw around the mean
+    z = np.concatenate([z, -z])[:n_simulations]
+
+    return mean + std * z
+
+
+##################################################
+############# SEASON RESOLUTION ##################
+##################################################
+
+def resolve_seasons(scores: np.ndarray, schedule: np.ndarray,
+                    wins: np.ndarray, points: np.ndarray) -> tuple:
+    """
+    Plays out the simulated scores against the real schedule
+
+    Parameters
+    ----------
+    scores: np.ndarray
+        (simulations x weeks x teams) simulated points
+    schedule: np.ndarray
+        (weeks x teams) opponent indices from build_schedule
+    wins: np.ndarray
+        wins already banked by each team
+    points: np.ndarray
+        points already banked by each team
+
+    Returns
+    -------
+    tuple
+        (simulations x teams) arrays of final wins and final points
+    """
+    n_weeks = schedule.shape[0]
+    has_game = schedule >= 0
+
+    # Look up each team's opponent score for every week at once
+    opp_scores = scores[:, np.arange(n_weeks)[:, None], np.where(has_game, schedule, 0)]
+
+    # Each matchup is counted once per team; a bye is never a win
+    won = (scores > opp_scores) & has_game
+
+    final_wins = wins + won.sum(axis=1)
+    final_points = points + np.where(has_game, scores, 0.0).sum(axis=1)
+
+    return final_wins, final_points
+
+
+def rank_seasons(final_wins: np.ndarray, final_points: np.ndarray) -> np.ndarray:
+    """
+    Orders each simulated season by wins, then total points as the tie-breaker
+
+    Parameters
+    ----------
+    final_wins: np.ndarray
+        (simulations x teams) final wins
+    final_points: np.ndarray
+        (simulations x teams) final points
+
+    Returns
+    -------
+    np.ndarray
+        (simulations x teams) team indices, best team first
+    """
+    # lexsort treats the last key as the primary one
+    return np.lexsort((-final_points, -final_wins), axis=-1)
+
+
+def count_playoff_appearances(order: np.ndarray, n_playoff_teams: int) -> np.ndarray:
+    """
+    Counts how often each team finishes inside the playoff cut
+
+    Parameters
+    ----------
+    order: np.ndarray
+        (simulations x teams) ranked team indices from rank_seasons
+    n_playoff_teams: int
+        number of teams that make the playoffs
+
+    Returns
+    -------
+    np.ndarray
+        number of simulated seasons each team made the playoffs
+    """
+    return np.bincount(order[:, :n_playoff_teams].ravel(), minlength=order.shape[1])
+
+
+##################################################
+################ PLAYOFF BRACKET #################
+##################################################
+
+# Bracket stages reported next to the seeds, with the teams left in each
+STAGES = (('bye', None), ('semifinal', 4), ('final', 2), ('champion', 1))
+
+
+def playoff_rounds(n_playoff_teams: int) -> int:
+    """
+    Rounds needed to crown a champion, byes included (8 teams -> 3)
+    """
+    return max(0, (n_playoff_teams - 1).bit_length())
+
+
+def bracket_slots(n_playoff_teams: int) -> np.ndarray:
+    """
+    Seeds in bracket order, as Yahoo draws a bracket without reseeding
+
+    Pairs are adjacent, 1v8 and 4v5 meet in the next round, 2v7 and 3v6 on
+    the other side. When the field does not fill the bracket the top seeds
+    face an empty slot (-1), which is a bye.
+
+    Parameters
+    ----------
+    n_playoff_teams: int
+        number of teams that make the playoffs
+
+    Returns
+    -------
+    np.ndarray
+        0-based seeds, e.g. [0, 7, 3, 4, 1, 6, 2, 5] for 8 teams
+    """
+    slots = np.zeros(1, dtype=np.int64)
+    while len(slots) < 1 << playoff_rounds(n_playoff_teams):
+        # Every seed meets the seed mirroring it in the doubled bracket
+        slots = np.stack([slots, 2 * len(slots) - 1 - slots], axis=1).ravel()
+
+    return np.where(slots < n_playoff_teams, slots, -1)
+
+
+def count_seeds(order: np.ndarray) -> np.ndarray:
+    """
+    Counts how often each team finishes in each position
+
+    Parameters
+    ----------
+    order: np.ndarray
+        (simulations x teams) ranked team indices from rank_seasons
+
+    Returns
+    -------
+    np.ndarray
+        (teams x positions) counts, entry [t, s] is how often team t was seed s + 1
+    """
+    n_teams = order.shape[1]
+    cells = order * n_teams + np.arange(n_teams)
+
+    return np.bincount(cells.ravel(), minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+
+
+def play_bracket(order: np.ndarray, mean: np.ndarray, std: np.ndarray,
+                 n_playoff_teams: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Plays every simulated bracket round by round
+
+    A game only needs the difference of the two scores, normal with the
+    summed variances, so each one costs a single draw and teams that are
+    out of the bracket draw nothing.
+
+    Parameters
+    ----------
+    order: np.ndarray
+        (simulations x teams) ranked team indices from rank_seasons
+    mean: np.ndarray
+        average points per team
+    std: np.ndarray
+        standard deviation of points per team
+    n_playoff_teams: int
+        number of teams that make the playoffs
+    rng: np.random.Generator
+        source of randomness
+
+    Returns
+    -------
+    np.ndarray
+        (teams x stages) counts of seasons each team reached every stage of
+        STAGES; a stage larger than the bracket is reached by every playoff team
+    """
+    n_simulations, n_teams = order.shape
+    variance = np.nan_to_num(np.asarray(std, dtype=np.float64), nan=0.0) ** 2
+    slots = bracket_slots(n_playoff_teams)
+
+    # Team in every bracket slot, -1 for an empty one
+    alive = np.where(slots >= 0, order[:, np.maximum(slots, 0)], -1)
+    byes = alive[:, 0::2][alive[:, 1::2] < 0]
+
+    left = {alive.shape[1]: alive}
+    while alive.shape[1] > 1:
+        # The better seed always sits first in its pair, so empty slots are second
+        top, bottom = alive[:, 0::2], alive[:, 1::2]
+        opponent = np.maximum(bottom, 0)
+        margin = mean[top] - mean[opponent] + np.sqrt(variance[top] + variance[opponent]) * rng.standard_normal(top.shape)
+        alive = np.where((bottom < 0) | (margin >= 0), top, bottom)
+        left[alive.shape[1]] = alive
+
+    counts = [np.bincount(byes, minlength=n_teams)]
+    for _, n_left in STAGES[1:]:
+        teams = left.get(n_left, left[len(slots)])
+        counts.append(np.bincount(teams[teams >= 0], minlength=n_teams))
+
+    return np.column_stack(counts)
+
+
+##################################################
+################# ENTRY POINT ####################
+##################################################
+
+def simulate_playoff_counts(mean: np.ndarray, std: np.ndarray, wins: np.ndarray,
+                            points: np.ndarray, schedule: np.ndarray, n_simulations: int,
+                            n_playoff_teams: int, seed=None,
+                            variance_reduction: bool = False) -> np.ndarray:
+    """
+    Simulates the rest of the regular season and counts playoff appearances
+
+    Parameters
+    ----------
+    mean: np.ndarray
+        average points per team
+    std: np.ndarray
+        standard deviation of points per team
+    wins: np.ndarray
+        wins already banked by each team
+    points: np.ndarray
+        points already banked by each team
+    schedule: np.ndarray
+        (weeks x teams) opponent indices from build_schedule
+    n_simulations: int
+        number of simulated seasons
+    n_playoff_teams: int
+        number of teams that make the playoffs
+    seed: int | np.random.SeedSequence | None
+        seed for reproducible results
+    variance_reduction: bool
+        draw stratified antithetic scores instead of independent ones
+
+    Returns
+    -------
+    np.ndarray
+        number of simulated seasons each team made the playoffs
+    """
+    rng = np.random.default_rng(seed)
+
+    draw = draw_scores_stratified if variance_reduction else draw_scores
+    scores = draw(mean, std, n_simulations, schedule.shape[0], rng)
+    final_wins, final_points = resolve_seasons(scores, schedule, wins, points)
+    order = rank_seasons(final_wins, final_points)
+
+    return count_playoff_appearances(order, n_playoff_teams)
+
+
+def simulate_outcomes(mean: np.ndarray, std: np.ndarray, wins: np.ndarray,
+                      points: np.ndarray, schedule: np.ndarray, n_simulations: int,
+                      n_playoff_teams: int, seed=None,
+                      variance_reduction: bool = False) -> np.ndarray:
+    """
+    Simulates the rest of the season and the playoff bracket in one pass
+
+    The regular season uses the same draws as simulate_playoff_counts, so
+    playoff appearances match it exactly for a given seed; the bracket is
+    then played by the seeds of each simulated season from the same stream.
+
+    Parameters
+    ----------
+    see simulate_playoff_counts
+
+    Returns
+    -------
+    np.ndarray
+        (teams x (teams + stages)) counts: how often each team finished in
+        each position, then how often it reached each stage of STAGES
+    """
+    rng = np.random.default_rng(seed)
+
+    draw = draw_scores_stratified if variance_reduction else draw_scores
+    scores = draw(mean, std, n_simulations, schedule.shape[0], rng)
+    final_wins, final_points = resolve_seasons(scores, schedule, wins, points)
+    order = rank_seasons(final_wins, final_points)
+
+    return np.hstack([count_seeds(order), play_bracket(order, mean, std, n_playoff_teams, rng)])
+
+
+def split_outcomes(outcomes: np.ndarray, n_playoff_teams: int) -> dict:
+    """
+    Names the parts of a simulate_outcomes count matrix
+
+    Returns
+    -------
+    dict
+        'counts' playoff appearances per team, 'seeds' the (teams x positions)
+        counts, and one count per team for every stage of STAGES
+    """
+    n_teams = outcomes.shape[0]
+    seeds = outcomes[:, :n_teams]
+
+    return {
+        'counts': seeds[:, :n_playoff_teams].sum(axis=1),
+        'seeds': seeds,
+        **{stage: outcomes[:, n_teams + i] for i, (stage, _) in enumerate(STAGES)},
+    }
+
+
+##################################################
+############### MULTI-CORE RUNNER ################
+##################################################
+
+# League inputs shared read-only by every task in a worker process
+_shared_inputs = {}
+
+
+def _init_worker(inputs: dict) -> None:
+    """
+    Stores the league inputs once per worker process so tasks only carry a seed
+    """
+    _shared_inputs.clear()
+    _shared_inputs.update(inputs)
+
+
+def _run_chunk(n_simulations: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Simulates one chunk of seasons against the worker's shared inputs
+    """
+    return simulate_outcomes(**_shared_inputs, n_simulations=n_simulations, seed=seed)
+
+
+def plan_chunks(n_simulations: int, chunk_size: int, seed=None) -> list:
+    """
+    Splits the simulations into fixed chunks, each with its own random stream
+
+    The plan only depends on the simulation count, chunk size and seed, never
+    on the number of workers, which keeps merged counts bit-identical.
+
+    Parameters
+    ----------
+    n_simulations: int
+        total number of simulated seasons
+    chunk_size: int
+        maximum number of seasons per chunk
+    seed: int | np.random.SeedSequence | None
+        root seed for the SeedSequence
+
+    Returns
+    -------
+    list
+        (n_simulations, SeedSequence) pairs, one per chunk
+    """
+    sizes = [chunk_size] * (n_simulations // chunk_size)
+    if n_simulations % chunk_size:
+        sizes.append(n_simulations % chunk_size)
+
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    streams = root.spawn(len(sizes))
+
+    return list(zip(sizes, streams))
+
+
+def _open_executor(inputs: dict, n_workers: int):
+    """
+    Starts a worker pool holding the league inputs, or None to run in-process
+    """
+    if n_workers <= 1:
+        return None
+
+    # Inputs travel once per worker through the initializer, not once per task
+    return ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(inputs,))
+
+
+def _simulate_chunks(inputs: dict, chunks: list, executor=None) -> np.ndarray:
+    """
+    Simulates a chunk plan and returns the (chunks x teams x outcomes) counts
+    """
+    if executor is None or len(chunks) <= 1:
+        chunk_counts = [simulate_outcomes(**inputs, n_simulations=size, seed=stream)
+                        for size, stream in chunks]
+    else:
+        sizes, streams = zip(*chunks)
+        # executor.map keeps chunk order, so merged counts are exact
+        chunk_counts = list(executor.map(_run_chunk, sizes, streams))
+
+    n_teams = len(inputs['mean'])
+    return np.array(chunk_counts, dtype=np.int64).reshape(len(chunks), n_teams, n_teams + len(STAGES))
+
+
+def run_simulations(mean: np.ndarray, std: np.ndarray, wins: np.ndarray,
+                    points: np.ndarray, schedule: np.ndarray, n_simulations: int,
+                    n_playoff_teams: int, n_workers: int = 1, chunk_size: int = 2500,
+                    seed=None, variance_reduction: bool = False) -> dict:
+    """
+    Runs the simulation in large chunks, optionally across several processes
+
+    Parameters
+    ----------
+    mean, std, wins, points, schedule, n_playoff_teams
+        see simulate_playoff_counts
+    n_simulations: int
+        total number of simulated seasons
+    n_workers: int
+        number of worker processes, 1 runs in the calling process
+    chunk_size: int
+        maximum number of seasons per chunk
+    seed: int | None
+        root seed for reproducible results
+    variance_reduction: bool
+        draw stratified antithetic scores within each chunk
+
+    Returns
+    -------
+    dict
+        the split_outcomes counts, 'n_simulations' seasons run, 'elapsed'
+        wall time in seconds and 'sims_per_second' throughput
+    """
+    start = time.perf_counter()
+
+    inputs = {
+        'mean': mean,
+        'std': std,
+        'wins': wins,
+        'points': points,
+        'schedule': schedule,
+        'n_playoff_teams': n_playoff_teams,
+        'variance_reduction': variance_reduction,
+    }
+    chunks = plan_chunks(n_simulations, chunk_size, seed)
+
+    executor = _open_executor(inputs, min(n_workers, len(chunks)))
+    try:
+        outcomes = _simulate_chunks(inputs, chunks, executor).sum(axis=0)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        **split_outcomes(outcomes, n_playoff_teams),
+        'n_simulations': n_simulations,
+        'elapsed': elapsed,
+        'sims_per_second': n_simulations / elapsed if elapsed > 0 else float('inf'),
+    }
+
+
+##################################################
+############ ADAPTIVE EARLY STOPPING #############
+##################################################
+
+def wilson_margin(counts: np.ndarray, n_simulations: int, z: float = 1.96) -> np.ndarray:
+    """
+    Half-width of the Wilson score interval for each team's playoff probability
+
+    Unlike the normal approximation, the interval does not collapse to zero
+    for teams that made (or missed) the playoffs in every simulated season.
+
+    Parameters
+    ----------
+    counts: np.ndarray
+        playoff appearances per team
+    n_simulations: int
+        number of simulated seasons
+    z: float
+        critical value, 1.96 for a 95% interval
+
+    Returns
+    -------
+    np.ndarray
+        margin of error per team as a proportion
+    """
+    p = counts / n_simulations
+    spread = np.sqrt(p * (1 - p) / n_simulations + z**2 / (4 * n_simulations**2))
+
+    return z * spread / (1 + z**2 / n_simulations)
+
+
+def replicate_margin(chunk_counts: np.ndarray, chunk_sizes: np.ndarray, z: float = 1.96) -> np.ndarray:
+    """
+    Margin of error estimated from the spread between independent chunks
+
+    Needed for variance-reduced runs, where seasons inside a chunk are not
+    independent and the binomial (Wilson) interval would overstate the error.
+
+    Parameters
+    ----------
+    chunk_counts: np.ndarray
+        (chunks x teams) playoff appearances per chunk
+    chunk_sizes: np.ndarray
+        number of seasons in each chunk
+    z: float
+        critical value, 1.96 for a 95% interval
+
+    Returns
+    -------
+    np.ndarray
+        margin of error per team as a proportion
+    """
+    n_chunks = len(chunk_sizes)
+    if n_chunks < 2:
+        return np.ones(chunk_counts.shape[1])
+
+    n_simulations = chunk_sizes.sum()
+    weights = (chunk_sizes / n_simulations)[:, None]
+    p = chunk_counts.sum(axis=0) / n_simulations
+    p_chunks = chunk_counts / chunk_sizes[:, None]
+
+    # Variance of a ratio estimator over independent clusters
+    variance = n_chunks / (n_chunks - 1) * (weights**2 * (p_chunks - p)**2).sum(axis=0)
+
+    return z * np.sqrt(variance)
+
+
+def run_adaptive_simulations(mean: np.ndarray, std: np.ndarray, wins: np.ndarray,
+                             points: np.ndarray, schedule: np.ndarray, n_playoff_teams: int,
+                             tolerance: float, time_budget: float, max_simulations: int,
+                             batch_size: int = 5000, chunk_size: int = 1250,
+                             n_workers: int = 1, seed=None, variance_reduction: bool = False,
+                             min_chunks: int = 8) -> dict:
+    """
+    Simulates in batches until every team's interval is narrow enough
+
+    Stops once the widest 95% interval half-width is below the tolerance,
+    the time budget is spent or max_simulations have been run. Stopping on
+    tolerance or on the cap is deterministic for a fixed seed; stopping on
+    the time budget depends on the machine.
+
+    Parameters
+    ----------
+    mean, std, wins, points, schedule, n_playoff_teams
+        see simulate_playoff_counts
+    tolerance: float
+        target margin of error as a proportion, e.g. 0.01 for +/- 1%
+    time_budget: float
+        seconds after which no new batch is started
+    max_simulations: int
+        hard cap on simulated seasons
+    batch_size: int
+        seasons simulated between convergence checks
+    chunk_size: int
+        maximum number of seasons per chunk within a batch
+    n_workers: int
+        number of worker processes, 1 runs in the calling process
+    seed: int | None
+        root seed for reproducible results
+    variance_reduction: bool
+        draw stratified antithetic scores; the margin then comes from the
+        spread between chunks instead of the binomial interval
+    min_chunks: int
+        chunks required before a variance-reduced run may stop on tolerance
+
+    Returns
+    -------
+    dict
+        the run_simulations result plus 'margin', the widest margin of error
+        as a proportion, and 'converged', whether the tolerance was met
+    """
+    start = time.perf_counter()
+
+    inputs = {
+        'mean': mean,
+        'std': std,
+        'wins': wins,
+        'points': points,
+        'schedule': schedule,
+        'n_playoff_teams': n_playoff_teams,
+        'variance_reduction': variance_reduction,
+    }
+    root = np.random.SeedSequence(seed)
+    chunk_outcomes = np.zeros((0, len(mean), len(mean) + len(STAGES)), dtype=np.int64)
+    chunk_sizes = np.zeros(0, dtype=np.int64)
+    n_simulations = 0
+    margin = 1.0
+
+    executor = _open_executor(inputs, n_workers)
+    try:
+        while n_simulations < max_simulations:
+            # Every batch draws from its own child stream of the root seed
+            size = min(batch_size, max_simulations - n_simulations)
+            chunks = plan_chunks(size, chunk_size, root.spawn(1)[0])
+            chunk_outcomes = np.concatenate([chunk_outcomes, _simulate_chunks(inputs, chunks, executor)])
+            chunk_sizes = np.append(chunk_sizes, [size for size, _ in chunks])
+            n_simulations += size
+
+            # Convergence is judged on the playoff odds alone
+            chunk_counts = chunk_outcomes[:, :, :n_playoff_teams].sum(axis=2)
+
+            if variance_reduction:
+                margin = replicate_margin(chunk_counts, chunk_sizes).max()
+                ready = len(chunk_sizes) >= min_chunks
+            else:
+                margin = wilson_margin(chunk_counts.sum(axis=0), n_simulations).max()
+                ready = True
+
+            if (ready and margin < tolerance) or time.perf_counter() - start > time_budget:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        **split_outcomes(chunk_outcomes.sum(axis=0), n_playoff_teams),
+        'n_simulations': n_simulations,
+        'elapsed': elapsed,
+        'sims_per_second': n_simulations / elapsed if elapsed > 0 else float('inf'),
+        'margin': margin,
+        'converged': bool(margin < tolerance),
+    }
+
+
+##################################################
+######### VARIANCE REDUCTION COMPARISON ##########
+##################################################
+
+def compare_variance_reduction(team_keys: np.ndarray, mean: np.ndarray, std: np.ndarray,
+                               wins: np.ndarray, points: np.ndarray, schedule: np.ndarray,
+                               n_playoff_teams: int, n_simulations: int = 2000,
+                               n_replicates: int = 50, seed=None) -> pd.DataFrame:
+    """
+    Compares the naive and variance-reduced estimators on the same league
+
+    Both estimators are run n_replicates times with independent seeds. The
+    spread of each team's odds across replicates gives the estimator's
+    variance, and the effective sample size is the number of independent
+    seasons that would give the same variance: p(1 - p) / variance. The
+    naive ESS should sit close to n_simulations.
+
+    Parameters
+    ----------
+    team_keys: np.ndarray
+        team keys in simulation order, used to label the report
+    mean, std, wins, points, schedule, n_playoff_teams
+        see simulate_playoff_counts
+    n_simulations: int
+        seasons per replicate
+    n_replicates: int
+        independent runs of each estimator
+    seed: int | None
+        root seed for reproducible results
+
+    Returns
+    -------
+    pd.DataFrame
+        per-team odds, standard errors and effective sample sizes for both
+        estimators plus the ESS gain from variance reduction
+    """
+    naive_streams, reduced_streams = np.random.SeedSequence(seed).spawn(2)
+    inputs = {
+        'mean': mean,
+        'std': std,
+        'wins': wins,
+        'points': points,
+        'schedule': schedule,
+        'n_playoff_teams': n_playoff_teams,
+        'n_simulations': n_simulations,
+    }
+
+    naive = np.array([simulate_playoff_counts(**inputs, seed=stream)
+                      for stream in naive_streams.spawn(n_replicates)]) / n_simulations
+    reduced = np.array([simulate_playoff_counts(**inputs, seed=stream, variance_reduction=True)
+                        for stream in reduced_streams.spawn(n_replicates)]) / n_simulations
+
+    p = np.concatenate([naive, reduced]).mean(axis=0)
+    bernoulli_variance = p * (1 - p)
+    naive_variance = naive.var(axis=0, ddof=1)
+    reduced_variance = reduced.var(axis=0, ddof=1)
+
+    # Teams whose fate is already sealed carry no information
+    with np.errstate(divide='ignore', invalid='ignore'):
+        naive_ess = np.where(naive_variance > 0, bernoulli_variance / naive_variance, np.nan)
+        reduced_ess = np.where(reduced_variance > 0, bernoulli_variance / reduced_variance, np.nan)
+
+    report = pd.DataFrame({
+        'team_key': team_keys,
+        'playoff_odds': p * 100,
+        'naive_se': np.sqrt(naive_variance) * 100,
+        'reduced_se': np.sqrt(reduced_variance) * 100,
+        'naive_ess': naive_ess,
+        'reduced_ess': reduced_ess,
+    })
+    report['ess_gain'] = report['reduced_ess'] / report['naive_ess']
+
+    return report
@@ -0,0 +1,574 @@
+import time
+import threading
+import pandas as pd
+from pathlib import Path
+from sqlalchemy import (
+    create_engine, event, MetaData, Table, Column, Integer, String, Float, Boolean, Text, Index,
+    select, func, and_
+)
+from sqlalchemy.dialects.sqlite import insert
+from yahoo.client import query
+from yahoo.loader import load_matchups, MATCHUP_COLUMNS
+from config.settings import YAHOO_GAME_ID, STORE_PATH, STORE_MAX_AGE
+
+"""
+THIS FILE KEEPS A LOCAL SQLITE COPY OF THE CURRENT LEAGUE. A SYNC
+ONLY PULLS WEEKS AND TRANSACTIONS THAT ARE NOT STORED YET (PLUS THE
+LIVE WEEK), AND COMMANDS READ FROM HERE. IF YAHOO IS SLOW OR DOWN,
+THE LAST GOOD DATA IS SERVED INSTEAD
+"""
+
+metadata = MetaData()
+
+matchups_table = Table('matchups', metadata,
+    Column('game_id', String, primary_key=True),
+    Column('week', Integer, primary_key=True),
+    Column('matchup_id', Integer, primary_key=True),
+    Column('winner_team_key', String),
+    Column('is_playoffs', Boolean),
+    Column('status', String),
+)
+
+team_scores_table = Table('team_scores', metadata,
+    Column('game_id', String, primary_key=True),
+    Column('week', Integer, primary_key=True),
+    Column('team_key', String, primary_key=True),
+    Column('matchup_id', Integer, nullable=False),
+    Column('points', Float),
+    Column('projected_points', Float),
+    Column('win', Integer),
+    Index('ix_team_scores_team', 'game_id', 'team_key'),
+)
+
+standings_table = Table('standings_snapshots', metadata,
+    Column('game_id', String, primary_key=True),
+    Column('week', Integer, primary_key=True),
+    Column('team_key', String, primary_key=True),
+    Column('nickname', String),
+    Column('rank', Integer),
+    Column('wins', Integer),
+    Column('losses', Integer),
+    Column('ties', Integer),
+    Column('points_for', Float),
+    Column('points_against', Float),
+    Column('clinched_playoffs', Integer),
+    Column('playoff_seed', Integer),
+)
+
+transactions_table = Table('transactions', metadata,
+    Column('game_id', String, primary_key=True),
+    Column('transaction_key', String, primary_key=True),
+    Column('transaction_id', Integer),
+    Column('type', String),
+    Column('status', String),
+    Column('timestamp', Integer),
+    Column('data', Text),
+    Index('ix_transactions_time', 'game_id', 'timestamp'),
+)
+
+# Running power-rank aggregates and ranking after each completed week
+power_rankings_table = Table('power_rankings', metadata,
+    Column('game_id', String, primary_key=True),
+    Column('week', Integer, primary_key=True),
+    Column('team_key', String, primary_key=True),
+    Column('games', Integer),
+    Column('total_points', Float),
+    Column('min_points', Float),
+    Column('max_points', Float),
+    Column('wins', Integer),
+    Column('power_score', Float),
+    Column('rank', Integer),
+)
+
+# Newest transaction already posted by the transaction feed
+transaction_feed_table = Table('transaction_feed', metadata,
+    Column('game_id', String, primary_key=True),
+    Column('transaction_key', String),
+    Column('transaction_id', Integer),
+    Column('timestamp', Integer),
+    Column('updated_at', Float),
+)
+
+sync_state_table = Table('sync_state', metadata,
+    Column('game_id', String, primary_key=True),
+    Column('current_week', Integer),
+    Column('end_week', Integer),
+    Column('synced_at', Float),
+)
+
+# Season layout from the league settings
+league_settings_table = Table('league_settings', metadata,
+    Column('game_id', String, primary_key=True),
+    Column('playoff_start_week', Integer),
+    Column('num_playoff_teams', Integer),
+    Column('updated_at', Float),
+)
+
+##################################################
+################### CONNECTION ###################
+##################################################
+
+_engine = None
+_engine_lock = threading.Lock()
+_sync_lock = threading.RLock()
+
+
+def get_engine(path=None):
+    """
+    Returns the store's engine, creating the database file and tables on first use
+
+    Parameters
+    ----------
+    path: str | Path | None
+        SQLite file, defaults to STORE_PATH
+
+    Returns
+    -------
+    sqlalchemy.Engine
+    """
+    global _engine
+    if path is not None:
+        return _create_engine(path)
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(STORE_PATH)
+    return _engine
+
+
+def _create_engine(path):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(connection, _):
+        # WAL lets commands read while a sync is writing
+        cursor = connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
+    metadata.create_all(engine)
+    return engine
+
+
+def _upsert(connection, table, rows: list, keys: list) -> None:
+    """
+    Inserts rows, replacing any row with the same primary key
+    """
+    if not rows:
+        return
+    statement = insert(table)
+    updates = {c.name: statement.excluded[c.name] for c in table.columns if c.name not in keys}
+    connection.execute(statement.on_conflict_do_update(index_elements=keys, set_=updates), rows)
+
+
+##################################################
+###################### SYNC ######################
+##################################################
+
+def _weeks_to_sync(connection, game_id: str, current_week: int, end_week: int) -> list:
+    """
+    Weeks that are missing, or stored but not final yet and already started
+    """
+    stored = connection.execute(
+        select(matchups_table.c.week, func.min(matchups_table.c.status == 'postevent'))
+        .where(matchups_table.c.game_id == game_id)
+        .group_by(matchups_table.c.week)
+    ).all()
+    final = {week: bool(is_final) for week, is_final in stored}
+
+    return [
+        week for week in range(1, end_week + 1)
+        if week not in final or (week <= current_week and not final[week])
+    ]
+
+
+def transaction_mark(transaction) -> tuple:
+    """
+    Sort key of a transaction, (timestamp, transaction id)
+    """
+    return (int(transaction.timestamp or 0), int(transaction.transaction_id or 0))
+
+
+def newer_transactions(transactions, mark: tuple) -> list:
+    """
+    Transactions after a high-water mark, newest first
+
+    Yahoo lists transactions newest first, so this stops at the first one
+    already seen instead of looking at the whole season.
+
+    Parameters
+    ----------
+    transactions: list
+        yfpy Transactions, newest first
+    mark: tuple | None
+        (timestamp, transaction id) of the newest transaction already seen
+
+    Returns
+    -------
+    list
+        the unseen transactions
+    """
+    if mark is None:
+        return list(transactions)
+
+    new = []
+    for transaction in transactions:
+        if transaction_mark(transaction) <= tuple(mark):
+            break
+        new.append(transaction)
+    return new
+
+
+def _latest_transaction(connection, game_id: str) -> tuple:
+    """
+    High-water mark of the stored transactions, None if there are none
+    """
+    transactions = transactions_table.c
+    row = connection.execute(
+        select(transactions.timestamp, transactions.transaction_id)
+        .where(transactions.game_id == game_id)
+        .order_by(transactions.timestamp.desc(), transactions.transaction_id.desc())
+        .limit(1)
+    ).first()
+    return tuple(row) if row else None
+
+
+def _standings_rows(standings, game_id: str, week: int) -> list:
+    rows = []
+    for team in standings.teams:
+        team_standings = team.team_standings
+        managers = team.managers
+        rows.append({
+            'game_id': game_id,
+            'week': week,
+            'team_key': team.team_key,
+            'nickname': managers[0].nickname if managers else None,
+            'rank': team_standings.rank,
+            'wins': team_standings.outcome_totals.wins,
+            'losses': team_standings.outcome_totals.losses,
+            'ties': team_standings.outcome_totals.ties,
+            'points_for': team.team_points.total,
+            'points_against': team_standings.points_against,
+            'clinched_playoffs': team.clinched_playoffs,
+            'playoff_seed': team_standings.playoff_seed,
+        })
+    return rows
+
+
+def sync_league(source=None, game_id: str = None, engine=None) -> dict:
+    """
+    Pulls everything the store does not have yet
+
+    Parameters
+    ----------
+    source: YahooFantasySportsQuery | None
+        query to read from, defaults to the shared client
+    game_id: str | None
+        season being synced, defaults to YAHOO_GAME_ID
+    engine: sqlalchemy.Engine | None
+        store to write to, defaults to get_engine()
+
+    Returns
+    -------
+    dict
+        'weeks' synced, number of new 'transactions' and 'current_week'
+    """
+    source = query if source is None else source
+    game_id = str(game_id or YAHOO_GAME_ID)
+    engine = get_engine() if engine is None else engine
+
+    with _sync_lock:
+        league = source.get_league_metadata()
+        current_week = int(league.current_week)
+        end_week = int(league.end_week or 17)
+        settings = source.get_league_settings()
+
+        with engine.connect() as connection:
+            weeks = _weeks_to_sync(connection, game_id, current_week, end_week)
+            latest_transaction = _latest_transaction(connection, game_id)
+
+        df = load_matchups(weeks, source) if weeks else pd.DataFrame(columns=list(MATCHUP_COLUMNS))
+        standings = source.get_league_standings()
+        transactions = source.get_league_transactions()
+
+        # Only serialize transactions we have never seen
+        new_transactions = [
+            {
+                'game_id': game_id,
+                'transaction_key': transaction.transaction_key,
+                'transaction_id': transaction.transaction_id,
+                'type': transaction.type,
+                'status': transaction.status,
+                'timestamp': transaction.timestamp,
+                'data': transaction.to_json(),
+            }
+            for transaction in newer_transactions(transactions, latest_transaction)
+        ]
+
+        matchup_rows = (
+            df.drop_duplicates(['week', 'matchup_id'])
+            [['week', 'matchup_id', 'winner_team_key', 'is_playoffs', 'status']]
+            .assign(game_id=game_id)
+            .to_dict('records')
+        )
+        score_rows = (
+            df[['week', 'team_key', 'matchup_id', 'team_total_points', 'team_projected_points', 'win']]
+            .rename(columns={'team_total_points': 'points', 'team_projected_points': 'projected_points'})
+            .assign(game_id=game_id)
+            .to_dict('records')
+        )
+
+        with engine.begin() as connection:
+            _upsert(connection, matchups_table, matchup_rows, ['game_id', 'week', 'matchup_id'])
+            _upsert(connection, team_scores_table, score_rows, ['game_id', 'week', 'team_key'])
+            _upsert(connection, standings_table, _standings_rows(standings, game_id, current_week),
+                    ['game_id', 'week', 'team_key'])
+            if new_transactions:
+                connection.execute(
+                    insert(transactions_table).on_conflict_do_nothing(),
+                    new_transactions,
+                )
+            _upsert(connection, league_settings_table, [{
+                'game_id': game_id,
+                # Leagues without playoffs play the whole season as regular season
+                'playoff_start_week': int(settings.playoff_start_week or end_week + 1),
+                'num_playoff_teams': int(settings.num_playoff_teams or 0),
+                'updated_at': time.time(),
+            }], ['game_id'])
+            _upsert(connection, sync_state_table, [{
+                'game_id': game_id,
+                'current_week': current_week,
+                'end_week': end_week,
+                'synced_at': time.time(),
+            }], ['game_id'])
+
+    return {'weeks': weeks, 'transactions': len(new_transactions), 'current_week': current_week}
+
+
+def ensure_synced(max_age: float = STORE_MAX_AGE, game_id: str = None) -> None:
+    """
+    Syncs if the store is older than max_age seconds
+
+    If Yahoo fails and the store already holds data, the error is logged
+    and commands keep answering from the last good sync.
+
+    Parameters
+    ----------
+    max_age: float
+        seconds a sync stays fresh
+    game_id: str | None
+        season, defaults to YAHOO_GAME_ID
+    """
+    state = read_sync_state(game_id)
+    if state is not None and time.time() - state['synced_at'] < max_age:
+        return
+
+    with _sync_lock:
+        # Callers queued behind a sync find it fresh and skip their own
+        state = read_sync_state(game_id)
+        if state is not None and time.time() - state['synced_at'] < max_age:
+            return
+        try:
+            sync_league(game_id=game_id)
+        except Exception as e:
+            if state is None:
+                raise
+            print(f'Sync failed, serving data from {time.ctime(state["synced_at"])}: {e}')
+
+
+##################################################
+##################### READS ######################
+##################################################
+
+def read_sync_state(game_id: str = None) -> dict:
+    """
+    Current week, end week and time of the last successful sync, or None
+    """
+    game_id = str(game_id or YAHOO_GAME_ID)
+    with get_engine().connect() as connection:
+        row = connection.execute(
+            select(sync_state_table).where(sync_state_table.c.game_id == game_id)
+        ).mappings().first()
+    return dict(row) if row else None
+
+
+def read_league_settings(game_id: str = None) -> dict:
+    """
+    First playoff week and number of playoff teams, or None before the first sync
+    """
+    game_id = str(game_id or YAHOO_GAME_ID)
+    with get_engine().connect() as connection:
+        row = connection.execute(
+            select(league_settings_table.c.playoff_start_week, league_settings_table.c.num_playoff_teams)
+            .where(league_settings_table.c.game_id == game_id)
+        ).mappings().first()
+    return dict(row) if row else None
+
+
+def read_current_week(game_id: str = None) -> int:
+    return read_sync_state(game_id)['current_week']
+
+
+def read_matchups(weeks=None, game_id: str = None) -> pd.DataFrame:
+    """
+    Stored matchups in the same layout as load_matchups
+
+    Parameters
+    ----------
+    weeks: iterable | None
+        weeks to read, all stored weeks if None
+    game_id: str | None
+        season, defaults to YAHOO_GAME_ID
+
+    Returns
+    -------
+    pd.DataFrame
+        one row per team per matchup, columns as in MATCHUP_COLUMNS
+    """
+    game_id = str(game_id or YAHOO_GAME_ID)
+    scores, games = team_scores_table.c, matchups_table.c
+
+    statement = (
+        select(
+            scores.matchup_id, scores.week, games.winner_team_key, scores.team_key,
+            scores.points.label('team_total_points'),
+            scores.projected_points.label('team_projected_points'),
+            scores.win, games.is_playoffs, games.status,
+        )
+        .join(matchups_table, and_(
+            games.game_id == scores.game_id,
+            games.week == scores.week,
+            games.matchup_id == scores.matchup_id,
+        ))
+        .where(scores.game_id == game_id)
+        .order_by(scores.week, scores.matchup_id, scores.team_key)
+    )
+    if weeks is not None:
+        statement = statement.where(scores.week.in_(list(weeks)))
+
+    with get_engine().connect() as connection:
+        df = pd.read_sql(statement, connection)
+
+    return df.astype(MATCHUP_COLUMNS)
+
+
+def read_standings(game_id: str = None) -> pd.DataFrame:
+    """
+    Latest stored standings snapshot, ordered by rank
+    """
+    game_id = str(game_id or YAHOO_GAME_ID)
+    latest = (
+        select(func.max(standings_table.c.week))
+        .where(standings_table.c.game_id == game_id)
+        .scalar_subquery()
+    )
+    statement = (
+        select(standings_table)
+        .where(standings_table.c.game_id == game_id, standings_table.c.week == latest)
+        .order_by(standings_table.c.rank)
+    )
+
+    with get_engine().connect() as connection:
+        return pd.read_sql(statement, connection)
+
+
+def read_completed_weeks(game_id: str = None) -> list:
+    """
+    Weeks whose matchups are all final, in order
+    """
+    game_id = str(game_id or YAHOO_GAME_ID)
+    games = matchups_table.c
+    with get_engine().connect() as connection:
+        return list(connection.execute(
+            select(games.week)
+            .where(games.game_id == game_id)
+            .group_by(games.week)
+            .having(func.min(games.status == 'postevent') == 1)
+            .order_by(games.week)
+        ).scalars())
+
+
+def read_power_rankings(week: int = None, game_id: str = None) -> pd.DataFrame:
+    """
+    Power-rank snapshot of one week, the latest stored week if None
+
+    Returns
+    -------
+    pd.DataFrame
+        one row per team, empty if no week is stored
+    """
+    game_id = str(game_id or YAHOO_GAME_ID)
+    rankings = power_rankings_table.c
+    if week is None:
+        week = (
+            select(func.max(rankings.week))
+            .where(rankings.game_id == game_id)
+            .scalar_subquery()
+        )
+
+    statement = (
+        select(power_rankings_table)
+        .where(rankings.game_id == game_id, rankings.week == week)
+        .order_by(rankings.rank)
+    )
+    with get_engine().connect() as connection:
+        return pd.read_sql(statement, connection)
+
+
+def read_transaction_cursor(game_id: str = None) -> tuple:
+    """
+    (timestamp, transaction id) of the newest posted transaction, None
+    before the feed's first run
+    """
+    game_id = str(game_id or YAHOO_GAME_ID)
+    feed = transaction_feed_table.c
+    with get_engine().connect() as connection:
+        row = connection.execute(
+            select(feed.timestamp, feed.transaction_id).where(feed.game_id == game_id)
+        ).first()
+    return tuple(row) if row else None
+
+
+def write_transaction_cursor(transaction, game_id: str = None) -> None:
+    """
+    Moves the transaction feed's high-water mark to a transaction
+    """
+    game_id = str(game_id or YAHOO_GAME_ID)
+    timestamp, transaction_id = transaction_mark(transaction)
+    with get_engine().begin() as connection:
+        _upsert(connection, transaction_feed_table, [{
+            'game_id': game_id,
+            'transaction_key': transaction.transaction_key,
+            'transaction_id': transaction_id,
+            'timestamp': timestamp,
+            'updated_at': time.time(),
+        }], ['game_id'])
+
+
+def read_power_rank_history(game_id: str = None) -> pd.DataFrame:
+    """
+    Rank of every team after every stored week
+
+    Returns
+    -------
+    pd.DataFrame
+        weeks as index, team keys as columns
+    """
+    game_id = str(game_id or YAHOO_GAME_ID)
+    rankings = power_rankings_table.c
+    statement = select(rankings.week, rankings.team_key, rankings['rank']).where(rankings.game_id == game_id)
+    with get_engine().connect() as connection:
+        df = pd.read_sql(statement, connection)
+    return df.pivot(index='week', columns='team_key', values='rank')
+
+
+def write_power_rankings(snapshot: pd.DataFrame, game_id: str = None) -> None:
+    """
+    Stores one week's power-rank snapshot, replacing it if it exists
+    """
+    game_id = str(game_id or YAHOO_GAME_ID)
+    rows = snapshot.assign(game_id=game_id)[[c.name for c in power_rankings_table.columns]]
+    with get_engine().begin() as connection:
+        _upsert(connection, power_rankings_table, rows.to_dict('records'), ['game_id', 'week', 'team_key'])
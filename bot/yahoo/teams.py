@@ -0,0 +1,160 @@
+import time
+import threading
+import numpy as np
+import pandas as pd
+from yahoo.client import get_season_query
+from config.settings import YAHOO_GAME_ID, CACHE_TTL_TEAMS
+
+"""
+THIS FILE KEEPS AN IN-MEMORY INDEX OF EVERY TEAM IN A SEASON SO
+NICKNAMES, TEAM NAMES AND LOGOS CAN BE LOOKED UP WITHOUT QUERYING
+YAHOO ON EVERY COMMAND
+"""
+
+# Fields stored for every team, in column order
+TEAM_FIELDS = ('team_key', 'nickname', 'team_name', 'manager_id', 'logo_url')
+
+
+def _team_record(team) -> tuple:
+    """
+    Reads the indexed fields off a yfpy Team object
+    """
+    managers = team.managers
+    manager = managers[0] if managers else team.manager
+    logos = team.team_logos
+    name = team.name.decode('utf-8') if isinstance(team.name, bytes) else team.name
+
+    return (
+        team.team_key,
+        manager.nickname,
+        name,
+        manager.manager_id,
+        logos[0].url if logos else team.team_logo or None,
+    )
+
+
+class TeamIndex:
+    """
+    Team lookups for one season, by team_key
+
+    Parameters
+    ----------
+    records: list
+        one tuple per team, fields as in TEAM_FIELDS
+    """
+
+    def __init__(self, records):
+        self.records = sorted(records)
+        # Column arrays for bulk mapping, positions for O(1) lookups
+        self._columns = {
+            field: np.array([record[i] for record in self.records], dtype=object)
+            for i, field in enumerate(TEAM_FIELDS)
+        }
+        self._keys = pd.Index(self._columns['team_key'])
+        self._position = {key: i for i, key in enumerate(self._columns['team_key'])}
+
+    @classmethod
+    def from_teams(cls, teams):
+        """
+        Builds the index from the output of get_league_teams
+        """
+        return cls([_team_record(team) for team in teams])
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, team_key):
+        return team_key in self._position
+
+    def get(self, team_key: str) -> dict:
+        """
+        All indexed fields of one team, or None if the key is unknown
+        """
+        position = self._position.get(team_key)
+        if position is None:
+            return None
+        return dict(zip(TEAM_FIELDS, self.records[position]))
+
+    def nickname(self, team_key: str, default: str = 'Unknown') -> str:
+        position = self._position.get(team_key)
+        return default if position is None else self.records[position][1]
+
+    def map(self, team_keys, field: str = 'nickname') -> np.ndarray:
+        """
+        Maps an array of team keys to one indexed field in a single pass
+
+        Parameters
+        ----------
+        team_keys: array-like
+            team keys, in any order, possibly repeated
+        field: str
+            one of TEAM_FIELDS
+
+        Returns
+        -------
+        np.ndarray
+            field values aligned with team_keys, None for unknown keys
+        """
+        positions = self._keys.get_indexer(np.asarray(team_keys, dtype=object))
+        values = self._columns[field].take(np.maximum(positions, 0))
+        values[positions < 0] = None
+
+        return values
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self._columns)
+
+
+##################################################
+############### PER-SEASON REGISTRY ##############
+##################################################
+
+# game_id -> (index, time after which the team list is checked again)
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _season_is_finished(source) -> bool:
+    return bool(getattr(source.get_league_metadata(), 'is_finished', 0))
+
+
+def get_team_index(game_id=None) -> TeamIndex:
+    """
+    Returns the team index for a season, loading it on first use
+
+    The current season's team list is re-checked every CACHE_TTL_TEAMS
+    seconds and the index is only rebuilt if a team, name or manager
+    changed. Finished seasons are loaded once and never refreshed.
+
+    Parameters
+    ----------
+    game_id: str | None
+        Yahoo game id of the season, defaults to YAHOO_GAME_ID
+
+    Returns
+    -------
+    TeamIndex
+        the season's team index
+    """
+    game_id = str(game_id or YAHOO_GAME_ID)
+    now = time.monotonic()
+
+    with _indexes_lock:
+        entry = _indexes.get(game_id)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+
+    source = get_season_query(game_id)
+    records = sorted(_team_record(team) for team in source.get_league_teams())
+
+    if entry is not None and entry[0].records == records:
+        # Unchanged team list: keep the existing index
+        index = entry[0]
+    else:
+        index = TeamIndex(records)
+
+    expires = float('inf') if _season_is_finished(source) else now + CACHE_TTL_TEAMS
+    with _indexes_lock:
+        _indexes[game_id] = (index, expires)
+
+    return index
@@ -0,0 +1,273 @@
+import json
+import time
+import random
+import threading
+from pathlib import Path
+from collections import Counter
+import yfpy.models as models
+from yfpy.utils import jsonify_data
+from requests.exceptions import HTTPError
+from yahoo.fetcher import bucket, current_priority
+from utils.metrics import inc, observe
+from config.settings import YAHOO_LEAGUE_ID, YAHOO_GAME_ID
+
+"""
+THIS FILE RECORDS YAHOO RESPONSES INTO A CASSETTE DIRECTORY AND REPLAYS
+THEM OFFLINE WITH INJECTED LATENCY, JITTER AND ERRORS, SO THE COMMAND
+PATH CAN BE LOAD-TESTED WITHOUT THE NETWORK. A CASSETTE IS THE yfpy
+to_json() OF A RESPONSE, THE SAME SHAPE AS THE tests/*.json FIXTURES
+"""
+
+# Endpoints the bot uses, and the yfpy model each one returns
+RECORDED_METHODS = {
+    'get_league_metadata': 'League',
+    'get_league_settings': 'Settings',
+    'get_league_teams': 'Team',
+    'get_league_standings': 'Standings',
+    'get_league_matchups_by_week': 'Matchup',
+    'get_league_scoreboard_by_week': 'Scoreboard',
+    'get_league_transactions': 'Transaction',
+}
+
+# Seconds of latency (mean and standard deviation) and share of calls that
+# fail with a throttling error, by endpoint; 'default' covers the rest
+DEFAULT_PROFILE = {
+    'default': {'latency': 0.3, 'jitter': 0.1, 'error_rate': 0.0},
+}
+
+
+##################################################
+################### CASSETTES ####################
+##################################################
+
+def cassette_path(cassette_dir, method: str, args: tuple = ()) -> Path:
+    """
+    File of one recorded call, e.g. get_league_scoreboard_by_week_9.json
+    """
+    return Path(cassette_dir) / ("_".join([method, *(str(arg) for arg in args)]) + ".json")
+
+
+def save_cassette(cassette_dir, method: str, args: tuple, response) -> Path:
+    """
+    Writes a yfpy response, a model or a list of models, to the cassette directory
+    """
+    path = cassette_path(cassette_dir, method, args)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(jsonify_data(response))
+    return path
+
+
+def _model(key: str):
+    # yfpy names its models after the JSON keys, e.g. team_points -> TeamPoints
+    cls = getattr(models, ''.join(part.capitalize() for part in key.split('_')), None)
+    return cls if isinstance(cls, type) and issubclass(cls, models.YahooFantasyObject) else None
+
+
+def _rebuild(value, key: str = None):
+    if isinstance(value, list):
+        return [_rebuild(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    value = {child: _rebuild(item, child) for child, item in value.items()}
+    cls = _model(key) if key else None
+    return cls(value) if cls else value
+
+
+def rebuild_response(data, model: str):
+    """
+    Turns cassette JSON back into the yfpy objects the endpoint returns
+
+    Parameters
+    ----------
+    data: dict | list
+        parsed cassette
+    model: str
+        yfpy model of the response, or of each item when it is a list
+
+    Returns
+    -------
+    YahooFantasyObject | list
+    """
+    cls = getattr(models, model)
+    if isinstance(data, list):
+        return [cls(_rebuild(item)) for item in data]
+    return cls(_rebuild(data))
+
+
+def import_fixture(path, cassette_dir) -> list:
+    """
+    Adds a tests/*.json style fixture to a cassette directory
+
+    A scoreboard fixture provides that week's scoreboard and matchups, a
+    standings fixture the standings.
+
+    Returns
+    -------
+    list
+        cassette files written
+    """
+    text = Path(path).read_text()
+    if not text.strip():
+        return []
+    data = json.loads(text)
+
+    written = []
+    if 'matchups' in data and 'week' in data:
+        week = int(data['week'])
+        files = {
+            cassette_path(cassette_dir, 'get_league_scoreboard_by_week', (week,)): data,
+            cassette_path(cassette_dir, 'get_league_matchups_by_week', (week,)):
+                [item['matchup'] for item in data['matchups']],
+        }
+    elif 'teams' in data:
+        files = {cassette_path(cassette_dir, 'get_league_standings'): data}
+    else:
+        raise ValueError(f"Unrecognized fixture {path}")
+
+    for file, content in files.items():
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(json.dumps(content))
+        written.append(file)
+    return written
+
+
+##################################################
+################### RECORDING ####################
+##################################################
+
+class RecordingQuery:
+    """
+    Wraps a live query and saves every response of the bot's endpoints
+
+    Parameters
+    ----------
+    query: YahooFantasySportsQuery
+        the live query object
+    cassette_dir: str | Path
+        directory the responses are written to
+    """
+
+    def __init__(self, query, cassette_dir):
+        self._query = query
+        self.cassette_dir = Path(cassette_dir)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._query, name)
+        if name not in RECORDED_METHODS:
+            return attribute
+
+        def record(*args):
+            response = attribute(*args)
+            save_cassette(self.cassette_dir, name, args, response)
+            return response
+
+        return record
+
+
+##################################################
+#################### REPLAYING ###################
+##################################################
+
+def load_profile(path) -> dict:
+    """
+    Reads a latency profile, JSON shaped like DEFAULT_PROFILE
+    """
+    profile = json.loads(Path(path).read_text())
+    return {'default': {**DEFAULT_PROFILE['default'], **profile.get('default', {})}, **{
+        endpoint: settings for endpoint, settings in profile.items() if endpoint != 'default'
+    }}
+
+
+class ReplayQuery:
+    """
+    Offline stand-in for YahooFantasySportsQuery that serves cassettes
+
+    Calls still take a token from the request bucket, so the rate limiter
+    behaves as it does live.
+
+    Parameters
+    ----------
+    cassette_dir: str | Path
+        directory written by RecordingQuery or import_fixture
+    profile: dict | None
+        latency, jitter and error rate by endpoint, see DEFAULT_PROFILE
+    seed: int | None
+        seed for reproducible latencies and errors
+    """
+
+    def __init__(self, cassette_dir, profile: dict = None, seed: int = None,
+                 league_id=YAHOO_LEAGUE_ID, game_id=YAHOO_GAME_ID):
+        self.cassette_dir = Path(cassette_dir)
+        self.profile = DEFAULT_PROFILE if profile is None else profile
+        self.league_id = league_id
+        self.game_id = game_id
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cassettes = {}
+
+        # Counters keyed by endpoint name
+        self.calls = Counter()
+        self.errors = Counter()
+
+    def _settings(self, method: str) -> dict:
+        return {**self.profile['default'], **self.profile.get(method, {})}
+
+    def _read(self, method: str, args: tuple):
+        path = cassette_path(self.cassette_dir, method, args)
+        with self._lock:
+            text = self._cassettes.get(path)
+        if text is None:
+            if not path.is_file():
+                raise LookupError(f"No cassette for {method}{args} in {self.cassette_dir}")
+            text = path.read_text()
+            with self._lock:
+                self._cassettes[path] = text
+        # Fresh objects every call, like a real response
+        return rebuild_response(json.loads(text), RECORDED_METHODS[method])
+
+    def _replay(self, method: str, *args):
+        settings = self._settings(method)
+        with self._lock:
+            delay = max(0.0, self._random.gauss(settings['latency'], settings['jitter']))
+            failed = self._random.random() < settings['error_rate']
+            self.calls[method] += 1
+            if failed:
+                self.errors[method] += 1
+
+        bucket.acquire(current_priority())
+        time.sleep(delay)
+
+        # Same names as live requests, e.g. get_league_standings -> standings
+        endpoint = method.replace('get_league_', '').replace('_by_week', '')
+        inc('marcy_yahoo_requests_total', endpoint=endpoint)
+        observe('marcy_yahoo_request_seconds', delay, endpoint=endpoint)
+        if failed:
+            # Same error yfpy raises for Yahoo's 999 status
+            raise HTTPError("Yahoo data unavailable due to rate limiting. Please try again later.")
+        return self._read(method, args)
+
+    def get_league_metadata(self):
+        return self._replay('get_league_metadata')
+
+    def get_league_settings(self):
+        return self._replay('get_league_settings')
+
+    def get_league_teams(self):
+        return self._replay('get_league_teams')
+
+    def get_league_standings(self):
+        return self._replay('get_league_standings')
+
+    def get_league_matchups_by_week(self, chosen_week):
+        return self._replay('get_league_matchups_by_week', int(chosen_week))
+
+    def get_league_scoreboard_by_week(self, chosen_week):
+        return self._replay('get_league_scoreboard_by_week', int(chosen_week))
+
+    def get_league_transactions(self):
+        return self._replay('get_league_transactions')
+
+    def stats(self) -> dict:
+        return {'calls': dict(self.calls), 'errors': dict(self.errors)}
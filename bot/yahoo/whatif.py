@@ -0,0 +1,232 @@
+import numpy as np
+import pandas as pd
+from yahoo.simulation import build_schedule
+
+"""
+THIS FILE CONTAINS THE "WHAT IF?" ENGINE: EVERY TEAM'S RECORD AS IF IT
+HAD PLAYED EVERY OTHER TEAM'S SCHEDULE. ALL PAIRS ARE COMPUTED AT ONCE
+WITH BROADCASTING, AND A SEASON'S MATRIX IS UPDATED ONE WEEK AT A TIME
+"""
+
+##################################################
+############ SCORE AND SCHEDULE ARRAYS ###########
+##################################################
+
+def build_score_matrix(df: pd.DataFrame, team_keys: np.ndarray, weeks: np.ndarray) -> np.ndarray:
+    """
+    Builds the points scored by every team in every week
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        matchup records with 'week', 'team_key' and 'team_total_points' columns
+    team_keys: np.ndarray
+        team keys in matrix order
+    weeks: np.ndarray
+        weeks to include
+
+    Returns
+    -------
+    np.ndarray
+        (weeks x teams) array of points, NaN where a team did not play
+    """
+    scores = np.full((len(weeks), len(team_keys)), np.nan)
+
+    games = df.loc[df['week'].isin(weeks), ['week', 'team_key', 'team_total_points']]
+    w = pd.Index(weeks).get_indexer(games['week'])
+    t = pd.Index(team_keys).get_indexer(games['team_key'])
+    valid = t >= 0
+    scores[w[valid], t[valid]] = games['team_total_points'].to_numpy()[valid]
+
+    return scores
+
+
+##################################################
+################# WHAT-IF ENGINE #################
+##################################################
+
+def swap_opponents(schedule: np.ndarray) -> np.ndarray:
+    """
+    Opponent of team i when it plays team j's schedule
+
+    When team j's opponent is team i itself, team i plays team j instead.
+
+    Parameters
+    ----------
+    schedule: np.ndarray
+        (... x weeks x teams) opponent indices, -1 for no matchup
+
+    Returns
+    -------
+    np.ndarray
+        (... x weeks x teams x teams) array where entry [w, i, j] is the
+        opponent of team i in week w on team j's schedule, -1 for no matchup
+    """
+    n_teams = schedule.shape[-1]
+    i = np.arange(n_teams)[:, None]
+    j = np.arange(n_teams)[None, :]
+
+    # Broadcast team j's opponent over every team i
+    opponents = schedule[..., None, :]
+    return np.where(opponents == i, j, opponents)
+
+
+def whatif_records(scores: np.ndarray, schedule: np.ndarray) -> tuple:
+    """
+    Records of every team on every other team's schedule
+
+    Parameters
+    ----------
+    scores: np.ndarray
+        (... x weeks x teams) points, NaN where a team did not play
+    schedule: np.ndarray
+        (... x weeks x teams) opponent indices, -1 for no matchup
+
+    Returns
+    -------
+    tuple
+        (wins, losses, ties), each (... x teams x teams) where entry [i, j]
+        is team i's record on team j's schedule; the diagonal is the real record
+    """
+    opponents = swap_opponents(schedule)
+
+    # Gather the score of each swapped opponent, week by week
+    opponent_scores = np.take_along_axis(
+        scores[..., None, :], np.where(opponents < 0, 0, opponents), axis=-1
+    )
+    own_scores = scores[..., :, None]
+
+    played = (opponents >= 0) & ~np.isnan(own_scores) & ~np.isnan(opponent_scores)
+    wins = ((own_scores > opponent_scores) & played).sum(axis=-3)
+    losses = ((own_scores < opponent_scores) & played).sum(axis=-3)
+    ties = ((own_scores == opponent_scores) & played).sum(axis=-3)
+
+    return wins, losses, ties
+
+
+class WhatIfMatrix:
+    """
+    Running what-if records of one season, updated as weeks complete
+
+    Parameters
+    ----------
+    team_keys: np.ndarray
+        team keys in matrix order
+    """
+
+    def __init__(self, team_keys: np.ndarray):
+        n_teams = len(team_keys)
+        self.team_keys = np.asarray(team_keys)
+        self.weeks = set()
+        self.wins = np.zeros((n_teams, n_teams), dtype=np.int64)
+        self.losses = np.zeros((n_teams, n_teams), dtype=np.int64)
+        self.ties = np.zeros((n_teams, n_teams), dtype=np.int64)
+
+    def update(self, df: pd.DataFrame, weeks) -> list:
+        """
+        Adds the given completed weeks that are not counted yet
+
+        Parameters
+        ----------
+        df: pd.DataFrame
+            matchup records covering at least the new weeks
+        weeks: iterable
+            completed weeks
+
+        Returns
+        -------
+        list
+            weeks that were added
+        """
+        new_weeks = np.array(sorted(set(int(week) for week in weeks) - self.weeks), dtype=np.int64)
+        if not len(new_weeks):
+            return []
+
+        # Only the new weeks are computed, then added to the running totals
+        wins, losses, ties = whatif_records(
+            build_score_matrix(df, self.team_keys, new_weeks),
+            build_schedule(df, self.team_keys, new_weeks),
+        )
+        self.wins += wins
+        self.losses += losses
+        self.ties += ties
+        self.weeks.update(new_weeks.tolist())
+
+        return new_weeks.tolist()
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Wins matrix with team keys as index (team) and columns (schedule)
+        """
+        return pd.DataFrame(self.wins, index=self.team_keys, columns=self.team_keys)
+
+
+# Running matrices by game id, kept for the life of the process
+_matrices = {}
+
+
+def get_season_matrix(team_keys: np.ndarray, game_id: str) -> WhatIfMatrix:
+    """
+    Returns the running matrix of a season, starting over if its teams changed
+    """
+    matrix = _matrices.get(game_id)
+    if matrix is None or not np.array_equal(matrix.team_keys, np.asarray(team_keys)):
+        matrix = _matrices[game_id] = WhatIfMatrix(team_keys)
+    return matrix
+
+
+##################################################
+############### HISTORICAL BATCH #################
+##################################################
+
+def whatif_seasons(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Runs the what-if engine over many seasons in one batch
+
+    Seasons are padded to the largest league and longest season so every
+    season is computed by the same broadcast.
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        completed regular season games with 'year', 'week', 'matchup_id',
+        'team_key' and 'team_total_points' columns
+
+    Returns
+    -------
+    pd.DataFrame
+        one row per team per season: 'year', 'team_key', 'wins' (real),
+        'avg_wins', 'best_wins' and 'worst_wins' over every schedule, and
+        'luck', real wins above the average schedule
+    """
+    years = np.sort(df['year'].unique())
+    teams_by_year = [np.sort(df.loc[df['year'] == year, 'team_key'].unique()) for year in years]
+    weeks_by_year = [np.sort(df.loc[df['year'] == year, 'week'].unique()) for year in years]
+    n_teams = max(len(teams) for teams in teams_by_year)
+    n_weeks = max(len(weeks) for weeks in weeks_by_year)
+
+    # Padding teams never play, padding weeks have no games
+    scores = np.full((len(years), n_weeks, n_teams), np.nan)
+    schedule = np.full((len(years), n_weeks, n_teams), -1, dtype=np.int64)
+    for s, (year, teams, weeks) in enumerate(zip(years, teams_by_year, weeks_by_year)):
+        season = df[df['year'] == year]
+        scores[s, :len(weeks), :len(teams)] = build_score_matrix(season, teams, weeks)
+        schedule[s, :len(weeks), :len(teams)] = build_schedule(season, teams, weeks)
+
+    wins, _, _ = whatif_records(scores, schedule)
+
+    frames = []
+    for s, (year, teams) in enumerate(zip(years, teams_by_year)):
+        season_wins = wins[s, :len(teams), :len(teams)]
+        frames.append(pd.DataFrame({
+            'year': year,
+            'team_key': teams,
+            'wins': np.diagonal(season_wins),
+            'avg_wins': season_wins.mean(axis=1),
+            'best_wins': season_wins.max(axis=1),
+            'worst_wins': season_wins.min(axis=1),
+        }))
+    result = pd.concat(frames, ignore_index=True)
+    result['luck'] = result['wins'] - result['avg_wins']
+
+    return result
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The bot runs as python ./bot/main.py, so its modules import from bot/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'bot'))
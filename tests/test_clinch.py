@@ -0,0 +1,121 @@
+import itertools
+import numpy as np
+import pytest
+from yahoo.clinch import ClinchSolver
+
+"""
+CHECKS THE CLINCH SOLVER AGAINST EVERY OUTCOME OF SMALL LEAGUES
+"""
+
+
+def make_league(n_teams: int, n_weeks: int, seed: int) -> tuple:
+    """
+    Random wins, points for and a round-robin-like remaining schedule
+    """
+    rng = np.random.default_rng(seed)
+    wins = rng.integers(2, 8, n_teams)
+    points = rng.normal(1200, 60, n_teams)
+    schedule = np.full((n_weeks, n_teams), -1)
+    for week in range(n_weeks):
+        order = rng.permutation(n_teams)
+        home, away = order[:n_teams // 2], order[n_teams // 2:]
+        schedule[week, home] = away
+        schedule[week, away] = home
+    return wins, points, schedule
+
+
+class BruteForce:
+    """
+    Enumerates every remaining outcome of a solver's league
+    """
+
+    def __init__(self, solver: ClinchSolver):
+        self.solver = solver
+        self.outcomes = []
+        for results in itertools.product((0, 1), repeat=len(solver.games)):
+            wins = list(solver.wins)
+            for result, (_, a, b) in zip(results, solver.games):
+                wins[b if result else a] += 1
+            self.outcomes.append((results, wins))
+
+    def surely_in(self, team: int, wins: list) -> bool:
+        # Ties in wins count against the team unless its tie-break is settled
+        ahead = sum(
+            1 for other in range(self.solver.n_teams)
+            if other != team and (wins[other] > wins[team]
+                                  or (wins[other] == wins[team] and not self.solver.settled[team, other]))
+        )
+        return ahead < self.solver.n_playoff_teams
+
+    def maybe_in(self, team: int, wins: list) -> bool:
+        # Ties in wins count for the team unless the other side's tie-break is settled
+        ahead = sum(
+            1 for other in range(self.solver.n_teams)
+            if other != team and (wins[other] > wins[team]
+                                  or (wins[other] == wins[team] and self.solver.settled[other, team]))
+        )
+        return ahead < self.solver.n_playoff_teams
+
+    def clinches(self, team: int, fixed: dict) -> bool:
+        # No outcome that agrees with the fixed results leaves the team out
+        results = np.array([results for results, _ in self.outcomes]).reshape(len(self.outcomes), -1)
+        missed = np.array([not self.surely_in(team, wins) for _, wins in self.outcomes])
+        games = list(fixed)
+        agrees = (results[:, games] == [fixed[g] for g in games]).all(axis=1)
+        return not (missed & agrees).any()
+
+    def smallest_clinch(self, team: int):
+        n_games = len(self.solver.games)
+        for size in range(n_games + 1):
+            for games in itertools.combinations(range(n_games), size):
+                for results in itertools.product((0, 1), repeat=size):
+                    if self.clinches(team, dict(zip(games, results))):
+                        return size
+        return None
+
+
+LEAGUES = [
+    # (teams, weeks left, points margin, seed)
+    *[(6, 3, 0, seed) for seed in range(8)],
+    *[(8, 2, 0, seed) for seed in range(8)],
+    *[(6, 3, 40, seed) for seed in range(4)],
+    *[(8, 2, 40, seed) for seed in range(4)],
+]
+
+
+@pytest.mark.parametrize('n_teams, n_weeks, points_margin, seed', LEAGUES)
+def test_solver_matches_brute_force(n_teams, n_weeks, points_margin, seed):
+    wins, points, schedule = make_league(n_teams, n_weeks, seed)
+    solver = ClinchSolver(wins, points, schedule, n_teams // 2, points_margin=points_margin)
+    brute = BruteForce(solver)
+
+    for team in range(n_teams):
+        clinched = all(brute.surely_in(team, wins) for _, wins in brute.outcomes)
+        eliminated = not any(brute.maybe_in(team, wins) for _, wins in brute.outcomes)
+        assert solver.is_clinched(team) == clinched
+        assert solver.is_eliminated(team) == eliminated
+        if clinched or eliminated:
+            continue
+
+        needs, exact = solver.clinching_results(team)
+        smallest = brute.smallest_clinch(team)
+        if needs is None:
+            assert smallest is None
+            continue
+        assert exact
+        assert brute.clinches(team, needs)
+        assert len(needs) == smallest
+
+
+def test_solve_reports_every_team():
+    wins, points, schedule = make_league(8, 2, seed=3)
+    solver = ClinchSolver(wins, points, schedule, 4, points_margin=0)
+    brute = BruteForce(solver)
+
+    report = solver.solve()
+    assert len(report) == 8
+    for team, entry in enumerate(report):
+        if entry['status'] == 'clinched':
+            assert brute.clinches(team, {})
+        elif entry['status'] == 'alive' and entry['needs'] is not None:
+            assert brute.clinches(team, entry['needs'])